@@ -0,0 +1,83 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import List
+import pandas as pd
+from backend.chat.tools.boxscore import parse_url, get_boxscore, aggregate_boxscores, boxscore_cache
+from config import BOXSCORE_MAX_WORKERS
+
+router = APIRouter()
+
+MAX_BATCH_GAMES = 100
+
+
+class GameRef(BaseModel):
+    season: int
+    gamecode: int
+
+class BoxScoreBatchRequest(BaseModel):
+    urls: List[str] = Field(default_factory=list, max_length=MAX_BATCH_GAMES)
+    games: List[GameRef] = Field(default_factory=list, max_length=MAX_BATCH_GAMES)
+
+
+def records(df: pd.DataFrame) -> list:
+    """Filas del DataFrame como lista de dicts, con NaN -> None."""
+    return json.loads(df.to_json(orient="records"))
+
+def fetch_game(game):
+    season, gamecode = game
+    try:
+        return game, get_boxscore(season, gamecode), None
+    except Exception as e:
+        print(f"Error al obtener el boxscore {season}/{gamecode}: {e}")
+        return game, None, str(e)
+
+
+@router.post("/batch")
+def get_boxscores_batch(request: BoxScoreBatchRequest):
+    """
+    Endpoint para analizar varios partidos a la vez (p. ej. una jornada o la temporada de un equipo).
+    Acepta URLs del game-center de Euroleague y/o pares (season, gamecode); los partidos se
+    descargan en paralelo (los terminados salen de la caché) y se devuelven sus boxscores con
+    estadísticas avanzadas y las tablas agregadas por equipo y por jugador.
+    Los partidos que no se han podido obtener se devuelven en 'errors'.
+    """
+    try:
+        games = [parse_url(url) for url in request.urls]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    games += [(g.season, g.gamecode) for g in request.games]
+    games = list(dict.fromkeys(games))
+
+    if not games:
+        raise HTTPException(status_code=400, detail="Debes proporcionar al menos una URL o un partido (season, gamecode).")
+    if len(games) > MAX_BATCH_GAMES:
+        raise HTTPException(status_code=400, detail=f"Como máximo se pueden analizar {MAX_BATCH_GAMES} partidos por petición.")
+
+    with ThreadPoolExecutor(max_workers=min(BOXSCORE_MAX_WORKERS, len(games))) as executor:
+        results = list(executor.map(fetch_game, games))
+
+    boxscores = [(game, df) for game, df, _ in results if df is not None]
+    errors = [{"season": game[0], "gamecode": game[1], "detail": error} for game, _, error in results if error is not None]
+    if not boxscores:
+        raise HTTPException(status_code=502, detail={"message": "No se pudo obtener ningún boxscore.", "errors": errors})
+
+    teams, players = aggregate_boxscores([df for _, df in boxscores])
+
+    return {
+        "games": [
+            {"season": season, "gamecode": gamecode, "boxscore": records(df)}
+            for (season, gamecode), df in boxscores
+        ],
+        "teams": records(teams),
+        "players": records(players),
+        "errors": errors
+    }
+
+@router.get("/cache-stats")
+def get_boxscore_cache_stats():
+    """
+    Endpoint para consultar el uso de la caché de boxscores ya calculados.
+    """
+    return {"cache_stats": boxscore_cache.stats()}
@@ -0,0 +1,172 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+from backend.chat.branch_router import branch_router, normalize
+from backend.chat.tools.boxscore import GAME_URL_PATTERN, is_final_game
+from config import CHAT_CACHE_CONFIG
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+# Ramas cuya respuesta depende de los datos cargados por el ETL
+DATA_BRANCHES = {"general"}
+
+NUMBER_PATTERN = re.compile(r'\d+')
+
+
+class _Entry:
+    def __init__(self, answer: str, numbers: frozenset, embedding: Optional[np.ndarray]):
+        self.answer = answer
+        self.numbers = numbers
+        self.embedding = embedding
+        self.created = time.time()
+
+
+class AnswerCache:
+    """
+    Caché LRU con TTL de las respuestas del chat.
+
+    La clave es (rama, versión de datos, pregunta normalizada). En la rama stat_explainer
+    la pregunta se reduce a la estadística por la que se pregunta, así que "¿Qué es el PER?"
+    y "Explícame el PER" comparten respuesta. Si hay un modelo de embeddings configurado,
+    un fallo exacto busca además paráfrasis de la misma rama por similitud coseno, exigiendo
+    los mismos números en ambas preguntas (temporadas, códigos de partido...).
+
+    invalidate() sube la versión de datos tras una carga del ETL, lo que descarta solo
+    las respuestas de las ramas que consultan la base de datos.
+    """
+    def __init__(self, max_entries: int, ttl: int, embedding_model: Optional[str] = None,
+                 similarity_threshold: float = 0.92):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.data_version = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+        self._model = None
+        self._model_name = embedding_model
+        self._model_lock = threading.Lock()
+        if embedding_model and SentenceTransformer is None:
+            print("Aviso: CHAT_CACHE_EMBEDDING_MODEL configurado pero sentence-transformers no está instalado.")
+            self._model_name = None
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        if not self._model_name:
+            return None
+        with self._model_lock:
+            if self._model is None:
+                self._model = SentenceTransformer(self._model_name)
+        vector = np.asarray(self._model.encode(text), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def _key(self, question: str, branch: str):
+        text = None
+        if branch == "stat_explainer":
+            term = branch_router.explainer_term(question)
+            text = f"term:{term}" if term else None
+        version = self.data_version if branch in DATA_BRANCHES else 0
+        return (branch, version, text or normalize(question))
+
+    def get(self, question: str, branch: str) -> Optional[str]:
+        """Respuesta guardada para la pregunta o una paráfrasis suya, o None."""
+        key = self._key(question, branch)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.created <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.answer
+            if entry is not None:
+                del self._entries[key]
+
+        embedding = self._embed(key[2])
+        if embedding is not None:
+            numbers = frozenset(NUMBER_PATTERN.findall(key[2]))
+            with self._lock:
+                candidates = [
+                    (k, e) for k, e in self._entries.items()
+                    if k[:2] == key[:2] and e.embedding is not None and e.numbers == numbers
+                    and now - e.created <= self.ttl
+                ]
+                if candidates:
+                    scores = np.stack([e.embedding for _, e in candidates]) @ embedding
+                    best = int(np.argmax(scores))
+                    if scores[best] >= self.similarity_threshold:
+                        best_key, best_entry = candidates[best]
+                        self._entries.move_to_end(best_key)
+                        self.semantic_hits += 1
+                        return best_entry.answer
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, question: str, branch: str, answer: str):
+        if not answer:
+            return
+        key = self._key(question, branch)
+        entry = _Entry(answer, frozenset(NUMBER_PATTERN.findall(key[2])), self._embed(key[2]))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Descarta las respuestas que dependen de los datos (nueva versión de datos)."""
+        with self._lock:
+            self.data_version += 1
+            for key in [k for k in self._entries if k[0] in DATA_BRANCHES]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.semantic_hits) / lookups, 3) if lookups else None,
+                "data_version": self.data_version,
+                "embeddings": bool(self._model_name),
+            }
+
+
+answer_cache = AnswerCache(
+    max_entries=CHAT_CACHE_CONFIG["max_entries"],
+    ttl=CHAT_CACHE_CONFIG["ttl"],
+    embedding_model=CHAT_CACHE_CONFIG["embedding_model"],
+    similarity_threshold=CHAT_CACHE_CONFIG["similarity_threshold"],
+)
+
+
+def is_cacheable(branch: str, context: str, question: str) -> bool:
+    """
+    Solo se cachean las respuestas que no dependen de la conversación previa, porque la
+    clave es la pregunta y se comparten entre conversaciones:
+
+    - stat_explainer: si la pregunta nombra una estadística conocida (clave term:<stat>).
+    - boxscore: si la pregunta incluye la URL del partido y este ya ha terminado. Una
+      respuesta sobre un partido en juego quedaría desfasada en cuanto cambie el marcador.
+    - En el resto de casos (rama general, seguimientos como "¿y cómo se calcula?"), solo
+      en el primer turno.
+    """
+    if branch == "stat_explainer" and branch_router.explainer_term(question) is not None:
+        return True
+    if branch == "boxscore":
+        return branch_router.has_game_url(question) and all(
+            is_final_game(int(season), int(gamecode)) for season, gamecode in GAME_URL_PATTERN.findall(question)
+        )
+    return not context.strip()
@@ -0,0 +1,110 @@
+import re
+import threading
+import unicodedata
+from typing import Optional
+
+from backend.chat.tools.boxscore import GAME_URL_PATTERN
+from config import PLAYER_MAP, TEAM_MAP
+
+URL_PATTERN = re.compile(r'https?://\S+')
+
+# Preguntas de definición: "¿Qué es el PER?", "¿Cómo se calcula el TS%?", "Explícame el USG%"...
+EXPLAINER_PATTERN = re.compile(
+    r'^(?:que es|que significa|que mide|como se calcula|como se mide|explicame(?: que es)?|definicion de|what is|what does)'
+    r'\s+(?:el |la |los |las |un |una |the )?(?P<term>.+?)'
+    r'(?:\s+(?:en baloncesto|en basket|mean|means))?$'
+)
+
+# Etiquetas de PLAYER_MAP / TEAM_MAP que no son estadísticas
+NON_STAT_LABELS = {"Nombre", "Equipo", "ROLE", "NAT", "HEIGHT", "AGE", "TEAM NAME", "SEASON"}
+
+# Nombres habituales de estadísticas que no aparecen como etiqueta
+STAT_SYNONYMS = [
+    "rating ofensivo", "rating defensivo", "net rating", "offensive rating", "defensive rating",
+    "true shooting", "effective field goal", "usage", "valoracion", "plus minus", "mas menos",
+    "posesiones", "pace", "ritmo", "eficiencia", "four factors", "cuatro factores",
+]
+
+
+def normalize(text: str) -> str:
+    """Minúsculas, sin tildes ni signos de interrogación/exclamación y con espacios simples."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r'[¿?¡!"“”]', " ", text)
+    return " ".join(text.split()).strip(" .,:;")
+
+
+def stat_terms():
+    """Términos de estadísticas conocidos (etiquetas, nombres de columna y sinónimos) normalizados."""
+    terms = set(normalize(s) for s in STAT_SYNONYMS)
+    for mapping in (PLAYER_MAP, TEAM_MAP):
+        for column, label in mapping.items():
+            if label in NON_STAT_LABELS:
+                continue
+            terms.add(normalize(label))
+            terms.add(normalize(column.replace("_", " ")))
+            # "OFF RTG (ON)" -> también "OFF RTG"
+            terms.add(normalize(re.sub(r'\s*\((?:on|off|net|2p|3p|ft|after [^)]*)\)', "", label, flags=re.IGNORECASE)))
+    terms.discard("")
+    return terms
+
+
+class BranchRouter:
+    """
+    Clasificador de reglas que decide la rama del chat sin llamar al LLM cuando la
+    pregunta no deja dudas: una URL de partido de Euroleague va a 'boxscore' y una
+    pregunta de definición sobre una estadística conocida va a 'stat_explainer'.
+    En cualquier otro caso devuelve None y se usa el clasificador LLM.
+    """
+    def __init__(self):
+        self.terms = stat_terms()
+        self._lock = threading.Lock()
+        self.counters = {"boxscore_url": 0, "stat_definition": 0, "llm": 0}
+
+    def route(self, question: str) -> Optional[str]:
+        """Devuelve la rama si alguna regla la decide con seguridad, o None."""
+        if self.has_game_url(question):
+            return self._hit("boxscore_url", "boxscore")
+
+        if self.explainer_term(question) is not None:
+            return self._hit("stat_definition", "stat_explainer")
+        return None
+
+    def has_game_url(self, question: str) -> bool:
+        """Indica si la pregunta incluye la URL de un partido de Euroleague."""
+        return any(GAME_URL_PATTERN.search(url) for url in URL_PATTERN.findall(question))
+
+    def explainer_term(self, question: str) -> Optional[str]:
+        """Estadística conocida por la que pregunta una pregunta de definición, o None."""
+        match = EXPLAINER_PATTERN.match(normalize(question))
+        if match and match.group("term") in self.terms:
+            return match.group("term")
+        return None
+
+    def classify(self, question: str, context: str, llm_classifier) -> str:
+        """Rama por reglas o, si ninguna aplica, la que devuelva llm_classifier(question, context)."""
+        branch = self.route(question)
+        if branch is not None:
+            return branch
+        with self._lock:
+            self.counters["llm"] += 1
+        return llm_classifier(question, context)
+
+    def _hit(self, rule, branch):
+        with self._lock:
+            self.counters[rule] += 1
+        return branch
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        total = sum(counters.values())
+        local = total - counters["llm"]
+        return {
+            "counters": counters,
+            "total": total,
+            "local_hit_rate": round(local / total, 3) if total else None,
+        }
+
+
+branch_router = BranchRouter()
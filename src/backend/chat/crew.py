@@ -1,15 +1,17 @@
-import os
-import datetime
+import threading
 
 from crewai import Agent, Crew, Process, Task, LLM
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import NL2SQLTool
 from config import ADVANCED_DB_CONFIG, LLM_MODEL
 
-from src.backend.chat.tools.boxscore import BoxScoreTool
+from backend.chat.tools.boxscore import BoxScoreTool
+from backend.chat.tools.guarded_sql import GuardedNL2SQLTool
+from backend.chat.memory import new_conversation_id
 
+# stream=True: los fragmentos se publican en el bus de eventos de CrewAI para /chat/response-stream
 llm = LLM(
-	model=LLM_MODEL
+	model=LLM_MODEL,
+	stream=True
 )
 
 @CrewBase
@@ -17,7 +19,8 @@ class AssistAI():
 	"""AssistAI crew"""
 
 	db_uri = f"postgresql://{ADVANCED_DB_CONFIG['user']}:{ADVANCED_DB_CONFIG['password']}@{ADVANCED_DB_CONFIG['host']}/{ADVANCED_DB_CONFIG['dbname']}"
-	nl2sql = NL2SQLTool(db_uri=db_uri, result_as_answer=True)
+	# Solo lectura, con timeout, límite de filas y caché de resultados por SQL normalizada
+	nl2sql = GuardedNL2SQLTool(db_uri=db_uri, result_as_answer=True)
 	boxscore_tool = BoxScoreTool(result_as_answer=True)
 
 	agents_config = 'config/agents.yaml'
@@ -152,21 +155,8 @@ class AssistAI():
 		)
 
 	def create_id(self):
-		"""Creates a unique ID for the crew"""
-		id = str(hash(datetime.datetime.now().timestamp()))
-		if id not in os.listdir("memory"):
-			os.mkdir(f"memory/{id}")
-		else:
-			i = 0
-			while id in os.listdir("memory") and i < 5:
-				i += 1
-				id = str(hash(datetime.datetime.now().timestamp()))
-				if id not in os.listdir("memory"):
-					os.mkdir(f"memory/{id}")
-					break
-			if i == 5:
-				raise Exception("Could not create a unique ID for the crew")
-		return id
+		"""Creates a unique ID for the crew (the memory directory is created with the first turn)"""
+		return new_conversation_id()
 	
 	def get_branch(self, question: str, context: str) -> str:
 		messages = [
@@ -190,3 +180,45 @@ class AssistAI():
 		response = llm.call(messages=messages)
 
 		return response.strip().lower()
+
+
+class CrewFactory:
+	"""
+	Construye una sola vez por proceso AssistAI (configuración YAML, agentes, tareas,
+	herramientas y esquema SQL) y entrega a cada petición una copia ligera de la crew.
+
+	Las copias comparten el LLM y las herramientas, pero tienen sus propios agentes y
+	tareas: CrewAI modifica ambos durante la ejecución, así que no se pueden compartir
+	entre conversaciones simultáneas.
+	"""
+	CREWS = ("crew_sql", "crew_stats", "crew_boxscore")
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._assistai = None
+		self._templates = {}
+
+	def warm_up(self):
+		"""Construye AssistAI y las plantillas de las crews si aún no existen."""
+		if self._assistai is not None:
+			return self._assistai
+		with self._lock:
+			if self._assistai is None:
+				assistai = AssistAI()
+				self._templates = {name: getattr(assistai, name)("template") for name in self.CREWS}
+				self._assistai = assistai
+		return self._assistai
+
+	def get_crew(self, name: str) -> Crew:
+		"""Devuelve una crew nueva para un turno de conversación a partir de la plantilla."""
+		self.warm_up()
+		return self._templates[name].copy()
+
+	def get_branch(self, question: str, context: str) -> str:
+		return self.warm_up().get_branch(question, context)
+
+	def create_id(self):
+		return new_conversation_id()
+
+
+crew_factory = CrewFactory()
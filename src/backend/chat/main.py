@@ -1,52 +1,217 @@
+import asyncio
 import datetime
 
-from fastapi import APIRouter
-from backend.chat.crew import AssistAI
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from backend.chat.answer_cache import answer_cache, is_cacheable
+from backend.chat.branch_router import branch_router
+from backend.chat.crew import AssistAI, crew_factory
 from backend.chat.memory import Memory
+from backend.chat.streaming import StageTimer, stream_relay, sse_event
+from backend.database.auth import require_admin_token
 
 router = APIRouter()
 
+# Crew que responde cada rama
+BRANCH_CREWS = {
+    "general": "crew_sql",
+    "stat_explainer": "crew_stats",
+    "boxscore": "crew_boxscore",
+}
+
+_END = object()
+
+def now_str():
+    return datetime.datetime.fromtimestamp(datetime.datetime.now().timestamp()).strftime('%Y-%m-%d %H:%M:%S')
+
+def classify_branch(question: str, context: str) -> str:
+    """
+    Selects the branch with the rule-based router and falls back to the (blocking)
+    LLM classifier only when no rule applies; run it in the thread pool.
+    """
+    branch = branch_router.classify(question, context, crew_factory.get_branch)
+    return branch if branch in BRANCH_CREWS else "general"
+
+def open_memory(id: str) -> Memory:
+    """Memory of a conversation; 400 if the id is not a valid conversation ID."""
+    try:
+        return Memory(id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def build_crew(branch: str):
+    """Returns a fresh copy of the cached crew for a branch."""
+    return crew_factory.get_crew(BRANCH_CREWS[branch])
+
 @router.get("/get_id")
 async def get_id():
     """
     Endpoint to get the ID of the AssistAI model.
 
+    IDs are generated without touching the disk; the conversation is stored on its first turn.
+
     Returns:
         str: The ID of the AssistAI model.
     """
-    return AssistAI().create_id()
+    return crew_factory.create_id()
 
 @router.get("/response")
 async def get_response(user_question: str, id: str):
     """
     Endpoint to get a response from the AssistAI model.
 
+    Every blocking step (memory I/O, branch classification, crew construction and
+    execution) runs outside the event loop, so concurrent requests don't wait on each other.
+
     Args:
         user_question (str): The question to ask the model.
     Returns:
-        dict: A dictionary containing the model's response.
+        dict: A dictionary containing the model's response and the timing of each stage (ms).
     """
-    timestamp_user = datetime.datetime.fromtimestamp(datetime.datetime.now().timestamp()).strftime('%Y-%m-%d %H:%M:%S')
-    memory = Memory(id)
-    context = memory.get_last_n_turns_str(5)
+    timer = StageTimer()
+    timestamp_user = now_str()
+    memory = open_memory(id)
+
+    with timer.stage("context"):
+        context = await run_in_threadpool(memory.get_last_n_turns_str, 5)
     inputs = {
         'context': context,
         'user_question': user_question
     }
-    # Get branch
-    branch = AssistAI().get_branch(user_question, context)
+
+    with timer.stage("branch"):
+        branch = await run_in_threadpool(classify_branch, user_question, context)
     print(f"Branch selected: {branch}")
 
-    if branch == "general":
-        response = await AssistAI().crew_sql(id).kickoff_async(inputs=inputs)
-    elif branch == "stat_explainer":
-        response = await AssistAI().crew_stats(id).kickoff_async(inputs=inputs)
-    elif branch == "boxscore":
-        response = await AssistAI().crew_boxscore(id).kickoff_async(inputs=inputs)
+    cacheable = is_cacheable(branch, context, user_question)
+    with timer.stage("cache"):
+        cached = await run_in_threadpool(answer_cache.get, user_question, branch) if cacheable else None
+
+    if cached is not None:
+        response = {"raw": cached}
+    else:
+        with timer.stage("crew"):
+            crew = await run_in_threadpool(build_crew, branch)
+            response = await crew.kickoff_async(inputs=inputs)
+        # Se vuelve a comprobar: tras la crew ya se sabe si el partido del boxscore ha terminado
+        if is_cacheable(branch, context, user_question):
+            await run_in_threadpool(answer_cache.put, user_question, branch, str(response))
 
-    timestamp_assistai = datetime.datetime.fromtimestamp(datetime.datetime.now().timestamp()).strftime('%Y-%m-%d %H:%M:%S')
-    memory.add_turn(user_question, timestamp_user, str(response), timestamp_assistai)
+    with timer.stage("memory"):
+        await run_in_threadpool(memory.add_turn, user_question, timestamp_user, str(cached or response), now_str())
+
+    timings = timer.as_dict()
+    print(f"Chat timings (ms): {timings}")
     return {
         "response": response,
+        "branch": branch,
+        "cached": cached is not None,
+        "timings": timings,
         "success": True
     }
+
+@router.get("/response-stream")
+async def get_response_stream(user_question: str, id: str):
+    """
+    Endpoint to get a response from the AssistAI model as Server-Sent Events.
+
+    Events:
+        stage: {"stage", "ms"} when a stage finishes (context, branch, cache, crew, memory).
+        token: {"text"} fragments of the final answer as the LLM generates them
+            (a single event with the whole answer when it comes from the cache).
+        done: {"response", "branch", "cached", "timings"} with the full answer.
+        error: {"detail"} if the answer could not be generated.
+    """
+    memory = open_memory(id)
+
+    async def events():
+        timer = StageTimer()
+        timestamp_user = now_str()
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        try:
+            with timer.stage("context"):
+                context = await run_in_threadpool(memory.get_last_n_turns_str, 5)
+            yield sse_event("stage", {"stage": "context", "ms": timer.timings["context"]})
+
+            with timer.stage("branch"):
+                branch = await run_in_threadpool(classify_branch, user_question, context)
+            yield sse_event("stage", {"stage": "branch", "ms": timer.timings["branch"], "branch": branch})
+
+            cacheable = is_cacheable(branch, context, user_question)
+            with timer.stage("cache"):
+                cached = await run_in_threadpool(answer_cache.get, user_question, branch) if cacheable else None
+            yield sse_event("stage", {"stage": "cache", "ms": timer.timings["cache"], "hit": cached is not None})
+
+            if cached is not None:
+                response = cached
+                yield sse_event("token", {"text": cached})
+            else:
+                with timer.stage("crew"):
+                    crew = await run_in_threadpool(build_crew, branch)
+                    answer_task_id = crew.tasks[-1].id
+                    stream_relay.subscribe(answer_task_id, loop, queue)
+                    try:
+                        kickoff = asyncio.ensure_future(crew.kickoff_async(inputs={
+                            'context': context,
+                            'user_question': user_question
+                        }))
+                        kickoff.add_done_callback(lambda _: queue.put_nowait(_END))
+                        while (item := await queue.get()) is not _END:
+                            yield sse_event("token", {"text": item})
+                        response = str(kickoff.result())
+                    finally:
+                        stream_relay.unsubscribe(answer_task_id)
+                yield sse_event("stage", {"stage": "crew", "ms": timer.timings["crew"]})
+                # Se vuelve a comprobar: tras la crew ya se sabe si el partido del boxscore ha terminado
+                if is_cacheable(branch, context, user_question):
+                    await run_in_threadpool(answer_cache.put, user_question, branch, response)
+
+            with timer.stage("memory"):
+                await run_in_threadpool(memory.add_turn, user_question, timestamp_user, response, now_str())
+
+            timings = timer.as_dict()
+            print(f"Chat timings (ms): {timings}")
+            yield sse_event("done", {"response": response, "branch": branch, "cached": cached is not None, "timings": timings})
+        except Exception as e:
+            print(f"Error generating chat response: {e}")
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/router-stats")
+async def get_router_stats():
+    """
+    Endpoint to get how many questions were routed by rules and how many needed the LLM classifier.
+    """
+    return {"router_stats": branch_router.stats()}
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """
+    Endpoint to get the hit rate of the answer cache.
+    """
+    return {"cache_stats": answer_cache.stats()}
+
+@router.post("/cache/invalidate", dependencies=[Depends(require_admin_token)])
+async def invalidate_cache():
+    """
+    Endpoint to drop the cached answers and SQL results that depend on the database after an ETL load.
+    Requires the X-Admin-Token header.
+    """
+    answer_cache.invalidate()
+    AssistAI.nl2sql.invalidate_cache()
+    return {"success": True}
+
+@router.get("/sql-stats")
+async def get_sql_stats():
+    """
+    Endpoint to get the NL2SQL query stats: executed, cached, rejected and truncated queries and the slowest ones.
+    """
+    return {"sql_stats": AssistAI.nl2sql.stats()}
\ No newline at end of file
@@ -1,48 +1,167 @@
 import json
+import os
+import re
+import secrets
+import threading
+import time
+from config import MEMORY_CONFIG
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Locks para los hilos de este proceso, repartidos por conversación en un número fijo para
+# que no crezcan con cada id nuevo; fcntl.flock protege además frente a otros procesos
+# (varios workers de uvicorn) donde está disponible
+LOCK_STRIPES = 64
+_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+TAIL_BLOCK_SIZE = 8192
+
+# Ids nuevos (hexadecimal) y antiguos (hash numérico, posiblemente negativo)
+ID_PATTERN = re.compile(r'^-?[0-9a-fA-F]{1,64}$')
+
+
+def new_conversation_id():
+    """
+    Id de conversación al estilo ULID: 48 bits de milisegundos seguidos de 80 bits
+    aleatorios, en hexadecimal. No necesita consultar el disco, no colisiona en la práctica
+    y se ordena por fecha de creación.
+    """
+    return f"{int(time.time() * 1000):012x}{secrets.token_hex(10)}"
+
+
+def conversation_dir(id):
+    """
+    Directorio de una conversación: memory/<2 últimos caracteres>/<id>, para repartir las
+    conversaciones en 256 subdirectorios. Las conversaciones antiguas siguen en memory/<id>.
+    """
+    id = str(id)
+    if not ID_PATTERN.match(id):
+        raise ValueError(f"Id de conversación no válido: {id}")
+    legacy_dir = os.path.join(MEMORY_CONFIG["dir"], id)
+    if os.path.isdir(legacy_dir):
+        return legacy_dir
+    return os.path.join(MEMORY_CONFIG["dir"], id[-2:].lower(), id)
+
+
+def _conversation_lock(id):
+    return _locks[hash(str(id)) % LOCK_STRIPES]
+
 
 class Memory:
+    """
+    Memoria de una conversación en formato JSONL (un turno por línea, solo se añade al final).
+
+    Añadir un turno no reescribe el fichero y leer los últimos n turnos solo lee el final
+    del fichero, así que el coste no crece con la longitud de la conversación. Cuando el
+    fichero supera MEMORY_CONFIG["max_bytes"] se compacta conservando los últimos
+    MEMORY_CONFIG["keep_turns"] turnos. El directorio se crea con el primer turno.
+    """
     def __init__(self, id):
         self.id = id
+        self.dir = conversation_dir(id)
+        self.path = os.path.join(self.dir, "conversation.jsonl")
+        self.legacy_path = os.path.join(self.dir, "conversation.json")
+
+    def _lock_file(self, f, exclusive):
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    def _migrate_legacy(self):
+        """Convierte una conversación guardada en el antiguo conversation.json a JSONL."""
+        if os.path.exists(self.path) or not os.path.exists(self.legacy_path):
+            return
+        with open(self.legacy_path, "r", encoding="utf-8") as f:
+            conversation = json.load(f)
+        turns = sorted(
+            ((int(k.split("_")[1]), v) for k, v in conversation.items() if k.startswith("turno_")),
+            key=lambda x: x[0]
+        )
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for number, turn in turns:
+                f.write(json.dumps({"turn": number, **turn}, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        os.remove(self.legacy_path)
+
+    def _read_tail(self, f, n):
+        """Últimos n turnos de un fichero abierto en binario, leyéndolo desde el final por bloques."""
+        if n <= 0:
+            return []
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= n:
+            size = min(TAIL_BLOCK_SIZE, position)
+            position -= size
+            f.seek(position)
+            data = f.read(size) + data
+        lines = [line for line in data.split(b"\n") if line.strip()]
+        # Si no se ha llegado al principio, la primera línea puede estar cortada
+        if position > 0:
+            lines = lines[1:]
+        return [json.loads(line) for line in lines[-n:]]
 
     def load_conversation(self):
-        try:
-            with open(f"memory/{self.id}/conversation.json", "r", encoding="utf-8") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
-        
-    def save_conversation(self, conversation):
-        with open(f"memory/{self.id}/conversation.json", "w", encoding="utf-8") as f:
-            json.dump(conversation, f, ensure_ascii=False, indent=4)
+        with _conversation_lock(self.id):
+            self._migrate_legacy()
+            try:
+                with open(self.path, "rb") as f:
+                    self._lock_file(f, exclusive=False)
+                    turns = [json.loads(line) for line in f if line.strip()]
+            except FileNotFoundError:
+                return {}
+        return {f"turno_{turn.pop('turn')}": turn for turn in turns}
 
     def add_turn(self, user_question, timestamp_user, agent_answer, timestamp_agent):
-        conversation = self.load_conversation()
-
-        conversation[f"turno_{len(conversation)+1}"] = {
-            "user": {
-                "question": user_question,
-                "timestamp": timestamp_user
-            },
-            "agent": {
-                "answer": agent_answer,
-                "timestamp": timestamp_agent
-            }
-        }
-
-        self.save_conversation(conversation)
-    
+        with _conversation_lock(self.id):
+            os.makedirs(self.dir, exist_ok=True)
+            self._migrate_legacy()
+            with open(self.path, "ab+") as f:
+                self._lock_file(f, exclusive=True)
+                last = self._read_tail(f, 1)
+                turn = {
+                    "turn": last[0]["turn"] + 1 if last else 1,
+                    "user": {
+                        "question": user_question,
+                        "timestamp": timestamp_user
+                    },
+                    "agent": {
+                        "answer": agent_answer,
+                        "timestamp": timestamp_agent
+                    }
+                }
+                f.write((json.dumps(turn, ensure_ascii=False) + "\n").encode("utf-8"))
+                f.flush()
+                if f.tell() > MEMORY_CONFIG["max_bytes"]:
+                    self._compact(f)
+
+    def _compact(self, f):
+        """
+        Deja en el fichero (ya bloqueado) solo los últimos turnos. Se trunca en el sitio en
+        lugar de sustituir el fichero para que otros procesos esperando el lock no escriban
+        en un fichero ya borrado.
+        """
+        turns = self._read_tail(f, MEMORY_CONFIG["keep_turns"])
+        f.truncate(0)
+        f.write("".join(json.dumps(turn, ensure_ascii=False) + "\n" for turn in turns).encode("utf-8"))
+        f.flush()
+
     def get_last_n_turns_str(self, n):
-        conversation = self.load_conversation()
+        with _conversation_lock(self.id):
+            self._migrate_legacy()
+            try:
+                with open(self.path, "rb") as f:
+                    self._lock_file(f, exclusive=False)
+                    turns = self._read_tail(f, n)
+            except FileNotFoundError:
+                turns = []
 
         formatted = ""
 
-        numbered_turns = {k: v for k, v in conversation.items() if k.startswith("turno_")}
-        sorted_turns = sorted(
-            numbered_turns.items(),
-            key=lambda x: int(x[0].split("_")[1])
-        )[-n:]
-
-        for _, turn in sorted_turns:
+        for turn in turns:
             user_q = turn["user"]["question"]
             agent_a = turn["agent"]["answer"]
             formatted += f"USER: {user_q}\nAGENT: {agent_a}\n"
@@ -0,0 +1,87 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from crewai.utilities.events import crewai_event_bus, LLMStreamChunkEvent
+
+# Marca con la que los agentes de CrewAI empiezan la respuesta final (lo anterior son
+# sus razonamientos internos, que no se envían al usuario)
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+
+class StageTimer:
+    """Mide la duración (ms) de cada etapa de una respuesta del chat."""
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def as_dict(self):
+        return {**self.timings, "total": round((time.perf_counter() - self.start) * 1000, 1)}
+
+
+class FinalAnswerFilter:
+    """Descarta los fragmentos del LLM hasta que empieza la respuesta final."""
+    def __init__(self):
+        self.buffer = ""
+        self.started = False
+
+    def feed(self, chunk):
+        if self.started:
+            return chunk
+        self.buffer += chunk
+        idx = self.buffer.find(FINAL_ANSWER_MARKER)
+        if idx == -1:
+            return ""
+        self.started = True
+        return self.buffer[idx + len(FINAL_ANSWER_MARKER):].lstrip()
+
+
+class CrewStreamRelay:
+    """
+    Reenvía a las peticiones en curso los fragmentos que emite el LLM en streaming.
+
+    CrewAI publica cada fragmento en su bus de eventos global desde el hilo que ejecuta
+    la crew; cada petición se suscribe con el id de la última tarea de su crew (la que
+    redacta la respuesta) y recibe sus fragmentos en una asyncio.Queue de su event loop.
+    """
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        crewai_event_bus.register_handler(LLMStreamChunkEvent, self._on_chunk)
+
+    def subscribe(self, task_id, loop, queue):
+        with self._lock:
+            self._subscribers[str(task_id)] = (loop, queue, FinalAnswerFilter())
+
+    def unsubscribe(self, task_id):
+        with self._lock:
+            self._subscribers.pop(str(task_id), None)
+
+    def _on_chunk(self, source, event):
+        if event.tool_call is not None or event.task_id is None:
+            return
+        with self._lock:
+            subscriber = self._subscribers.get(str(event.task_id))
+        if subscriber is None:
+            return
+        loop, queue, answer_filter = subscriber
+        text = answer_filter.feed(event.chunk)
+        if text:
+            loop.call_soon_threadsafe(queue.put_nowait, text)
+
+
+stream_relay = CrewStreamRelay()
+
+
+def sse_event(event, data):
+    """Formatea un mensaje Server-Sent Events."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
@@ -1,7 +1,11 @@
 import re
+import threading
+from collections import OrderedDict
 import pandas as pd
-from euroleague_api.boxscore_data import BoxScoreData
+from euroleague_api.utils import get_requests
 from crewai.tools import BaseTool
+from config import BOXSCORE_CACHE_DIR, BOXSCORE_CACHE_ENTRIES
+from etl.basic.api.cache import ResponseCache
 
 COL_MAP = {
     "Points": "PTS",
@@ -26,6 +30,30 @@ COL_MAP = {
     "Minutes": "MIN"
 }
 
+# Campos de la API usados en las estadísticas avanzadas: (nombre original, nombre renombrado)
+STAT_FIELDS = {
+    "pts": ("Points", "PTS"),
+    "fgm2": ("FieldGoalsMade2", "2PTM"),
+    "fga2": ("FieldGoalsAttempted2", "2PTA"),
+    "fgm3": ("FieldGoalsMade3", "3PTM"),
+    "fga3": ("FieldGoalsAttempted3", "3PTA"),
+    "ftm": ("FreeThrowsMade", "FTM"),
+    "fta": ("FreeThrowsAttempted", "FTA"),
+    "orb": ("OffensiveRebounds", "OR"),
+    "drb": ("DefensiveRebounds", "DR"),
+    "trb": ("TotalRebounds", "TR"),
+    "ast": ("Assistances", "AST"),
+    "tov": ("Turnovers", "TO"),
+    "stl": ("Steals", "ST"),
+    "blk": ("BlocksFavour", "BLK"),
+    "pf": ("FoulsCommited", "PF"),
+}
+
+BOXSCORE_URL = "https://live.euroleague.net/api/Boxscore"
+
+# Parte de la URL del game-center de Euroleague con la temporada y el código del partido
+GAME_URL_PATTERN = re.compile(r'/E(\d{4})/(\d{1,3})')
+
 def parse_url(url: str):
     """
     Extrae season y gamecode desde la URL de Euroleague.
@@ -33,137 +61,212 @@ def parse_url(url: str):
     https://www.euroleaguebasketball.net/es/euroleague/game-center/2023-24/real-madrid-panathinaikos-aktor-athens/E2023/333/
     -> season=2023, gamecode=333
     """
-    match = re.search(r'/E(\d{4})/(\d{1,3})', url)
+    match = GAME_URL_PATTERN.search(url)
     if not match:
         raise ValueError(f"No se pudo parsear season y gamecode de la URL: {url}")
     season = int(match.group(1))
     gamecode = int(match.group(2))
     return season, gamecode
 
-def compute_advanced_stats(row: pd.Series, opp_totals: pd.Series) -> pd.Series:
-    """
-    Calcula estadísticas avanzadas para una fila (jugador o totales).
-    """
-    try:
-        # Extraer básicos
-        pts = float(row.get("Points", row.get("PTS", 0)))
-        fgm2 = float(row.get("FieldGoalsMade2", row.get("2PTM", 0))); fga2 = float(row.get("FieldGoalsAttempted2", row.get("2PTA", 0)))
-        fgm3 = float(row.get("FieldGoalsMade3", row.get("3PTM", 0))); fga3 = float(row.get("FieldGoalsAttempted3", row.get("3PTA", 0)))
-        ftm = float(row.get("FreeThrowsMade", row.get("FTM", 0))); fta = float(row.get("FreeThrowsAttempted", row.get("FTA", 0)))
-        orb = float(row.get("OffensiveRebounds", row.get("OR", 0))); drb = float(row.get("DefensiveRebounds", row.get("DR", 0))); trb = float(row.get("TotalRebounds", row.get("TR", 0)))
-        ast = float(row.get("Assistances", row.get("AST", 0))); tov = float(row.get("Turnovers", row.get("TO", 0))); stl = float(row.get("Steals", row.get("ST", 0)))
-        blk = float(row.get("BlocksFavour", row.get("BLK", 0))); pf = float(row.get("FoulsCommited", row.get("PF", 0)))
-
-        # Del rival (totales)
-        opp_pts = float(opp_totals.get("Points", opp_totals.get("PTS", 0)))
-        opp_fga2 = float(opp_totals.get("FieldGoalsAttempted2", opp_totals.get("2PTA", 0)))
-        opp_fga3 = float(opp_totals.get("FieldGoalsAttempted3", opp_totals.get("3PTA", 0)))
-        opp_fta = float(opp_totals.get("FreeThrowsAttempted", opp_totals.get("FTA", 0)))
-        opp_to = float(opp_totals.get("Turnovers", opp_totals.get("TO", 0)))
-        opp_or = float(opp_totals.get("OffensiveRebounds", opp_totals.get("OR", 0))); opp_dr = float(opp_totals.get("DefensiveRebounds", opp_totals.get("DR", 0))); opp_tr = float(opp_totals.get("TotalRebounds", opp_totals.get("TR", 0)))
-        opp_tpa = float(opp_totals.get("FieldGoalsAttempted3", opp_totals.get("3PTA", 0))); opp_2pa = float(opp_totals.get("FieldGoalsAttempted2", opp_totals.get("2PTA", 0)))
-
-        # Calcular fgm y fga
-        fgm = fgm2 + fgm3
-        fga = fga2 + fga3
-        opp_fga = opp_fga2 + opp_fga3
-
-        # Posesiones estimadas
-        poss = fga + 0.44*fta - orb + tov
-        opp_poss = opp_fga + 0.44*opp_fta - opp_or + opp_to
-        poss = max(poss, 1)
-        opp_poss = max(opp_poss, 1)
-
-        # Advanced stats
-        stats = {
-            "2PT%": fgm2/fga2 if fga2 else 0,
-            "3PT%": fgm3/fga3 if fga3 else 0,
-            "FGM": fgm,
-            "FGA": fga,
-            "FG%": fgm/fga if fga else 0,
-            "FT%": ftm/fta if fta else 0,
-            "POSS": poss,
-            "PPP": pts/poss,
-            "ORTG": 100*pts/poss,
-            "DRTG": 100*opp_pts/opp_poss if row["Player"] in ["TOTALS", "TEAM ADVANCED"] else float('NaN'),
-            "NetRTG": (100*pts/poss) - (100*opp_pts/opp_poss) if row["Player"] in ["TOTALS", "TEAM ADVANCED"] else float('NaN'),
-            "eFG%": (fgm + 0.5*fgm3)/fga if fga else 0,
-            "TS%": pts / (2*(fga + 0.44*fta)) if (fga+0.44*fta) else 0,
-            "FT Ratio": fta/fga if fga else 0,
-            "TO%": tov/poss,
-            "AST%": ast/fgm if fgm else 0,
-            "AST/TO": ast/tov if tov else ast,
-            "OR%": orb / (orb + opp_dr) if (orb+opp_dr) else 0,
-            "DR%": drb / (drb + opp_or) if (drb+opp_or) else 0,
-            "TR%": trb / (trb + opp_tr) if (trb+opp_tr) else 0,
-            "ST%": stl/poss,
-            "BLK%": blk / opp_2pa if opp_2pa else 0,
-            "PF per 100 Poss": 100*pf/poss
-        }
-        return pd.Series(stats)
-    except (TypeError, ValueError):
-        # Manejar filas con datos no numéricos (e.g., 'DNP')
-        return pd.Series({
-            "POSS": float('NaN'),
-            "PPP": float('NaN'),
-            "ORTG": float('NaN'),
-            "DRTG": float('NaN'),
-            "NetRTG": float('NaN'),
-            "eFG%": float('NaN'),
-            "TS%": float('NaN'),
-            "FT Ratio": float('NaN'),
-            "TO%": float('NaN'),
-            "AST%": float('NaN'),
-            "AST/TO": float('NaN'),
-            "OR%": float('NaN'),
-            "DR%": float('NaN'),
-            "TR%": float('NaN'),
-            "ST%": float('NaN'),
-            "BLK%": float('NaN'),
-            "PF per 100 Poss": float('NaN')
-        })
+def _numeric_fields(df: pd.DataFrame):
+    """
+    Columnas de STAT_FIELDS como números (0 si la columna no existe) y máscara de las
+    filas con algún valor no numérico (p. ej. 'DNP'), cuyas estadísticas avanzadas son NaN.
+    """
+    values = {}
+    invalid = pd.Series(False, index=df.index)
+    for key, (name, alt) in STAT_FIELDS.items():
+        column = name if name in df.columns else alt
+        if column not in df.columns:
+            values[key] = pd.Series(0.0, index=df.index)
+            continue
+        numeric = pd.to_numeric(df[column], errors="coerce").astype(float)
+        invalid |= numeric.isna() & df[column].notna()
+        values[key] = numeric
+    return pd.DataFrame(values, index=df.index), invalid
 
 
-def get_boxscore_from_url(url: str):
+def _ratio(num, den, default=0.0):
+    """num/den, o default donde den es 0."""
+    return (num / den).where(den != 0, default)
+
+
+def _opponent_totals(df: pd.DataFrame, s: pd.DataFrame, invalid: pd.Series, team_column: str):
+    """Totales del rival de cada fila (y si son válidos) a partir de las filas Player == "TOTALS"."""
+    is_totals = df["Player"] == "TOTALS"
+    totals = s[is_totals].set_axis(df.loc[is_totals, team_column])
+    totals_invalid = invalid[is_totals].set_axis(totals.index)
+    teams = list(totals.index)
+    opponent = df[team_column].map({teams[0]: teams[1], teams[1]: teams[0]})
+    opp = totals.reindex(opponent).set_axis(df.index)
+    opp_invalid = totals_invalid.reindex(opponent).set_axis(df.index).fillna(True).astype(bool)
+    return opp, opp_invalid
+
+
+def advanced_stats(s: pd.DataFrame, opp: pd.DataFrame, is_team: pd.Series) -> pd.DataFrame:
     """
-    A partir de una URL de Game Center, devuelve un DataFrame completo con
-    estadísticas individuales y las estadísticas avanzadas del equipo.
+    Estadísticas avanzadas a partir de las columnas de STAT_FIELDS de cada fila (s) y de
+    los totales de su rival (opp). Sirve igual para un partido que para sumas de varios.
     """
-    season, gamecode = parse_url(url)
-    raw = BoxScoreData().get_boxscore_data(season, gamecode, "Stats")
+    # Calcular fgm y fga
+    fgm = s.fgm2 + s.fgm3
+    fga = s.fga2 + s.fga3
+    opp_fga = opp.fga2 + opp.fga3
+
+    # Posesiones estimadas
+    poss = (fga + 0.44*s.fta - s.orb + s.tov).clip(lower=1)
+    opp_poss = (opp_fga + 0.44*opp.fta - opp.orb + opp.tov).clip(lower=1)
+
+    # DRTG y NetRTG solo tienen sentido para las filas de equipo
+    ortg = 100*s.pts/poss
+    drtg = (100*opp.pts/opp_poss).where(is_team)
+
+    return pd.DataFrame({
+        "2PT%": _ratio(s.fgm2, s.fga2),
+        "3PT%": _ratio(s.fgm3, s.fga3),
+        "FGM": fgm,
+        "FGA": fga,
+        "FG%": _ratio(fgm, fga),
+        "FT%": _ratio(s.ftm, s.fta),
+        "POSS": poss,
+        "PPP": s.pts/poss,
+        "ORTG": ortg,
+        "DRTG": drtg,
+        "NetRTG": ortg - drtg,
+        "eFG%": _ratio(fgm + 0.5*s.fgm3, fga),
+        "TS%": _ratio(s.pts, 2*(fga + 0.44*s.fta)),
+        "FT Ratio": _ratio(s.fta, fga),
+        "TO%": s.tov/poss,
+        "AST%": _ratio(s.ast, fgm),
+        "AST/TO": _ratio(s.ast, s.tov, s.ast),
+        "OR%": _ratio(s.orb, s.orb + opp.drb),
+        "DR%": _ratio(s.drb, s.drb + opp.orb),
+        "TR%": _ratio(s.trb, s.trb + opp.trb),
+        "ST%": s.stl/poss,
+        "BLK%": _ratio(s.blk, opp.fga2),
+        "PF per 100 Poss": 100*s.pf/poss
+    }, index=s.index)
+
+
+def compute_advanced_stats(df: pd.DataFrame, team_column: str = "TEAM TOTAL") -> pd.DataFrame:
+    """
+    Calcula las estadísticas avanzadas de todas las filas (jugadores y totales) de los dos
+    equipos a la vez, con operaciones por columnas. df debe tener en team_column el equipo
+    de cada fila y una fila Player == "TOTALS" por equipo.
+    """
+    s, invalid = _numeric_fields(df)
+    opp, opp_invalid = _opponent_totals(df, s, invalid, team_column)
+    stats = advanced_stats(s, opp, df["Player"].isin(["TOTALS", "TEAM ADVANCED"]))
+    stats[(invalid | opp_invalid).to_numpy()] = float('NaN')
+    return stats
+
+
+def _minutes(column: pd.Series) -> pd.Series:
+    """Minutos jugados ("MM:SS") como número decimal."""
+    parts = column.astype(str).str.extract(r'^(\d+):(\d+)$').astype(float)
+    return parts[0] + parts[1] / 60
+
+
+def aggregate_boxscores(games: list):
+    """
+    Agrega los boxscores (salida de build_boxscore) de varios partidos: suma las estadísticas
+    básicas por equipo y por jugador, junto con las de sus rivales, y recalcula sobre esas
+    sumas las estadísticas avanzadas en una sola pasada por columnas.
+
+    Returns:
+        (DataFrame por equipo, DataFrame por jugador), con GP (partidos) y MIN (minutos totales).
+    """
+    rows, opps = [], []
+    for df in games:
+        s, invalid = _numeric_fields(df)
+        opp, opp_invalid = _opponent_totals(df, s, invalid, "Team")
+        valid = ~(invalid | opp_invalid)
+        rows.append(pd.concat([df.loc[valid, ["Team", "Player"]], _minutes(df.loc[valid, "MIN"]).rename("MIN"), s[valid]], axis=1))
+        opps.append(opp[valid])
+    if not rows:
+        return pd.DataFrame(), pd.DataFrame()
+
+    data = pd.concat(rows, ignore_index=True)
+    opp = pd.concat(opps, ignore_index=True).add_prefix("opp_")
+    data = pd.concat([data, opp], axis=1)
+    data["GP"] = 1
+
+    summed = data.groupby(["Team", "Player"], sort=False).sum(min_count=1).reset_index()
+    s = summed[list(STAT_FIELDS)]
+    opp = summed[opp.columns].rename(columns=lambda c: c[len("opp_"):])
+    is_team = summed["Player"] == "TOTALS"
+    totals = pd.concat([
+        summed[["Team", "Player", "GP", "MIN"]],
+        s.rename(columns={key: COL_MAP.get(name, name) for key, (name, _) in STAT_FIELDS.items()}),
+        advanced_stats(s, opp, is_team)
+    ], axis=1)
+
+    teams = totals[is_team].drop(columns=["Player"]).reset_index(drop=True)
+    players = totals[~is_team].reset_index(drop=True)
+    return teams, players
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
 
+
+def _get_response_cache():
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(BOXSCORE_CACHE_DIR)
+    return _response_cache
+
+
+def _boxscore_params(season: int, gamecode: int, competition: str = "E") -> dict:
+    return {"gamecode": gamecode, "seasoncode": f"{competition}{season}"}
+
+
+def is_final_game(season: int, gamecode: int, competition: str = "E") -> bool:
+    """
+    Indica si ya se ha descargado el boxscore del partido terminado (Live = False).
+    No llama a la API: un partido que aún no se ha pedido o que estaba en juego cuenta como no terminado.
+    """
+    return _get_response_cache().is_final(BOXSCORE_URL, _boxscore_params(season, gamecode, competition))
+
+
+def fetch_boxscore_stats(season: int, gamecode: int, competition: str = "E"):
+    """
+    Boxscore ("Stats") de un partido. Los partidos terminados no cambian, así que se
+    guardan en disco y se sirven sin volver a llamar a la API; los que están en juego
+    (Live) se piden siempre.
+    """
+    params = _boxscore_params(season, gamecode, competition)
+    cache = _get_response_cache()
+    data = cache.get(BOXSCORE_URL, params)
+    if data is None:
+        try:
+            data = get_requests(BOXSCORE_URL, params=params).json()
+        except ValueError as exc:
+            raise ValueError(f"Game code, {gamecode}, season {season}, did not return any data.") from exc
+        cache.put(BOXSCORE_URL, params, data, final=data.get("Live") is False)
+    return data["Stats"], data.get("Live") is False
+
+
+def build_boxscore(raw) -> pd.DataFrame:
+    """DataFrame con las estadísticas individuales y avanzadas de los dos equipos."""
     if not isinstance(raw, list) or len(raw) < 2:
         raise ValueError("El boxscore no tiene el formato esperado (lista con dos equipos).")
 
-    dfs = {}
+    dfs = []
     for item in raw:
         team_name = item.get("Team", "UNKNOWN").strip().upper()
         players = pd.DataFrame(item.get("PlayersStats", []))
         totals = pd.DataFrame([item.get("totr", {})])
-        
+
         # Concatenar jugadores + fila de totales para un único DataFrame
         df_team = pd.concat([players, totals.assign(Player="TOTALS")], ignore_index=True)
-        dfs[team_name] = df_team
-
-    teams = list(dfs.keys())
-    
-    # Calcular totales del oponente
-    opp_totals = {teams[i]: dfs[teams[1-i]][dfs[teams[1-i]]["Player"] == "TOTALS"].iloc[0] for i in range(2)}
-    
-    result_dfs = []
-    for team_name, df_team in dfs.items():
-        opp_total_row = opp_totals[team_name]
-        
-        advanced_stats_df = df_team.apply(lambda row: compute_advanced_stats(row, opp_total_row), axis=1)
-        df_team = pd.concat([df_team, advanced_stats_df], axis=1)
-
-        totals_row = df_team[df_team["Player"] == "TOTALS"].index[0]
-        df_team = df_team[df_team["Minutes"] != "DNP"].reset_index(drop=True)
-        
         df_team.insert(0, "TEAM TOTAL", team_name)
-        result_dfs.append(df_team)
+        dfs.append(df_team)
 
-    final_df = pd.concat(result_dfs, ignore_index=True)
+    df = pd.concat(dfs, ignore_index=True)
+    df = pd.concat([df, compute_advanced_stats(df)], axis=1)
+    final_df = df[df["Minutes"] != "DNP"].reset_index(drop=True)
 
     final_df = final_df.rename(columns=COL_MAP)
 
@@ -188,9 +291,65 @@ def get_boxscore_from_url(url: str):
     ]
 
     # Reordenar las columnas del DataFrame
-    final_df = final_df.reindex(columns=column_order)
+    return final_df.reindex(columns=column_order)
+
+
+class BoxScoreCache:
+    """
+    Caché LRU en memoria de los boxscores ya calculados de partidos terminados,
+    indexada por (season, gamecode).
+    """
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, season: int, gamecode: int) -> pd.DataFrame:
+        key = (season, gamecode)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key].copy()
+            self.misses += 1
+
+        raw, final = fetch_boxscore_stats(season, gamecode)
+        df = build_boxscore(raw)
+        if final:
+            with self._lock:
+                self._entries[key] = df
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return df.copy()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+boxscore_cache = BoxScoreCache(BOXSCORE_CACHE_ENTRIES)
+
 
-    return final_df.to_json()
+def get_boxscore(season: int, gamecode: int) -> pd.DataFrame:
+    """Boxscore con estadísticas avanzadas de un partido (cacheado si está terminado)."""
+    return boxscore_cache.get(season, gamecode)
+
+
+def get_boxscore_from_url(url: str):
+    """
+    A partir de una URL de Game Center, devuelve un DataFrame completo con
+    estadísticas individuales y las estadísticas avanzadas del equipo.
+    """
+    season, gamecode = parse_url(url)
+    return get_boxscore(season, gamecode).to_json()
 
 class BoxScoreTool(BaseTool):
     name: str = "BoxScoreTool"
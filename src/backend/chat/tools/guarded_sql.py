@@ -0,0 +1,171 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Union
+
+from crewai_tools import NL2SQLTool
+from pydantic import PrivateAttr
+from sqlalchemy import create_engine, text
+from config import NL2SQL_CONFIG
+
+# Literales y comentarios: se eliminan antes de buscar palabras prohibidas
+_LITERALS_AND_COMMENTS = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/", re.DOTALL)
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+READ_ONLY_START = {"select", "with", "values", "table"}
+FORBIDDEN_WORDS = re.compile(
+    r"\b(insert|update|delete|merge|upsert|drop|alter|create|truncate|grant|revoke|copy|vacuum|analyze|"
+    r"call|do|set|reset|lock|listen|notify|refresh|reindex|cluster|comment|prepare|execute|deallocate|"
+    r"discard|load|import|into)\b"
+)
+FORBIDDEN_FUNCTIONS = re.compile(
+    r"\b(pg_sleep\w*|pg_terminate_backend|pg_cancel_backend|pg_reload_conf|pg_read_\w+|pg_ls_dir|"
+    r"lo_import|lo_export|dblink\w*|set_config)\s*\("
+)
+
+
+class ReadOnlyViolation(ValueError):
+    pass
+
+
+def normalize_sql(sql_query: str) -> str:
+    """SQL sin comentarios, con espacios simples y sin punto y coma final (para la huella)."""
+    sql = _COMMENTS.sub(" ", sql_query)
+    return " ".join(sql.split()).rstrip("; ")
+
+
+def check_read_only(sql_query: str):
+    """Lanza ReadOnlyViolation si la consulta no es una única sentencia de lectura."""
+    code = _LITERALS_AND_COMMENTS.sub(" ", sql_query).lower()
+    statements = [s for s in code.split(";") if s.strip()]
+    if len(statements) != 1:
+        raise ReadOnlyViolation("Solo se permite una sentencia SQL por consulta.")
+    words = statements[0].split()
+    if words[0] not in READ_ONLY_START:
+        raise ReadOnlyViolation("Solo se permiten consultas de lectura (SELECT / WITH).")
+    match = FORBIDDEN_WORDS.search(statements[0]) or FORBIDDEN_FUNCTIONS.search(statements[0])
+    if match:
+        raise ReadOnlyViolation(f"Operación no permitida en una consulta de lectura: {match.group(1).upper()}.")
+
+
+class GuardedNL2SQLTool(NL2SQLTool):
+    """
+    NL2SQLTool con las consultas generadas por el LLM protegidas y cacheadas:
+
+    - Solo admite una sentencia de lectura, y además la ejecuta en una transacción
+      READ ONLY con statement_timeout, así que una consulta desbocada no bloquea la base
+      de datos para el resto de usuarios.
+    - Devuelve como mucho max_rows filas; si el resultado se recorta, añade al final un
+      aviso explícito para que el LLM no calcule totales ni rankings sobre datos parciales.
+    - Guarda los resultados por huella de la SQL normalizada y versión de datos.
+    - Mide cada consulta y conserva las más lentas para su análisis.
+    - Reutiliza un único engine de SQLAlchemy en lugar de crear uno por consulta.
+    """
+    max_rows: int = NL2SQL_CONFIG["max_rows"]
+    statement_timeout_ms: int = NL2SQL_CONFIG["statement_timeout_ms"]
+    slow_query_ms: int = NL2SQL_CONFIG["slow_query_ms"]
+    cache_entries: int = NL2SQL_CONFIG["cache_entries"]
+
+    _engine: Any = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _cache: Any = PrivateAttr(default_factory=OrderedDict)
+    _data_version: int = PrivateAttr(default=0)
+    _stats: Any = PrivateAttr(default_factory=lambda: {
+        "queries": 0, "cache_hits": 0, "rejected": 0, "errors": 0, "truncated": 0, "slow": 0, "total_ms": 0.0
+    })
+    _slow_queries: Any = PrivateAttr(default_factory=lambda: deque(maxlen=20))
+
+    def _get_engine(self):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = create_engine(self.db_uri, pool_pre_ping=True, pool_size=5, max_overflow=5)
+        return self._engine
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def execute_sql(self, sql_query: str) -> Union[list, str]:
+        try:
+            check_read_only(sql_query)
+        except ReadOnlyViolation:
+            self._count("rejected")
+            raise
+
+        normalized = normalize_sql(sql_query)
+        key = (hashlib.sha1(normalized.encode("utf-8")).hexdigest(), self._data_version)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._stats["cache_hits"] += 1
+                return self._with_notice(*self._cache[key])
+
+        start = time.perf_counter()
+        try:
+            with self._get_engine().connect() as conn:
+                with conn.begin():
+                    conn.execute(text("SET TRANSACTION READ ONLY"))
+                    conn.execute(text(f"SET LOCAL statement_timeout = {int(self.statement_timeout_ms)}"))
+                    result = conn.execute(text(sql_query.strip().rstrip(";")))
+                    if not result.returns_rows:
+                        return f"Query {sql_query} executed successfully"
+                    columns = list(result.keys())
+                    rows = result.fetchmany(self.max_rows + 1)
+        except Exception:
+            self._count("errors")
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._record_timing(normalized, elapsed_ms)
+
+        truncated = len(rows) > self.max_rows
+        if truncated:
+            rows = rows[:self.max_rows]
+            self._count("truncated")
+            print(f"NL2SQL: resultado truncado a {self.max_rows} filas.")
+        data = [dict(zip(columns, row)) for row in rows]
+
+        with self._lock:
+            self._cache[key] = (data, truncated)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return self._with_notice(data, truncated)
+
+    def _with_notice(self, data, truncated) -> list:
+        """Copia de las filas con el aviso de truncado como último elemento, si corresponde."""
+        if not truncated:
+            return list(data)
+        return list(data) + [{
+            "aviso": f"(resultado truncado a {self.max_rows} filas: hay más filas que no se muestran; "
+                     "los totales, medias o rankings calculados sobre estas filas serían incompletos. "
+                     "Calcúlalos en la consulta SQL con agregaciones, ORDER BY y LIMIT.)"
+        }]
+
+    def _record_timing(self, sql, elapsed_ms):
+        with self._lock:
+            self._stats["queries"] += 1
+            self._stats["total_ms"] += elapsed_ms
+            if elapsed_ms >= self.slow_query_ms:
+                self._stats["slow"] += 1
+                self._slow_queries.append({"sql": sql, "ms": round(elapsed_ms, 1), "at": time.time()})
+        if elapsed_ms >= self.slow_query_ms:
+            print(f"NL2SQL: consulta lenta ({elapsed_ms:.0f} ms): {sql}")
+
+    def invalidate_cache(self):
+        """Descarta los resultados cacheados (nueva versión de datos tras una carga del ETL)."""
+        with self._lock:
+            self._data_version += 1
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            executed = stats["queries"]
+            stats["avg_ms"] = round(stats.pop("total_ms") / executed, 1) if executed else None
+            stats["cached_results"] = len(self._cache)
+            stats["data_version"] = self._data_version
+            stats["slow_queries"] = list(self._slow_queries)
+        return stats
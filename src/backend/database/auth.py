@@ -0,0 +1,19 @@
+import hmac
+from typing import Optional
+
+from fastapi import Header, HTTPException
+from config import BACKEND_ADMIN_TOKEN
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """
+    Dependencia de los endpoints de mantenimiento (invalidar cachés, reconstruir índices):
+    exige la cabecera X-Admin-Token con el token compartido BACKEND_ADMIN_TOKEN. Si el
+    token no está configurado, los endpoints quedan deshabilitados.
+    """
+    if not BACKEND_ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="BACKEND_ADMIN_TOKEN no está configurado.")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, BACKEND_ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Token de administración no válido.")
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from config import CATALOGUE_CACHE_TTL, REPORT_CACHE_ENTRIES
+
+
+class _CacheEntry:
+    """Respuesta ya serializada junto con sus validadores HTTP."""
+    def __init__(self, body: bytes, etag: str, last_modified: float, expires_at: float):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+
+class CatalogueCache:
+    """
+    Caché en memoria con TTL para los listados de referencia (jugadores, equipos,
+    temporadas, nombres de estadísticas), que cambian solo cuando el ETL carga datos.
+
+    Cada entrada guarda el JSON ya serializado, su ETag (hash del contenido) y la fecha
+    de la última vez que cambió el contenido, para poder responder 304 a los clientes.
+
+    Con max_entries la caché queda acotada: al guardar se descartan las entradas caducadas
+    y, si sigue llena, las usadas hace más tiempo (LRU).
+    """
+    def __init__(self, ttl: int = CATALOGUE_CACHE_TTL, max_entries: int = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.version = 0
+
+    def get(self, key: str, loader) -> _CacheEntry:
+        """Devuelve la entrada de la clave, recargándola con loader() si ha caducado."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        payload = loader()
+        # jsonable_encoder: mismos tipos que una respuesta normal de FastAPI (Decimal, fechas...)
+        body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        # Si el contenido no ha cambiado se conserva la fecha de modificación anterior
+        last_modified = entry.last_modified if entry is not None and entry.etag == etag else now
+        new_entry = _CacheEntry(body, etag, last_modified, now + self.ttl)
+
+        # Los listados vacíos suelen venir de un error de base de datos: no se guardan
+        if any(payload.values()):
+            with self._lock:
+                self._entries[key] = new_entry
+                self._entries.move_to_end(key)
+                self._evict(now)
+        return new_entry
+
+    def _evict(self, now: float):
+        """Descarta las entradas caducadas y, si se supera max_entries, las menos usadas."""
+        if self.max_entries is None:
+            return
+        for key in [key for key, entry in self._entries.items() if entry.expires_at <= now]:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str = None):
+        """Descarta una entrada o, sin clave, toda la caché."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self.version += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "version": self.version,
+                "ttl": self.ttl,
+                "max_entries": self.max_entries,
+            }
+
+
+catalogue_cache = CatalogueCache()
+# Informes y rankings: una entrada por combinación de parámetros, por eso va acotada y aparte
+report_cache = CatalogueCache(max_entries=REPORT_CACHE_ENTRIES)
+
+
+def _not_modified(request: Request, entry: _CacheEntry) -> bool:
+    """Comprueba If-None-Match o, si no viene, If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or entry.etag in tags or f"W/{entry.etag}" in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(entry.last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def cached_response(request: Request, key: str, loader, cache: CatalogueCache = catalogue_cache) -> Response:
+    """
+    Sirve un listado desde la caché con ETag y Last-Modified, o un 304 si el cliente
+    ya tiene la versión actual.
+    """
+    entry = cache.get(key, loader)
+    headers = {
+        "ETag": entry.etag,
+        "Last-Modified": formatdate(entry.last_modified, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+    if _not_modified(request, entry):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -1,76 +1,256 @@
 import psycopg2
-import psycopg2.extras
-from config import ADVANCED_DB_CONFIG
-from typing import List, Dict
+from typing import List, Dict, Tuple, Union
+from backend.database.pool import get_cursor
 
 def get_all_players() -> List[Dict]:
     """
     Recupera una lista de todos los jugadores de la base de datos.
     """
-    conn = None
     try:
-        conn = psycopg2.connect(**ADVANCED_DB_CONFIG)
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        cur.execute("SELECT name FROM players ORDER BY name;")
-        players = [row['name'] for row in cur.fetchall()]
+        with get_cursor() as cur:
+            cur.execute("SELECT name FROM players ORDER BY name;")
+            players = [row['name'] for row in cur.fetchall()]
         return players
     except (Exception, psycopg2.DatabaseError) as error:
         print(f"Error al obtener los jugadores: {error}")
         return []
-    finally:
-        if conn is not None:
-            conn.close()
 
 def get_players_stats_names() -> List[str]:
     """
     Recupera una lista de todos los nombres de las estadísticas de los jugadores.
     """
-    conn = None
     try:
-        conn = psycopg2.connect(**ADVANCED_DB_CONFIG)
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        cur.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'player_stats';")
-        stats_names = [row['column_name'] for row in cur.fetchall()]
+        with get_cursor() as cur:
+            cur.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'player_stats';")
+            stats_names = [row['column_name'] for row in cur.fetchall()]
         return stats_names
     except (Exception, psycopg2.DatabaseError) as error:
         print(f"Error al obtener los nombres de las estadísticas de los jugadores: {error}")
         return []
-    finally:
-        if conn is not None:
-            conn.close()
 
 def get_all_teams() -> List[Dict]:
     """
     Recupera una lista de todos los equipos de la base de datos.
     """
-    conn = None
     try:
-        conn = psycopg2.connect(**ADVANCED_DB_CONFIG)
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        cur.execute("SELECT tm_name FROM teams ORDER BY tm_name;")
-        teams = [row['tm_name'] for row in cur.fetchall()]
+        with get_cursor() as cur:
+            cur.execute("SELECT tm_name FROM teams ORDER BY tm_name;")
+            teams = [row['tm_name'] for row in cur.fetchall()]
         return teams
     except (Exception, psycopg2.DatabaseError) as error:
         print(f"Error al obtener los equipos: {error}")
         return []
-    finally:
-        if conn is not None:
-            conn.close()
 
 def get_all_seasons() -> List[Dict]:
     """
     Recupera una lista de todas las temporadas de la base de datos.
     """
-    conn = None
     try:
-        conn = psycopg2.connect(**ADVANCED_DB_CONFIG)
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        cur.execute("SELECT season_id, season_name FROM seasons ORDER BY season_name;")
-        seasons = [{"id": row['season_id'], "name": row['season_name']} for row in cur.fetchall()]
+        with get_cursor() as cur:
+            cur.execute("SELECT season_id, season_name FROM seasons ORDER BY season_name;")
+            seasons = [{"id": row['season_id'], "name": row['season_name']} for row in cur.fetchall()]
         return seasons
     except (Exception, psycopg2.DatabaseError) as error:
         print(f"Error al obtener las temporadas: {error}")
         return []
-    finally:
-        if conn is not None:
-            conn.close()
\ No newline at end of file
+
+def get_data_version() -> Union[str, None]:
+    """
+    Identifica la última carga del ETL: la fecha más reciente en la que se recalcularon
+    season_averages o season_ranks. Sobrevive a los reinicios del backend, a diferencia
+    de un contador en memoria.
+    """
+    try:
+        with get_cursor() as cur:
+            cur.execute("""
+                SELECT GREATEST(
+                    (SELECT MAX(updated_at) FROM season_averages),
+                    (SELECT MAX(updated_at) FROM season_ranks)
+                ) AS version;
+            """)
+            row = cur.fetchone()
+        return row['version'].isoformat() if row and row['version'] else None
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Error al obtener la versión de los datos: {error}")
+        return None
+
+def get_season_averages(entity: str, season_id: str) -> Union[Dict, None]:
+    """
+    Recupera las medias de liga materializadas por el ETL para una temporada
+    ('player' o 'team'), con sus desviaciones típicas y percentiles.
+    """
+    try:
+        with get_cursor() as cur:
+            cur.execute("""
+                SELECT columns, sample_size, averages, stddevs, percentile_levels, percentiles
+                FROM season_averages
+                WHERE entity = %s AND season_id = %s;
+            """, (entity, season_id))
+            row = cur.fetchone()
+        return dict(row) if row else None
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Error al obtener las medias de temporada: {error}")
+        return None
+
+def season_averages_payload(season_id: str, summary: Dict, include_stddev: bool = False,
+                            include_percentiles: bool = False) -> Dict:
+    """
+    Construye la respuesta de los endpoints season_avg_stats a partir de una fila de
+    season_averages: las medias con el formato de siempre (avg_<columna>) y, si se piden,
+    los vectores de desviación típica y de percentiles.
+    """
+    columns = summary["columns"]
+    average_stats = {"season_id": season_id}
+    average_stats.update({f"avg_{col}": value for col, value in zip(columns, summary["averages"])})
+    payload = {"average_stats": average_stats, "sample_size": summary["sample_size"]}
+
+    if include_stddev:
+        payload["stddev_stats"] = dict(zip(columns, summary["stddevs"] or []))
+    if include_percentiles:
+        payload["percentile_stats"] = {
+            f"p{level}": dict(zip(columns, values))
+            for level, values in zip(summary["percentile_levels"] or [], summary["percentiles"] or [])
+        }
+    return payload
+
+SEASON_RANK_ALL = "all"
+
+# Fila de un jugador/equipo dentro de la fila de season_ranks de su ámbito: las matrices se
+# guardan por columnas ([columna][fila]), así que se recorta la columna i de cada una
+SEASON_RANK_SLICE = """
+    SELECT sr.scope, sr.columns, array_length(sr.names, 1) AS sample_size,
+           sr.names[i] AS name, sr.teams[i] AS tm_name,
+           sr.percentile_ranks[:][i:i] AS percentile_ranks, sr.z_scores[:][i:i] AS z_scores
+    FROM season_ranks sr, generate_subscripts(sr.names, 1) AS i
+"""
+
+SEASON_RANKS_FIELDS = ["scope", "columns", "sample_size", "percentile_ranks", "z_scores"]
+
+def get_season_ranks(entity: str, season_id: str, scope: str = SEASON_RANK_ALL) -> Union[Dict, None]:
+    """
+    Recupera la fila de season_ranks de una temporada y ámbito ('all' o un rol): columnas,
+    nombres, equipos y las matrices [columna][fila] de percentiles y z-scores.
+    """
+    try:
+        with get_cursor() as cur:
+            cur.execute("""
+                SELECT scope, columns, names, teams, percentile_ranks, z_scores
+                FROM season_ranks
+                WHERE entity = %s AND season_id = %s AND scope = %s;
+            """, (entity, season_id, scope))
+            row = cur.fetchone()
+        return dict(row) if row else None
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Error al obtener los rankings de temporada: {error}")
+        return None
+
+def get_entity_ranks(entity: str, season_id: str, name: str, tm_name: Union[str, None] = None,
+                     by_role: bool = False) -> Union[Dict, None]:
+    """
+    Recupera solo la fila de un jugador/equipo dentro de season_ranks, comparado con toda la
+    liga o, con by_role, con los de su mismo rol.
+    """
+    try:
+        with get_cursor() as cur:
+            cur.execute(SEASON_RANK_SLICE + """
+                WHERE sr.entity = %s AND sr.season_id = %s AND (sr.scope <> %s) = %s
+                  AND sr.names[i] = %s AND (%s::text IS NULL OR sr.teams[i] = %s)
+                LIMIT 1;
+            """, (entity, season_id, SEASON_RANK_ALL, by_role, name, tm_name, tm_name))
+            row = cur.fetchone()
+        return dict(row) if row else None
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Error al obtener los rankings de temporada: {error}")
+        return None
+
+def season_ranks_payload(ranks: Dict) -> Dict:
+    """
+    Percentiles y z-scores de un jugador/equipo por estadística, a partir de una fila
+    recortada de season_ranks.
+    """
+    columns = ranks["columns"]
+    return {
+        "scope": ranks["scope"],
+        "sample_size": ranks["sample_size"],
+        "percentile_ranks": dict(zip(columns, (values[0] for values in ranks["percentile_ranks"]))),
+        "z_scores": dict(zip(columns, (values[0] for values in ranks["z_scores"]))),
+    }
+
+# Tabla de estadísticas, columna de nombre y columnas de perfil de cada tipo de informe
+REPORT_ENTITIES = {
+    "player": ("player_stats", "name", ["name", "tm_name", "season_id", "role", "nat", "height", "age", "gp", "min", "w", "l", "w_pct"]),
+    "team": ("team_stats", "tm_name", ["tm_name", "season_id", "gp", "min", "w", "l"]),
+}
+
+SEASON_AVERAGES_FIELDS = ["columns", "sample_size", "averages", "stddevs", "percentile_levels", "percentiles"]
+
+def get_report_rows(entity: str, pairs: List[Tuple[str, str]],
+                    rank_by_role: bool = False) -> Union[List[Tuple[Dict, Union[Dict, None], Union[Dict, None]]], None]:
+    """
+    Recupera en una sola consulta las estadísticas de temporada de cada par (nombre, season_id),
+    en el orden pedido, junto con la fila de season_averages de su temporada y su fila de
+    season_ranks (None si la temporada no está materializada o la entidad no tiene ranking).
+    Con rank_by_role los jugadores se comparan con los de su mismo rol.
+    """
+    table, name_column, _ = REPORT_ENTITIES[entity]
+    averages_select = ", ".join(f"sa.{field} AS _sa_{field}" for field in SEASON_AVERAGES_FIELDS)
+    ranks_select = ", ".join(f"rk.{field} AS _rk_{field}" for field in SEASON_RANKS_FIELDS)
+    rank_scope = "s.role" if rank_by_role and entity == "player" else "%s"
+    rank_params = () if rank_by_role and entity == "player" else (SEASON_RANK_ALL,)
+    try:
+        with get_cursor() as cur:
+            cur.execute(f"""
+                SELECT s.*, {averages_select}, {ranks_select}
+                FROM unnest(%s::text[], %s::text[]) WITH ORDINALITY AS r(key, season_id, ord)
+                JOIN {table} s ON s.{name_column} = r.key AND s.season_id = r.season_id
+                LEFT JOIN season_averages sa ON sa.entity = %s AND sa.season_id = s.season_id
+                LEFT JOIN LATERAL ({SEASON_RANK_SLICE}
+                    WHERE sr.entity = %s AND sr.season_id = s.season_id AND sr.scope = {rank_scope}
+                      AND sr.names[i] = s.{name_column} AND sr.teams[i] = s.tm_name
+                    LIMIT 1
+                ) rk ON TRUE
+                ORDER BY r.ord;
+            """, ([name for name, _ in pairs], [season for _, season in pairs], entity, entity) + rank_params)
+            rows = cur.fetchall()
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Error al consultar la base de datos: {error}")
+        return None
+
+    results = []
+    for row in rows:
+        row = dict(row)
+        summary = {field: row.pop(f"_sa_{field}") for field in SEASON_AVERAGES_FIELDS}
+        ranks = {field: row.pop(f"_rk_{field}") for field in SEASON_RANKS_FIELDS}
+        results.append((
+            row,
+            summary if summary["columns"] is not None else None,
+            ranks if ranks["columns"] is not None else None,
+        ))
+    return results
+
+def report_payload(entity: str, rows: List[Tuple[Dict, Union[Dict, None], Union[Dict, None]]], compute_averages,
+                   include_stddev: bool = True, include_percentiles: bool = True) -> Dict:
+    """
+    Construye la respuesta de los endpoints /report: estadísticas, perfil y posición en la liga
+    (percentiles y z-scores, en rank_stats) de cada entidad y, si todas son de la misma
+    temporada, las medias de liga con sus desviaciones y percentiles.
+    Las temporadas no materializadas usan compute_averages(season_id), sin desviaciones ni percentiles.
+    """
+    _, _, profile_columns = REPORT_ENTITIES[entity]
+    stats = [row for row, _, _ in rows]
+    payload = {
+        f"{entity}_stats": stats,
+        "profiles": [{col: row.get(col) for col in profile_columns} for row in stats],
+        "rank_stats": [season_ranks_payload(ranks) if ranks else None for _, _, ranks in rows],
+        "average_stats": None,
+    }
+
+    seasons = {row["season_id"] for row in stats}
+    if len(seasons) == 1:
+        season_id = seasons.pop()
+        summary = rows[0][1]
+        if summary is not None:
+            payload.update(season_averages_payload(season_id, summary, include_stddev, include_percentiles))
+        else:
+            payload["average_stats"] = compute_averages(season_id)
+    return payload
@@ -1,36 +1,59 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Request
 from .database import get_all_players, get_players_stats_names, get_all_seasons, get_all_teams
+from backend.database.cache import catalogue_cache, report_cache, cached_response
+from backend.database.pool import get_pool_stats
+from backend.database.auth import require_admin_token
 
 router = APIRouter()
 
 @router.get("/players")
-def get_players():
+def get_players(request: Request):
     """
     Endpoint para obtener una lista de todos los nombres de jugadores.
     """
-    players = get_all_players()
-    return {"players": players}
+    return cached_response(request, "players", lambda: {"players": get_all_players()})
 
 @router.get("/player-stats-names")
-def get_player_stats_names():
+def get_player_stats_names(request: Request):
     """
     Endpoint para obtener una lista de todos los nombres de las estadísticas de los jugadores.
     """
-    stats_names = get_players_stats_names()
-    return {"player_stats_names": stats_names}
+    return cached_response(request, "player_stats_names", lambda: {"player_stats_names": get_players_stats_names()})
 
 @router.get("/teams")
-def get_teams():
+def get_teams(request: Request):
     """
     Endpoint para obtener una lista de todos los nombres de equipos.
     """
-    teams = get_all_teams()
-    return {"teams": teams}
+    return cached_response(request, "teams", lambda: {"teams": get_all_teams()})
 
 @router.get("/seasons")
-def get_seasons():
+def get_seasons(request: Request):
     """
     Endpoint para obtener una lista de todas las temporadas.
     """
-    seasons = get_all_seasons()
-    return {"seasons": seasons}
\ No newline at end of file
+    return cached_response(request, "seasons", lambda: {"seasons": get_all_seasons()})
+
+@router.post("/cache/invalidate", dependencies=[Depends(require_admin_token)])
+def invalidate_catalogue_cache():
+    """
+    Endpoint para vaciar la caché de listados y la de informes tras una carga de datos del ETL.
+    Requiere la cabecera X-Admin-Token.
+    """
+    catalogue_cache.invalidate()
+    report_cache.invalidate()
+    return {"success": True}
+
+@router.get("/cache-stats")
+def get_catalogue_cache_stats():
+    """
+    Endpoint para obtener las métricas de la caché de listados y de la de informes.
+    """
+    return {"cache_stats": catalogue_cache.stats(), "report_cache_stats": report_cache.stats()}
+
+@router.get("/pool-stats")
+def get_db_pool_stats():
+    """
+    Endpoint para obtener las métricas del pool de conexiones (uso, esperas y latencia de queries).
+    """
+    return {"pool_stats": get_pool_stats()}
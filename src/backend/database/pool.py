@@ -0,0 +1,194 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import psycopg2
+import psycopg2.extras
+import psycopg2.pool
+from config import ADVANCED_DB_CONFIG, DB_POOL_CONFIG
+
+
+class PoolTimeoutError(psycopg2.pool.PoolError):
+    """No se ha podido obtener una conexión del pool dentro del tiempo límite."""
+
+
+class PoolStats:
+    """
+    Métricas del pool: conexiones en uso, esperas de checkout y latencia de queries.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_timeouts = 0
+            self.checkout_wait_total = 0.0
+            self.checkout_wait_max = 0.0
+            self.in_use = 0
+            self.queries = 0
+            self.query_time_total = 0.0
+            self.query_time_max = 0.0
+            self.slow_queries = 0
+
+    def record_checkout(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.checkout_wait_total += wait
+            self.checkout_wait_max = max(self.checkout_wait_max, wait)
+
+    def record_checkin(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def record_query(self, elapsed: float) -> bool:
+        slow = elapsed * 1000 >= DB_POOL_CONFIG["slow_query_ms"]
+        with self._lock:
+            self.queries += 1
+            self.query_time_total += elapsed
+            self.query_time_max = max(self.query_time_max, elapsed)
+            if slow:
+                self.slow_queries += 1
+        return slow
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "minconn": DB_POOL_CONFIG["minconn"],
+                "maxconn": DB_POOL_CONFIG["maxconn"],
+                "in_use": self.in_use,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "checkout_wait_avg_ms": round(1000 * self.checkout_wait_total / self.checkouts, 3) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": round(1000 * self.checkout_wait_max, 3),
+                "queries": self.queries,
+                "query_avg_ms": round(1000 * self.query_time_total / self.queries, 3) if self.queries else 0.0,
+                "query_max_ms": round(1000 * self.query_time_max, 3),
+                "slow_queries": self.slow_queries,
+            }
+
+
+stats = PoolStats()
+
+
+class _TimedCursorMixin:
+    """Mide la latencia de cada execute() y la registra en las métricas del pool."""
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            elapsed = time.perf_counter() - start
+            if stats.record_query(elapsed):
+                sql = query.decode() if isinstance(query, bytes) else str(query)
+                print(f"Query lenta ({elapsed * 1000:.1f} ms): {' '.join(sql.split())[:200]}")
+
+
+class TimedCursor(_TimedCursorMixin, psycopg2.extensions.cursor):
+    pass
+
+
+class TimedDictCursor(_TimedCursorMixin, psycopg2.extras.DictCursor):
+    pass
+
+
+_pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+_slots: Optional[threading.BoundedSemaphore] = None
+_init_lock = threading.Lock()
+
+
+def init_pool():
+    """
+    Crea el pool de conexiones a la base de datos avanzada.
+    Se llama al arrancar la aplicación FastAPI; es idempotente.
+    """
+    global _pool, _slots
+    with _init_lock:
+        if _pool is not None:
+            return
+        _pool = psycopg2.pool.ThreadedConnectionPool(
+            DB_POOL_CONFIG["minconn"],
+            DB_POOL_CONFIG["maxconn"],
+            cursor_factory=TimedCursor,
+            **ADVANCED_DB_CONFIG
+        )
+        _slots = threading.BoundedSemaphore(DB_POOL_CONFIG["maxconn"])
+        stats.reset()
+        print(f"Pool de conexiones creado ({DB_POOL_CONFIG['minconn']}-{DB_POOL_CONFIG['maxconn']}).")
+
+
+def close_pool():
+    """Cierra todas las conexiones del pool. Se llama al parar la aplicación."""
+    global _pool, _slots
+    with _init_lock:
+        if _pool is None:
+            return
+        _pool.closeall()
+        _pool = None
+        _slots = None
+        print("Pool de conexiones cerrado.")
+
+
+@contextmanager
+def get_connection():
+    """
+    Presta una conexión del pool. Hace commit al salir sin errores y rollback
+    en caso contrario. Si el pool está lleno espera como máximo
+    DB_POOL_CONFIG['checkout_timeout'] segundos antes de lanzar PoolTimeoutError.
+    """
+    if _pool is None:
+        init_pool()
+    pool, slots = _pool, _slots
+
+    start = time.perf_counter()
+    if not slots.acquire(timeout=DB_POOL_CONFIG["checkout_timeout"]):
+        stats.record_timeout()
+        raise PoolTimeoutError("Tiempo de espera agotado al obtener una conexión del pool.")
+    try:
+        conn = pool.getconn()
+    except Exception:
+        slots.release()
+        raise
+    stats.record_checkout(time.perf_counter() - start)
+
+    broken = False
+    try:
+        yield conn
+        conn.commit()
+    except Exception as error:
+        broken = isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        if not conn.closed:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+        raise
+    finally:
+        pool.putconn(conn, close=broken or bool(conn.closed))
+        slots.release()
+        stats.record_checkin()
+
+
+@contextmanager
+def get_cursor(dict_cursor: bool = True):
+    """
+    Atajo para las consultas de solo lectura: presta una conexión y devuelve un cursor.
+    """
+    with get_connection() as conn:
+        cur = conn.cursor(cursor_factory=TimedDictCursor if dict_cursor else TimedCursor)
+        try:
+            yield cur
+        finally:
+            cur.close()
+
+
+def get_pool_stats() -> Dict:
+    """Devuelve las métricas actuales del pool."""
+    return stats.as_dict()
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from .chat.main import router as chat_router
 from .performance_prediction.main import router as pred_router
@@ -5,8 +6,22 @@ from .player_report.main import router as report_router
 from .team_report.main import router as team_report_router
 from .search_similar.main import router as search_similar
 from .database.main import router as db_router
+from .boxscore.main import router as boxscore_router
+from backend.chat.crew import crew_factory
+from backend.database.pool import init_pool, close_pool
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_pool()
+    try:
+        crew_factory.warm_up()
+    except Exception as e:
+        # Si falla (p. ej. sin configuración del LLM) se reintenta en la primera petición del chat
+        print(f"No se pudieron preparar las crews del chat: {e}")
+    yield
+    close_pool()
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(chat_router, prefix="/chat", tags=["Chat"])
 app.include_router(pred_router, prefix="/performance-prediction", tags=["Performance Prediction"])
@@ -14,6 +29,7 @@ app.include_router(report_router, prefix="/player-report", tags=["Player Report"
 app.include_router(team_report_router, prefix="/team-report", tags=["Team Report"])
 app.include_router(search_similar, prefix="/search-similar", tags=["Search Similar"])
 app.include_router(db_router, prefix="/database", tags=["Database"])
+app.include_router(boxscore_router, prefix="/boxscore", tags=["Boxscore"])
 
 @app.get("/health")
 def health_check():
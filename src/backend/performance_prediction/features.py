@@ -0,0 +1,77 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from config import FEATURE_TO_DB
+from backend.database.pool import get_cursor
+
+LINEUP_SIZE = 5
+
+
+def fetch_players_stats(player_season_pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict]:
+    """
+    Recupera en una única consulta las filas de player_stats de todos los pares
+    (jugador, temporada) distintos. Devuelve un diccionario indexado por el par.
+    """
+    pairs = tuple(dict.fromkeys((name, season) for name, season in player_season_pairs))
+    if not pairs:
+        return {}
+
+    with get_cursor() as cur:
+        cur.execute(
+            """
+            SELECT *
+            FROM player_stats
+            WHERE (name, season_id) IN %s
+            ORDER BY id;
+            """,
+            (pairs,)
+        )
+        rows = cur.fetchall()
+
+    stats = {}
+    for row in rows:
+        stats.setdefault((row['name'], row['season_id']), dict(row))
+    return stats
+
+
+def player_feature_matrix(players: List[Dict]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Construye la matriz (n_jugadores x n_columnas) con las columnas de player_stats
+    que usa el modelo. None/NaN se sustituyen por 0.0, igual que safe_num.
+    """
+    db_cols = list(dict.fromkeys(col for col in FEATURE_TO_DB.values() if col is not None))
+    frame = pd.DataFrame(players).reindex(columns=db_cols)
+    matrix = frame.apply(pd.to_numeric, errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+    return matrix, db_cols
+
+
+def lineup_feature_frame(player_matrix: np.ndarray, db_cols: List[str], lineups: np.ndarray, feature_columns: List[str]) -> pd.DataFrame:
+    """
+    Agrega las features _sum y _mean de muchos quintetos a la vez.
+
+    Args:
+        player_matrix: Salida de player_feature_matrix.
+        db_cols: Columnas de player_matrix.
+        lineups: Array (n_quintetos x 5) con índices de fila de player_matrix.
+        feature_columns: Columnas (y orden) que espera el modelo.
+    """
+    sums = player_matrix[lineups].sum(axis=1)
+    means = sums / LINEUP_SIZE
+
+    col_pos = {col: i for i, col in enumerate(db_cols)}
+    feature_pos = {col: i for i, col in enumerate(feature_columns)}
+    X = np.zeros((len(lineups), len(feature_columns)), dtype=np.float64)
+
+    for base_name, db_col in FEATURE_TO_DB.items():
+        if db_col is None:
+            continue
+        src = col_pos[db_col]
+        sum_key = f"{base_name}_sum"
+        mean_key = f"{base_name}_mean"
+        if sum_key in feature_pos:
+            X[:, feature_pos[sum_key]] = sums[:, src]
+        if mean_key in feature_pos:
+            X[:, feature_pos[mean_key]] = means[:, src]
+
+    return pd.DataFrame(X, columns=feature_columns)
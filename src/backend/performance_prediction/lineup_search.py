@@ -0,0 +1,78 @@
+from itertools import chain, combinations
+from typing import Dict, List, Optional
+
+import numpy as np
+from .features import LINEUP_SIZE, lineup_feature_frame
+
+MAX_ROSTER_SIZE = 20
+# Quintetos por llamada al modelo, para acotar la memoria de la matriz de features
+PREDICT_CHUNK_SIZE = 20000
+
+
+def enumerate_lineups(n_players: int, must_include: List[int]) -> np.ndarray:
+    """
+    Genera todos los quintetos posibles (n_quintetos x 5) de una plantilla de n_players
+    que contienen a los jugadores obligatorios.
+    """
+    must = sorted(set(must_include))
+    free = [i for i in range(n_players) if i not in must]
+    k = LINEUP_SIZE - len(must)
+    if k < 0 or k > len(free):
+        return np.empty((0, LINEUP_SIZE), dtype=np.intp)
+
+    combos = np.fromiter(chain.from_iterable(combinations(free, k)), dtype=np.intp)
+    combos = combos.reshape(-1, k) if k else np.empty((1, 0), dtype=np.intp)
+    if must:
+        fixed = np.broadcast_to(np.array(must, dtype=np.intp), (len(combos), len(must)))
+        combos = np.hstack([fixed, combos])
+    return combos
+
+
+def role_mask(lineups: np.ndarray, roles: List[Optional[str]], max_per_role: Optional[Dict[str, int]]) -> np.ndarray:
+    """
+    Devuelve la máscara de quintetos que respetan el máximo de jugadores por rol.
+    """
+    if not max_per_role or len(lineups) == 0:
+        return np.ones(len(lineups), dtype=bool)
+
+    constrained = list(max_per_role.keys())
+    one_hot = np.array([[role == r for r in constrained] for role in roles], dtype=np.int8)
+    counts = one_hot[lineups].sum(axis=1)
+    limits = np.array([max_per_role[r] for r in constrained])
+    return (counts <= limits).all(axis=1)
+
+
+def search_best_lineups(
+    player_matrix: np.ndarray,
+    db_cols: List[str],
+    roles: List[Optional[str]],
+    feature_columns: List[str],
+    model,
+    top_n: int = 10,
+    must_include: Optional[List[int]] = None,
+    max_per_role: Optional[Dict[str, int]] = None,
+) -> Dict:
+    """
+    Busca los top_n quintetos de la plantilla con mayor Net Rating predicho.
+
+    Enumera todas las combinaciones (15 jugadores -> 3003 quintetos), descarta las que
+    incumplen las restricciones de rol y puntúa el resto en lotes con el modelo.
+    """
+    lineups = enumerate_lineups(len(player_matrix), must_include or [])
+    total = len(lineups)
+    lineups = lineups[role_mask(lineups, roles, max_per_role)]
+
+    if len(lineups) == 0:
+        return {"lineups": np.empty((0, LINEUP_SIZE), dtype=np.intp), "scores": np.empty(0), "evaluated": 0, "total": total}
+
+    scores = np.empty(len(lineups), dtype=np.float64)
+    for start in range(0, len(lineups), PREDICT_CHUNK_SIZE):
+        chunk = lineups[start:start + PREDICT_CHUNK_SIZE]
+        X = lineup_feature_frame(player_matrix, db_cols, chunk, feature_columns)
+        scores[start:start + len(chunk)] = model.predict(X)
+
+    n = min(top_n, len(scores))
+    top = np.argpartition(-scores, n - 1)[:n]
+    top = top[np.argsort(-scores[top], kind='stable')]
+
+    return {"lineups": lineups[top], "scores": scores[top], "evaluated": len(lineups), "total": total}
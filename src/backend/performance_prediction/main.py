@@ -1,19 +1,21 @@
 import os
 import json
-import pandas as pd
 import psycopg2
-import psycopg2.extras
+import psycopg2.pool
 import joblib
 from fastapi import APIRouter, HTTPException
-from typing import List, Dict
+from pydantic import BaseModel, Field
+from typing import List, Dict, Tuple, Optional
 import numpy as np
-from config import ADVANCED_DB_CONFIG, FEATURE_TO_DB
+from .features import LINEUP_SIZE, fetch_players_stats, player_feature_matrix, lineup_feature_frame
+from .lineup_search import MAX_ROSTER_SIZE, search_best_lineups
 
 router = APIRouter()
 
 BASE_DIR = os.path.dirname(__file__)
 MODEL_PATH = os.path.join(BASE_DIR, "performance_model.pkl")
 FEATURE_COLUMNS_JSON = os.path.join(BASE_DIR, "feature_columns.json")
+MAX_BATCH_LINEUPS = 5000
 
 
 def load_feature_columns() -> List[str]:
@@ -33,18 +35,6 @@ def load_model():
     print("Modelo cargado correctamente.")
     return model
 
-def safe_num(x) -> float:
-    """
-    Convierte a float y sustituye None/NaN por 0.0
-    """
-    try:
-        v = float(x)
-        if np.isnan(v):
-            return 0.0
-        return v
-    except Exception:
-        return 0.0
-
 try:
     predictor_model = load_model()
     print("Modelo de predicción cargado correctamente.")
@@ -59,33 +49,54 @@ except Exception as e:
     print("Error loading feature columns")
     FEATURE_COLUMNS = None
 
-def get_player_stats_from_db(player_name: str, season_id: str) -> Dict:
+class PlayerSeason(BaseModel):
+    name: str
+    season_id: str
+
+class LineupBatchRequest(BaseModel):
+    lineups: List[List[PlayerSeason]] = Field(..., min_length=1, max_length=MAX_BATCH_LINEUPS)
+
+class LineupSearchRequest(BaseModel):
+    roster: List[PlayerSeason] = Field(..., min_length=LINEUP_SIZE, max_length=MAX_ROSTER_SIZE)
+    top_n: int = Field(10, ge=1, le=500)
+    must_include: List[PlayerSeason] = Field(default_factory=list, max_length=LINEUP_SIZE)
+    max_per_role: Optional[Dict[str, int]] = None
+
+def check_model_available():
+    if predictor_model is None:
+        raise HTTPException(status_code=503, detail="El modelo de predicción no está disponible.")
+    if FEATURE_COLUMNS is None:
+        raise HTTPException(status_code=503, detail="Las columnas de features no están disponibles.")
+
+def predict_lineups(lineups: List[List[Tuple[str, str]]]) -> Tuple[np.ndarray, np.ndarray, List[Tuple[str, str]]]:
     """
-    Recupera las estadísticas de un jugador de la base de datos avanzada.
+    Predice el Net Rating de muchos quintetos con una sola consulta a la base de datos
+    y una sola llamada al modelo.
+
+    Returns:
+        (predicciones, máscara de quintetos válidos, pares (jugador, temporada) no encontrados).
+        Las predicciones solo incluyen los quintetos válidos, en el mismo orden.
     """
-    conn = None
-    try:
-        conn = psycopg2.connect(**ADVANCED_DB_CONFIG)
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-
-        sql_query = """
-            SELECT *
-            FROM player_stats
-            WHERE name = %s AND season_id = %s;
-        """
-        cur.execute(sql_query, (player_name, season_id))
-        stats_row = cur.fetchone()
-
-        if stats_row:
-            return dict(stats_row)
-        else:
-            return None
-    except (Exception, psycopg2.DatabaseError) as error:
-        print(f"Error al consultar la base de datos: {error}")
-        return None
-    finally:
-        if conn is not None:
-            conn.close()
+    pairs = [pair for lineup in lineups for pair in lineup]
+    players_stats = fetch_players_stats(pairs)
+
+    keys = list(players_stats.keys())
+    key_pos = {key: i for i, key in enumerate(keys)}
+    missing = [pair for pair in dict.fromkeys(pairs) if pair not in key_pos]
+
+    valid = np.array([all(pair in key_pos for pair in lineup) for lineup in lineups], dtype=bool)
+    if not valid.any():
+        return np.empty(0), valid, missing
+
+    lineup_idx = np.array(
+        [[key_pos[pair] for pair in lineup] for lineup, ok in zip(lineups, valid) if ok],
+        dtype=np.intp
+    )
+    player_matrix, db_cols = player_feature_matrix([players_stats[key] for key in keys])
+    df_for_prediction = lineup_feature_frame(player_matrix, db_cols, lineup_idx, FEATURE_COLUMNS)
+
+    predictions = np.asarray(predictor_model.predict(df_for_prediction), dtype=np.float64)
+    return predictions, valid, missing
 
 @router.get("/predict")
 def predict_lineup_performance(
@@ -104,61 +115,131 @@ def predict_lineup_performance(
     Endpoint para predecir el rendimiento (Net Rating) de un quinteto usando
     el nuevo modelo que requiere features agregadas (_sum y _mean).
     """
-    if predictor_model is None:
-        raise HTTPException(status_code=503, detail="El modelo de predicción no está disponible.")
-    if FEATURE_COLUMNS is None:
-        raise HTTPException(status_code=503, detail="Las columnas de features no están disponibles.")
-
-    players_data = [
-        get_player_stats_from_db(player1_name, season1_id),
-        get_player_stats_from_db(player2_name, season2_id),
-        get_player_stats_from_db(player3_name, season3_id),
-        get_player_stats_from_db(player4_name, season4_id),
-        get_player_stats_from_db(player5_name, season5_id),
+    check_model_available()
+
+    lineup = [
+        (player1_name, season1_id),
+        (player2_name, season2_id),
+        (player3_name, season3_id),
+        (player4_name, season4_id),
+        (player5_name, season5_id),
     ]
 
-    if any(p is None for p in players_data):
+    try:
+        predictions, valid, _ = predict_lineups([lineup])
+    except (psycopg2.DatabaseError, psycopg2.pool.PoolError) as error:
+        print(f"Error al consultar la base de datos: {error}")
+        raise HTTPException(status_code=500, detail="Error al consultar la base de datos")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Error al realizar la predicción")
+
+    if not valid[0]:
         raise HTTPException(
             status_code=404,
             detail="No se encontraron datos para uno o más jugadores y temporadas seleccionadas."
         )
 
-    data_for_prediction = {col: 0.0 for col in FEATURE_COLUMNS}
+    return {
+        "predicted_net_rating": float(predictions[0]),
+        "lineup": [name for name, _ in lineup]
+    }
 
-    for base_name, db_col in FEATURE_TO_DB.items():
-        sum_key = f"{base_name}_sum"
-        mean_key = f"{base_name}_mean"
-        if sum_key not in data_for_prediction and mean_key not in data_for_prediction:
-            continue
+@router.post("/predict-batch")
+def predict_lineups_batch(request: LineupBatchRequest):
+    """
+    Endpoint para predecir el Net Rating de muchos quintetos en una sola llamada.
+    Los quintetos con algún jugador no encontrado se devuelven en 'invalid_lineups'.
+    """
+    check_model_available()
 
-        if db_col is None:
-            if sum_key in data_for_prediction:
-                data_for_prediction[sum_key] = 0.0
-            if mean_key in data_for_prediction:
-                data_for_prediction[mean_key] = 0.0
-            continue
+    if any(len(lineup) != LINEUP_SIZE for lineup in request.lineups):
+        raise HTTPException(status_code=400, detail=f"Cada quinteto debe tener exactamente {LINEUP_SIZE} jugadores.")
 
-        values = [safe_num(p.get(db_col, 0.0)) for p in players_data]
-        s = float(np.nansum(values))
-        m = s / 5.0 
+    lineups = [[(p.name, p.season_id) for p in lineup] for lineup in request.lineups]
 
-        if sum_key in data_for_prediction:
-            data_for_prediction[sum_key] = s
-        if mean_key in data_for_prediction:
-            data_for_prediction[mean_key] = m
+    try:
+        predictions, valid, missing = predict_lineups(lineups)
+    except (psycopg2.DatabaseError, psycopg2.pool.PoolError) as error:
+        print(f"Error al consultar la base de datos: {error}")
+        raise HTTPException(status_code=500, detail="Error al consultar la base de datos")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Error al realizar la predicción")
 
-    df_for_prediction = pd.DataFrame([data_for_prediction], columns=FEATURE_COLUMNS)
+    valid_idx = np.flatnonzero(valid)
+    results = [
+        {
+            "index": int(i),
+            "lineup": [name for name, _ in lineups[i]],
+            "predicted_net_rating": float(pred)
+        }
+        for i, pred in zip(valid_idx, predictions)
+    ]
 
-    for col in df_for_prediction.columns:
-        df_for_prediction[col] = pd.to_numeric(df_for_prediction[col], errors='coerce')
-    df_for_prediction = df_for_prediction.fillna(0.0)
+    return {
+        "predictions": results,
+        "invalid_lineups": np.flatnonzero(~valid).tolist(),
+        "missing_players": [{"name": name, "season_id": season} for name, season in missing]
+    }
+
+@router.post("/optimal-lineups")
+def find_optimal_lineups(request: LineupSearchRequest):
+    """
+    Endpoint para obtener los mejores quintetos (mayor Net Rating predicho) de una plantilla,
+    con restricciones opcionales de jugadores obligatorios y máximo de jugadores por rol.
+    """
+    check_model_available()
+
+    roster = list(dict.fromkeys((p.name, p.season_id) for p in request.roster))
+    if len(roster) < LINEUP_SIZE:
+        raise HTTPException(status_code=400, detail=f"La plantilla debe tener al menos {LINEUP_SIZE} jugadores distintos.")
+
+    must_include = list(dict.fromkeys((p.name, p.season_id) for p in request.must_include))
+    if any(pair not in roster for pair in must_include):
+        raise HTTPException(status_code=400, detail="Los jugadores obligatorios deben formar parte de la plantilla.")
 
     try:
-        prediction = predictor_model.predict(df_for_prediction)
+        players_stats = fetch_players_stats(roster)
+    except (psycopg2.DatabaseError, psycopg2.pool.PoolError) as error:
+        print(f"Error al consultar la base de datos: {error}")
+        raise HTTPException(status_code=500, detail="Error al consultar la base de datos")
+
+    missing = [pair for pair in roster if pair not in players_stats]
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "message": "No se encontraron datos para uno o más jugadores y temporadas seleccionadas.",
+                "missing_players": [{"name": name, "season_id": season} for name, season in missing]
+            }
+        )
+
+    rows = [players_stats[pair] for pair in roster]
+    player_matrix, db_cols = player_feature_matrix(rows)
+    roles = [row.get("role") for row in rows]
+
+    try:
+        result = search_best_lineups(
+            player_matrix,
+            db_cols,
+            roles,
+            FEATURE_COLUMNS,
+            predictor_model,
+            top_n=request.top_n,
+            must_include=[roster.index(pair) for pair in must_include],
+            max_per_role=request.max_per_role
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail="Error al realizar la predicción")
 
     return {
-        "predicted_net_rating": float(prediction[0]),
-        "lineup": [p['name'] for p in players_data]
+        "evaluated_lineups": int(result["evaluated"]),
+        "total_lineups": int(result["total"]),
+        "best_lineups": [
+            {
+                "lineup": [roster[i][0] for i in lineup],
+                "roles": [roles[i] for i in lineup],
+                "predicted_net_rating": float(score)
+            }
+            for lineup, score in zip(result["lineups"], result["scores"])
+        ]
     }
@@ -1,74 +1,111 @@
 import psycopg2
-import psycopg2.extras
 from typing import List, Dict, Tuple, Union
-from config import ADVANCED_DB_CONFIG
+from backend.database.database import (
+    get_season_averages, season_averages_payload, get_report_rows, report_payload,
+    get_season_ranks, get_entity_ranks, season_ranks_payload, SEASON_RANK_ALL,
+)
+from backend.database.pool import get_cursor
 
 def get_player_stats(player_season_pairs: List[Tuple[str, str]]) -> Union[List[Dict], None]:
     """
-    Recupera las estadísticas de temporada para uno o dos jugadores, 
+    Recupera las estadísticas de temporada para uno o dos jugadores,
     cada uno con su propia temporada.
-    
+
     Args:
         player_season_pairs: Lista de tuplas (nombre_jugador, season_id)
     """
-    conn = None
     try:
-        conn = psycopg2.connect(**ADVANCED_DB_CONFIG)
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-
         results = []
 
-        for player_name, season_id in player_season_pairs:
-            sql_get_stats = """
-                SELECT *
-                FROM player_stats ps
-                WHERE ps.name = %s AND ps.season_id = %s;
-            """
-            cur.execute(sql_get_stats, (player_name, season_id))
-            stats_rows = cur.fetchall()
+        with get_cursor() as cur:
+            for player_name, season_id in player_season_pairs:
+                sql_get_stats = """
+                    SELECT *
+                    FROM player_stats ps
+                    WHERE ps.name = %s AND ps.season_id = %s;
+                """
+                cur.execute(sql_get_stats, (player_name, season_id))
+                stats_rows = cur.fetchall()
 
-            for stats in stats_rows:
-                results.append(dict(stats))
+                for stats in stats_rows:
+                    results.append(dict(stats))
 
         return results if results else None
 
     except (Exception, psycopg2.DatabaseError) as error:
         print(f"Error al consultar la base de datos: {error}")
         return None
-    finally:
-        if conn is not None:
-            conn.close()
 
-def avg_player_stats(season_id):
+def get_player_report(player_season_pairs: List[Tuple[str, str]], include_stddev=True,
+                      include_percentiles=True, rank_by_role=False) -> Union[Dict, None]:
+    """
+    Informe completo de uno o dos jugadores con una sola consulta: estadísticas, perfil,
+    percentiles y z-scores en la liga (o en su rol, con rank_by_role) y, si son de la misma
+    temporada, medias de liga con desviaciones típicas y percentiles.
+    """
+    rows = get_report_rows('player', player_season_pairs, rank_by_role)
+    if not rows:
+        return None
+    return report_payload('player', rows, compute_avg_player_stats, include_stddev, include_percentiles)
+
+def season_player_ranks(season_id, player=None, team=None, by_role=False, role=None):
+    """
+    Percentiles y z-scores de jugadores materializados por el ETL.
+
+    Con player devuelve solo los de ese jugador (team desambigua si jugó en varios equipos),
+    comparado con toda la liga o, con by_role, con los de su rol. Sin player devuelve la tabla
+    completa por columnas de toda la liga o del rol indicado.
+    """
+    if player is not None:
+        ranks = get_entity_ranks('player', season_id, player, team, by_role)
+        if ranks is None:
+            return None
+        return {"season_id": season_id, "name": ranks["name"], "tm_name": ranks["tm_name"], **season_ranks_payload(ranks)}
+
+    ranks = get_season_ranks('player', season_id, role or SEASON_RANK_ALL)
+    return {"season_id": season_id, **ranks} if ranks else None
+
+def avg_player_stats(season_id, include_stddev=False, include_percentiles=False):
+    """
+    Devuelve las medias de todas las columnas numéricas de player_stats para una temporada dada.
+
+    Se leen de la tabla season_averages que materializa el ETL. Si la temporada aún no está
+    materializada se calculan al vuelo, sin desviaciones típicas ni percentiles.
+    """
+    summary = get_season_averages('player', season_id)
+    if summary is not None:
+        return season_averages_payload(season_id, summary, include_stddev, include_percentiles)
+
+    average_stats = compute_avg_player_stats(season_id)
+    return {"average_stats": average_stats} if average_stats else None
+
+def compute_avg_player_stats(season_id):
     """
     Calcula las medias de todas las columnas numéricas de player_stats para una temporada dada.
     """
-    conn = None
     try:
-        conn = psycopg2.connect(**ADVANCED_DB_CONFIG)
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        
-        cur.execute("""
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_name = 'player_stats'
-              AND data_type IN ('integer', 'double precision', 'real', 'numeric')
-              AND column_name NOT IN ('id', 'name', 'tm_name', 'role', 'nat', 'season_id');
-        """)
-        numeric_cols = [row[0] for row in cur.fetchall()]
-
-        avg_exprs = [f"AVG({col}) AS avg_{col}" for col in numeric_cols]
-        # min > 5 para eliminar outliers
-        sql = f"""
-            SELECT season_id, {', '.join(avg_exprs)}
-            FROM player_stats
-            WHERE season_id = %s AND min > 5
-            GROUP BY season_id
-        """
-
-        cur.execute(sql, (season_id,))
-        cols = [desc[0] for desc in cur.description]
-        rows = cur.fetchall()
+        with get_cursor() as cur:
+            cur.execute("""
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_name = 'player_stats'
+                  AND data_type IN ('integer', 'double precision', 'real', 'numeric')
+                  AND column_name NOT IN ('id', 'name', 'tm_name', 'role', 'nat', 'season_id');
+            """)
+            numeric_cols = [row[0] for row in cur.fetchall()]
+
+            avg_exprs = [f"AVG({col}) AS avg_{col}" for col in numeric_cols]
+            # min > 5 para eliminar outliers
+            sql = f"""
+                SELECT season_id, {', '.join(avg_exprs)}
+                FROM player_stats
+                WHERE season_id = %s AND min > 5
+                GROUP BY season_id
+            """
+
+            cur.execute(sql, (season_id,))
+            cols = [desc[0] for desc in cur.description]
+            rows = cur.fetchall()
         if rows:
             return dict(zip(cols, rows[0]))
         return None
@@ -76,6 +113,3 @@ def avg_player_stats(season_id):
     except (Exception, psycopg2.DatabaseError) as error:
         print(f"Error al consultar la base de datos: {error}")
         return None
-    finally:
-        if conn is not None:
-            conn.close()
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import Optional
-from .database import get_player_stats, avg_player_stats
+from .database import get_player_stats, avg_player_stats, get_player_report, season_player_ranks
+from backend.database.cache import report_cache, cached_response
+from backend.database.database import get_data_version
 
 router = APIRouter()
 
@@ -34,14 +36,80 @@ async def get_player_report_stats(
 
 @router.get("/season_avg_stats")
 async def get_season_average_stats(
-    season: str = Query(..., description="Temporada para la que se desean las estadísticas promedio")
+    season: str = Query(..., description="Temporada para la que se desean las estadísticas promedio"),
+    include_stddev: bool = Query(False, description="Incluir la desviación típica de cada estadística"),
+    include_percentiles: bool = Query(False, description="Incluir los percentiles 10, 25, 50, 75 y 90 de cada estadística"),
 ):
     """
     Endpoint para obtener estadísticas promedio de una temporada específica.
     """
-    avg_stats = avg_player_stats(season)
+    avg_stats = avg_player_stats(season, include_stddev, include_percentiles)
 
     if not avg_stats:
         raise HTTPException(status_code=404, detail="No se encontraron estadísticas para la temporada especificada.")
 
-    return {"average_stats": avg_stats}
\ No newline at end of file
+    return avg_stats
+
+@router.get("/season_ranks")
+def get_season_player_ranks(
+    request: Request,
+    season: str = Query(..., description="Temporada de los rankings"),
+    player: Optional[str] = Query(None, description="Jugador (si se omite, se devuelve la tabla completa)"),
+    team: Optional[str] = Query(None, description="Equipo del jugador, si jugó en varios"),
+    by_role: bool = Query(False, description="Comparar al jugador solo con los de su rol"),
+    role: Optional[str] = Query(None, description="Rol de la tabla completa (si se omite, toda la liga)"),
+):
+    """
+    Endpoint con los percentiles (0-100) y z-scores de cada estadística que precalcula el ETL.
+
+    Con player devuelve un diccionario por estadística para ese jugador; sin player, la tabla
+    completa por columnas (columns, names, teams y matrices [columna][fila]).
+    """
+    def load_ranks():
+        ranks = season_player_ranks(season, player, team, by_role, role)
+        if not ranks:
+            raise HTTPException(status_code=404, detail="No se encontraron rankings para la temporada o el jugador especificados.")
+        ranks["data_version"] = get_data_version()
+        return ranks
+
+    key = f"player_ranks:{season}:{player}:{team}:{by_role}:{role}"
+    return cached_response(request, key, load_ranks, report_cache)
+
+@router.get("/report")
+def get_player_report_composite(
+    request: Request,
+    player1: str = Query(..., description="Nombre del primer jugador"),
+    season1: str = Query(..., description="Temporada del primer jugador"),
+    player2: Optional[str] = Query(None, description="Nombre del segundo jugador"),
+    season2: Optional[str] = Query(None, description="Temporada del segundo jugador"),
+    include_stddev: bool = Query(True, description="Incluir la desviación típica de cada estadística"),
+    include_percentiles: bool = Query(True, description="Incluir los percentiles 10, 25, 50, 75 y 90 de cada estadística"),
+    rank_by_role: bool = Query(False, description="Calcular la posición de cada jugador solo entre los de su rol"),
+):
+    """
+    Endpoint con el informe completo en una sola llamada: estadísticas, perfil y posición en la
+    liga (rank_stats: percentiles y z-scores) de uno o dos jugadores y, si son de la misma
+    temporada, las medias de liga con desviaciones y percentiles.
+
+    La respuesta lleva ETag y data_version (cambia con cada carga del ETL), así que el
+    cliente puede cachearla y revalidarla con If-None-Match.
+    """
+    player_season_pairs = [(player1, season1)]
+
+    if player2 and season2:
+        player_season_pairs.append((player2, season2))
+    elif player2 or season2:
+        raise HTTPException(
+            status_code=400,
+            detail="Si proporcionas player2 o season2, debes proporcionar ambos."
+        )
+
+    def load_report():
+        report = get_player_report(player_season_pairs, include_stddev, include_percentiles, rank_by_role)
+        if not report:
+            raise HTTPException(status_code=404, detail="No se encontraron estadísticas para los jugadores o temporadas especificadas.")
+        report["data_version"] = get_data_version()
+        return report
+
+    key = f"player_report:{player_season_pairs}:{include_stddev}:{include_percentiles}:{rank_by_role}"
+    return cached_response(request, key, load_report, report_cache)
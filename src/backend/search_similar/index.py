@@ -0,0 +1,185 @@
+import time
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from config import PLAYER_MAP
+from backend.database.pool import get_connection, get_cursor
+
+EXCLUDE_COLS = ['id', 'name', 'tm_name', 'season_id', 'nat', 'gp', 'w', 'l', 'w_pct']
+
+# Cada cuánto (segundos) se comprueba si player_stats ha cambiado
+REFRESH_CHECK_SECONDS = 60
+
+# Permite recibir pesos tanto con el nombre de columna como con la etiqueta de PLAYER_MAP
+_LABEL_TO_COL = {label: col for col, label in PLAYER_MAP.items()}
+
+
+class _RoleGroup:
+    """
+    Matriz estandarizada (z-scores) de un subconjunto de jugadores.
+    """
+    def __init__(self, rows: np.ndarray, raw: np.ndarray):
+        self.rows = rows
+        mean = np.nanmean(raw, axis=0)
+        std = np.nanstd(raw, axis=0)
+        std[~np.isfinite(std) | (std == 0)] = 1.0
+        z = np.nan_to_num((raw - np.nan_to_num(mean)) / std)
+        self.z = z
+        self.z_sq = z * z
+        self.norms = np.sqrt(self.z_sq.sum(axis=1))
+        self.position = {int(r): i for i, r in enumerate(rows)}
+
+
+class _Snapshot:
+    """Estado inmutable del índice; se sustituye entero en cada reconstrucción."""
+    def __init__(self, metrics: List[str], meta: pd.DataFrame, keys: Dict[tuple, int], groups: Dict[Optional[str], _RoleGroup]):
+        self.metrics = metrics
+        self.meta = meta
+        self.keys = keys
+        self.groups = groups
+
+
+class SimilarityIndex:
+    """
+    Índice en memoria de player_stats para la búsqueda de jugadores similares.
+
+    Mantiene la matriz de métricas estandarizada (global y por rol) y la reconstruye
+    cuando cambia el contenido de la tabla, de forma que cada consulta es un único
+    producto matriz-vector más una selección top-k con argpartition.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature = None
+        self._last_check = 0.0
+        self._snapshot: Optional[_Snapshot] = None
+
+    def _current_signature(self):
+        with get_cursor(dict_cursor=False) as cur:
+            cur.execute("SELECT COUNT(*), MAX(id) FROM player_stats;")
+            return tuple(cur.fetchone())
+
+    def invalidate(self):
+        """Fuerza la reconstrucción del índice en la siguiente consulta."""
+        with self._lock:
+            self._signature = None
+            self._last_check = 0.0
+
+    def _build(self, signature):
+        with get_connection() as conn:
+            df = pd.read_sql("SELECT * FROM player_stats ORDER BY id", conn)
+
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        metrics = [col for col in numeric_cols if col not in EXCLUDE_COLS]
+        raw = df[metrics].to_numpy(dtype=np.float64)
+
+        meta = df[['name', 'season_id', 'tm_name', 'role']].reset_index(drop=True)
+        keys = {}
+        for i, (name, season) in enumerate(zip(meta['name'], meta['season_id'])):
+            keys.setdefault((name, season), i)
+
+        groups = {None: _RoleGroup(np.arange(len(df)), raw)}
+        for role, rows in meta.groupby('role', dropna=True).indices.items():
+            groups[role] = _RoleGroup(rows, raw[rows])
+
+        self._snapshot = _Snapshot(metrics, meta, keys, groups)
+        self._signature = signature
+        print(f"Índice de similitud construido ({len(df)} jugadores, {len(metrics)} métricas).")
+
+    def ensure_fresh(self):
+        """Reconstruye el índice si player_stats ha cambiado desde la última comprobación."""
+        now = time.monotonic()
+        if self._signature is not None and now - self._last_check < REFRESH_CHECK_SECONDS:
+            return
+        with self._lock:
+            if self._signature is not None and now - self._last_check < REFRESH_CHECK_SECONDS:
+                return
+            signature = self._current_signature()
+            if signature != self._signature:
+                self._build(signature)
+            self._last_check = time.monotonic()
+
+    @staticmethod
+    def _weight_vector(metrics: List[str], weights: Optional[Dict[str, float]]) -> Optional[np.ndarray]:
+        if not weights:
+            return None
+        normalized = {_LABEL_TO_COL.get(k, k): float(v) for k, v in weights.items()}
+        return np.array([normalized.get(col, 1.0) for col in metrics])
+
+    def query(
+        self,
+        player_name: str,
+        season_id: str,
+        same_role: bool = False,
+        weights: Optional[Dict[str, float]] = None,
+        k: int = 10,
+        target_season: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """
+        Devuelve los k jugadores más similares (similitud coseno sobre z-scores ponderados)
+        o None si el jugador base no existe.
+        """
+        self.ensure_fresh()
+        snapshot = self._snapshot
+        meta, groups = snapshot.meta, snapshot.groups
+
+        base_row = snapshot.keys.get((player_name, season_id))
+        if base_row is None:
+            return None
+        base_role = meta.at[base_row, 'role']
+
+        if not same_role:
+            group = groups[None]
+        else:
+            group = None if pd.isna(base_role) else groups.get(base_role)
+        if group is None:
+            # Sin rol no hay jugadores "del mismo rol" (como `s.role = NULL` en SQL)
+            return {"base_role": base_role, "results": []}
+        base_pos = group.position[base_row]
+
+        w = self._weight_vector(snapshot.metrics, weights)
+        base_vec = group.z[base_pos]
+        if w is None:
+            dots = group.z @ base_vec
+            norms = group.norms
+            base_norm = norms[base_pos]
+        else:
+            w_sq = w * w
+            dots = group.z @ (base_vec * w_sq)
+            norms = np.sqrt(group.z_sq @ w_sq)
+            base_norm = norms[base_pos]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sims = dots / (norms * base_norm)
+        sims = np.nan_to_num(sims, nan=0.0)
+
+        # Excluir todas las filas del jugador base en esa temporada (p. ej. traspasos a mitad
+        # de temporada) y filtrar por temporada si se pide
+        group_meta = meta.iloc[group.rows]
+        valid = ((group_meta['name'] != player_name) | (group_meta['season_id'] != season_id)).to_numpy()
+        if target_season:
+            valid &= (meta['season_id'].to_numpy()[group.rows] == target_season)
+        candidates = np.flatnonzero(valid)
+        if candidates.size == 0:
+            return {"base_role": base_role, "results": []}
+
+        k = min(k, candidates.size)
+        cand_sims = sims[candidates]
+        top = np.argpartition(-cand_sims, k - 1)[:k]
+        top = top[np.argsort(-cand_sims[top], kind='stable')]
+
+        results = []
+        for idx in top:
+            row = int(group.rows[candidates[idx]])
+            results.append({
+                "name": meta.at[row, 'name'],
+                "season_id": meta.at[row, 'season_id'],
+                "team_name": meta.at[row, 'tm_name'],
+                "similarity_score": round(float(cand_sims[idx]) * 100, 2)
+            })
+
+        return {"base_role": base_role, "results": results}
+
+
+similarity_index = SimilarityIndex()
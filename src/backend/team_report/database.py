@@ -1,73 +1,107 @@
 import psycopg2
-import psycopg2.extras
 from typing import List, Dict, Tuple, Union
-from config import ADVANCED_DB_CONFIG
+from backend.database.database import (
+    get_season_averages, season_averages_payload, get_report_rows, report_payload,
+    get_season_ranks, get_entity_ranks, season_ranks_payload, SEASON_RANK_ALL,
+)
+from backend.database.pool import get_cursor
 
 def get_team_stats(team_season_pairs: List[Tuple[str, str]]) -> Union[List[Dict], None]:
     """
-    Recupera las estadísticas de temporada para uno o dos equipos, 
+    Recupera las estadísticas de temporada para uno o dos equipos,
     cada uno con su propia temporada.
-    
+
     Args:
         team_season_pairs: Lista de tuplas (nombre_equipo, season_id)
     """
-    conn = None
     try:
-        conn = psycopg2.connect(**ADVANCED_DB_CONFIG)
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-
         results = []
 
-        for team_name, season_id in team_season_pairs:
-            sql_get_stats = """
-                SELECT *
-                FROM team_stats ts
-                WHERE ts.tm_name = %s AND ts.season_id = %s;
-            """
-            cur.execute(sql_get_stats, (team_name, season_id))
-            stats_rows = cur.fetchall()
+        with get_cursor() as cur:
+            for team_name, season_id in team_season_pairs:
+                sql_get_stats = """
+                    SELECT *
+                    FROM team_stats ts
+                    WHERE ts.tm_name = %s AND ts.season_id = %s;
+                """
+                cur.execute(sql_get_stats, (team_name, season_id))
+                stats_rows = cur.fetchall()
 
-            for stats in stats_rows:
-                results.append(dict(stats))
+                for stats in stats_rows:
+                    results.append(dict(stats))
 
         return results if results else None
 
     except (Exception, psycopg2.DatabaseError) as error:
         print(f"Error al consultar la base de datos: {error}")
         return None
-    finally:
-        if conn is not None:
-            conn.close()
 
-def avg_team_stats(season_id):
+def get_team_report(team_season_pairs: List[Tuple[str, str]], include_stddev=True,
+                    include_percentiles=True) -> Union[Dict, None]:
+    """
+    Informe completo de uno o dos equipos con una sola consulta: estadísticas, perfil,
+    percentiles y z-scores en la liga y, si son de la misma temporada, medias de liga con
+    desviaciones típicas y percentiles.
+    """
+    rows = get_report_rows('team', team_season_pairs)
+    if not rows:
+        return None
+    return report_payload('team', rows, compute_avg_team_stats, include_stddev, include_percentiles)
+
+def season_team_ranks(season_id, team=None):
+    """
+    Percentiles y z-scores de equipos materializados por el ETL: los de un equipo o, sin
+    team, la tabla completa por columnas de la temporada.
+    """
+    if team is not None:
+        ranks = get_entity_ranks('team', season_id, team)
+        if ranks is None:
+            return None
+        return {"season_id": season_id, "tm_name": ranks["tm_name"], **season_ranks_payload(ranks)}
+
+    ranks = get_season_ranks('team', season_id)
+    return {"season_id": season_id, **ranks} if ranks else None
+
+def avg_team_stats(season_id, include_stddev=False, include_percentiles=False):
+    """
+    Devuelve las medias de todas las columnas numéricas de team_stats para una temporada dada.
+
+    Se leen de la tabla season_averages que materializa el ETL. Si la temporada aún no está
+    materializada se calculan al vuelo, sin desviaciones típicas ni percentiles.
+    """
+    summary = get_season_averages('team', season_id)
+    if summary is not None:
+        return season_averages_payload(season_id, summary, include_stddev, include_percentiles)
+
+    average_stats = compute_avg_team_stats(season_id)
+    return {"average_stats": average_stats} if average_stats else None
+
+def compute_avg_team_stats(season_id):
     """
     Calcula las medias de todas las columnas numéricas de team_stats para una temporada dada.
     """
-    conn = None
     try:
-        conn = psycopg2.connect(**ADVANCED_DB_CONFIG)
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        
-        cur.execute("""
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_name = 'team_stats'
-              AND data_type IN ('integer', 'double precision', 'real', 'numeric')
-              AND column_name NOT IN ('id', 'name', 'tm_name', 'role', 'nat', 'season_id');
-        """)
-        numeric_cols = [row[0] for row in cur.fetchall()]
-
-        avg_exprs = [f"AVG({col}) AS avg_{col}" for col in numeric_cols]
-        sql = f"""
-            SELECT season_id, {', '.join(avg_exprs)}
-            FROM team_stats
-            WHERE season_id = %s
-            GROUP BY season_id
-        """
-
-        cur.execute(sql, (season_id,))
-        cols = [desc[0] for desc in cur.description]
-        rows = cur.fetchall()
+        with get_cursor() as cur:
+            cur.execute("""
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_name = 'team_stats'
+                  AND data_type IN ('integer', 'double precision', 'real', 'numeric')
+                  AND column_name NOT IN ('id', 'name', 'tm_name', 'role', 'nat', 'season_id');
+            """)
+            numeric_cols = [row[0] for row in cur.fetchall()]
+
+            avg_exprs = [f"AVG({col}) AS avg_{col}" for col in numeric_cols]
+            sql = f"""
+                SELECT season_id, {', '.join(avg_exprs)}
+                FROM team_stats
+                WHERE season_id = %s
+                GROUP BY season_id
+            """
+
+            cur.execute(sql, (season_id,))
+            cols = [desc[0] for desc in cur.description]
+            rows = cur.fetchall()
         if rows:
             return dict(zip(cols, rows[0]))
         return None
@@ -75,6 +109,3 @@ def avg_team_stats(season_id):
     except (Exception, psycopg2.DatabaseError) as error:
         print(f"Error al consultar la base de datos: {error}")
         return None
-    finally:
-        if conn is not None:
-            conn.close()
\ No newline at end of file
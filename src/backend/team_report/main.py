@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import Optional
-from .database import get_team_stats, avg_team_stats
+from .database import get_team_stats, avg_team_stats, get_team_report, season_team_ranks
+from backend.database.cache import report_cache, cached_response
+from backend.database.database import get_data_version
 
 router = APIRouter()
 
@@ -34,14 +36,76 @@ async def get_team_report_stats(
 
 @router.get("/season_avg_stats")
 async def get_season_average_stats(
-    season: str = Query(..., description="Temporada para la que se desean las estadísticas promedio")
+    season: str = Query(..., description="Temporada para la que se desean las estadísticas promedio"),
+    include_stddev: bool = Query(False, description="Incluir la desviación típica de cada estadística"),
+    include_percentiles: bool = Query(False, description="Incluir los percentiles 10, 25, 50, 75 y 90 de cada estadística"),
 ):
     """
     Endpoint para obtener estadísticas promedio de una temporada específica.
     """
-    avg_stats = avg_team_stats(season)
+    avg_stats = avg_team_stats(season, include_stddev, include_percentiles)
 
     if not avg_stats:
         raise HTTPException(status_code=404, detail="No se encontraron estadísticas para la temporada especificada.")
 
-    return {"average_stats": avg_stats}
\ No newline at end of file
+    return avg_stats
+
+@router.get("/season_ranks")
+def get_season_team_ranks(
+    request: Request,
+    season: str = Query(..., description="Temporada de los rankings"),
+    team: Optional[str] = Query(None, description="Equipo (si se omite, se devuelve la tabla completa)"),
+):
+    """
+    Endpoint con los percentiles (0-100) y z-scores de cada estadística que precalcula el ETL.
+
+    Con team devuelve un diccionario por estadística para ese equipo; sin team, la tabla
+    completa por columnas (columns, names, teams y matrices [columna][fila]).
+    """
+    def load_ranks():
+        ranks = season_team_ranks(season, team)
+        if not ranks:
+            raise HTTPException(status_code=404, detail="No se encontraron rankings para la temporada o el equipo especificados.")
+        ranks["data_version"] = get_data_version()
+        return ranks
+
+    key = f"team_ranks:{season}:{team}"
+    return cached_response(request, key, load_ranks, report_cache)
+
+@router.get("/report")
+def get_team_report_composite(
+    request: Request,
+    team1: str = Query(..., description="Nombre del primer equipo"),
+    season1: str = Query(..., description="Temporada del primer equipo"),
+    team2: Optional[str] = Query(None, description="Nombre del segundo equipo"),
+    season2: Optional[str] = Query(None, description="Temporada del segundo equipo"),
+    include_stddev: bool = Query(True, description="Incluir la desviación típica de cada estadística"),
+    include_percentiles: bool = Query(True, description="Incluir los percentiles 10, 25, 50, 75 y 90 de cada estadística"),
+):
+    """
+    Endpoint con el informe completo en una sola llamada: estadísticas, perfil y posición en la
+    liga (rank_stats: percentiles y z-scores) de uno o dos equipos y, si son de la misma
+    temporada, las medias de liga con desviaciones y percentiles.
+
+    La respuesta lleva ETag y data_version (cambia con cada carga del ETL), así que el
+    cliente puede cachearla y revalidarla con If-None-Match.
+    """
+    team_season_pairs = [(team1, season1)]
+
+    if team2 and season2:
+        team_season_pairs.append((team2, season2))
+    elif team2 or season2:
+        raise HTTPException(
+            status_code=400,
+            detail="Si proporcionas team2 o season2, debes proporcionar ambos."
+        )
+
+    def load_report():
+        report = get_team_report(team_season_pairs, include_stddev, include_percentiles)
+        if not report:
+            raise HTTPException(status_code=404, detail="No se encontraron estadísticas para los equipos o temporadas especificadas.")
+        report["data_version"] = get_data_version()
+        return report
+
+    key = f"team_report:{team_season_pairs}:{include_stddev}:{include_percentiles}"
+    return cached_response(request, key, load_report, report_cache)
@@ -5,11 +5,50 @@ load_dotenv()
 
 BACKEND_URL = "http://localhost:8000"
 
+# Cliente HTTP del frontend (src/frontend/utils/api.py)
+FRONTEND_API_CONFIG = {
+    "timeout": float(os.getenv("FRONTEND_API_TIMEOUT", "30")),
+    "retries": int(os.getenv("FRONTEND_API_RETRIES", "3")),
+    "backoff": float(os.getenv("FRONTEND_API_BACKOFF", "0.5")),
+    "pool_size": int(os.getenv("FRONTEND_API_POOL_SIZE", "10")),
+    # Segundos durante los que se reutiliza una respuesta cacheada sin revalidarla
+    "cache_ttl": int(os.getenv("FRONTEND_API_CACHE_TTL", "300")),
+    "cache_entries": int(os.getenv("FRONTEND_API_CACHE_ENTRIES", "500")),
+}
+
+# Modelos de datos de los dashboards memoizados (src/frontend/utils/dashboard_model.py)
+DASHBOARD_MODEL_ENTRIES = int(os.getenv("DASHBOARD_MODEL_ENTRIES", "32"))
+# Secciones de dashboard (figuras serializadas) cacheadas por selección y pestaña
+DASHBOARD_SECTION_ENTRIES = int(os.getenv("DASHBOARD_SECTION_ENTRIES", "200"))
+
 API_KEY = os.getenv("API_KEY")
 BASE_URL = "https://api.sportradar.com/basketball/trial/v2"
 LOCALE = "en"
 LLM_MODEL = os.getenv("LLM_MODEL")
 
+# Límites de la API de SportRadar (la cuenta trial permite 1 petición por segundo)
+SPORTRADAR_CONFIG = {
+    "requests_per_second": float(os.getenv("SPORTRADAR_QPS", "1")),
+    "burst": int(os.getenv("SPORTRADAR_BURST", "1")),
+    "max_workers": int(os.getenv("SPORTRADAR_MAX_WORKERS", "4")),
+    # Peticiones simultáneas por tipo de endpoint
+    "endpoint_concurrency": {
+        "competitions": 1,
+        "seasons": 1,
+        "sport_events": int(os.getenv("SPORTRADAR_MAX_WORKERS", "4")),
+    },
+    "max_retries": 5,
+    "backoff_base": 2.0,
+    "backoff_cap": 60.0,
+    "timeout": 30,
+}
+
+# Caché en disco de las respuestas de SportRadar
+SPORTRADAR_CACHE_DIR = os.getenv("SPORTRADAR_CACHE_DIR", os.path.join(os.path.dirname(__file__), "etl/basic/cache"))
+
+# Filas que acumula el ETL básico antes de escribirlas en una única transacción
+ETL_BATCH_SIZE = int(os.getenv("ETL_BATCH_SIZE", "1000"))
+
 LEAGUE_URNS = {
     "Euroleague": "sr:competition:138",
     # "Eurocup": "sr:competition:141",
@@ -35,6 +74,55 @@ ADVANCED_DB_CONFIG = {
     "host": "localhost"
 }
 
+# Pool de conexiones del backend (FastAPI)
+DB_POOL_CONFIG = {
+    "minconn": int(os.getenv("DB_POOL_MIN", "1")),
+    "maxconn": int(os.getenv("DB_POOL_MAX", "10")),
+    "checkout_timeout": float(os.getenv("DB_POOL_TIMEOUT", "5")),
+    "slow_query_ms": float(os.getenv("DB_SLOW_QUERY_MS", "500")),
+}
+
+# Token compartido de los endpoints de mantenimiento del backend (cabecera X-Admin-Token);
+# el ETL lo envía al pedir que se invaliden las cachés. Sin token, esos endpoints no se aceptan.
+BACKEND_ADMIN_TOKEN = os.getenv("BACKEND_ADMIN_TOKEN")
+
+# Segundos que el backend guarda en memoria los listados de /database
+CATALOGUE_CACHE_TTL = int(os.getenv("CATALOGUE_CACHE_TTL", "600"))
+# Máximo de informes y rankings (/report, /season_ranks) que se guardan en memoria
+REPORT_CACHE_ENTRIES = int(os.getenv("REPORT_CACHE_ENTRIES", "512"))
+
+# Caché de respuestas del chat
+CHAT_CACHE_CONFIG = {
+    "max_entries": int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "1000")),
+    "ttl": int(os.getenv("CHAT_CACHE_TTL", str(7 * 24 * 3600))),
+    # Modelo de sentence-transformers para reconocer paráfrasis (opcional; sin él solo hay coincidencia exacta)
+    "embedding_model": os.getenv("CHAT_CACHE_EMBEDDING_MODEL"),
+    "similarity_threshold": float(os.getenv("CHAT_CACHE_SIMILARITY", "0.92")),
+}
+
+# Consultas SQL generadas por el LLM (rama general del chat)
+NL2SQL_CONFIG = {
+    "statement_timeout_ms": int(os.getenv("NL2SQL_STATEMENT_TIMEOUT_MS", "10000")),
+    "max_rows": int(os.getenv("NL2SQL_MAX_ROWS", "500")),
+    "cache_entries": int(os.getenv("NL2SQL_CACHE_ENTRIES", "256")),
+    "slow_query_ms": int(os.getenv("NL2SQL_SLOW_QUERY_MS", "1000")),
+}
+
+# Boxscores de Euroleague de la rama boxscore del chat: respuestas de partidos terminados
+# en disco y boxscores ya calculados en memoria
+BOXSCORE_CACHE_DIR = os.getenv("BOXSCORE_CACHE_DIR", os.path.join(os.path.dirname(__file__), "backend/chat/cache/boxscore"))
+BOXSCORE_CACHE_ENTRIES = int(os.getenv("BOXSCORE_CACHE_ENTRIES", "128"))
+# Descargas simultáneas de boxscores en /boxscore/batch
+BOXSCORE_MAX_WORKERS = int(os.getenv("BOXSCORE_MAX_WORKERS", "6"))
+
+# Memoria de las conversaciones del chat (un JSONL por conversación)
+MEMORY_CONFIG = {
+    "dir": os.getenv("CHAT_MEMORY_DIR", "memory"),
+    # Al superar este tamaño el fichero se compacta conservando los últimos keep_turns turnos
+    "max_bytes": int(os.getenv("CHAT_MEMORY_MAX_BYTES", str(1024 * 1024))),
+    "keep_turns": int(os.getenv("CHAT_MEMORY_KEEP_TURNS", "200")),
+}
+
 CSV_FILES = {
     '24_25_teams': os.path.join(os.path.dirname(__file__), 'etl/advanced/data/24-25_Teams.csv'),
     '24_25_players': os.path.join(os.path.dirname(__file__), 'etl/advanced/data/24-25_Players.csv'),
@@ -1,7 +1,11 @@
+import io
+import os
+import sys
 import pandas as pd
 import psycopg2
-import os
-from config import ADVANCED_DB_CONFIG, CSV_FILES
+import psycopg2.extras
+import requests
+from config import ADVANCED_DB_CONFIG, BACKEND_URL, BACKEND_ADMIN_TOKEN, CSV_FILES
 
 def create_advanced_database_and_tables():
     conn = None
@@ -274,6 +278,34 @@ def create_advanced_database_and_tables():
                 opp_to_pct_net FLOAT,
                 opp_ft_ratio_net FLOAT
             )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS season_averages (
+                entity VARCHAR(10) NOT NULL,
+                season_id VARCHAR(10) REFERENCES seasons(season_id),
+                columns TEXT[] NOT NULL,
+                sample_size INTEGER NOT NULL,
+                averages DOUBLE PRECISION[] NOT NULL,
+                stddevs DOUBLE PRECISION[],
+                percentile_levels INTEGER[],
+                percentiles DOUBLE PRECISION[][],
+                updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (entity, season_id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS season_ranks (
+                entity VARCHAR(10) NOT NULL,
+                season_id VARCHAR(10) REFERENCES seasons(season_id),
+                scope VARCHAR(50) NOT NULL,
+                columns TEXT[] NOT NULL,
+                names TEXT[] NOT NULL,
+                teams TEXT[] NOT NULL,
+                percentile_ranks REAL[][] NOT NULL,
+                z_scores REAL[][] NOT NULL,
+                updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (entity, season_id, scope)
+            )
             """
         ]
 
@@ -289,36 +321,305 @@ def create_advanced_database_and_tables():
         if conn:
             conn.close()
 
-def clean_and_load_data():
+SEASONS_TO_INSERT = ["2023-24", "2024-25"]
+
+# Clave natural de cada tabla de estadísticas, usada para que las recargas sean idempotentes
+STATS_KEYS = {
+    'team_stats': ['tm_name', 'season_id'],
+    'player_stats': ['name', 'season_id', 'tm_name'],
+}
+
+def season_from_key(key):
+    return '20' + key.split('_')[0] + '-' + key.split('_')[1]
+
+def clean_dataframe(df, key):
+    """Normaliza los valores numéricos de un CSV y filtra los jugadores sin impacto."""
+    # Limpiar datos numéricos y reemplazar "-" por NaN
+    for col in df.select_dtypes(include='object').columns.difference(['tm_name', 'name', 'role', 'nat']):
+        df[col] = df[col].replace("-", None)
+        df[col] = df[col].astype(str).str.replace(',', '.', regex=False)
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    # Diferenciar: stats -> NaN=0, atributos -> mantener NaN
+    stats_cols = [c for c in df.columns if c not in ['tm_name', 'name', 'role', 'nat', 'height', 'age']]
+    df[stats_cols] = df[stats_cols].fillna(0)
+
+    if 'players' in key:
+        # Filtrar jugadores sin impacto
+        if 'gp' in df.columns and 'min' in df.columns:
+            df = df[(df['gp'] > 3) & (df['min'] > 10)]
+
+    return df
+
+def table_column_types(cur, table):
+    """Devuelve {columna: tipo} de una tabla según information_schema."""
+    cur.execute(
+        "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = %s;",
+        (table,)
+    )
+    return {name: data_type for name, data_type in cur.fetchall()}
+
+def copy_dataframe(cur, table, df, columns):
+    """Vuelca las columnas indicadas de un DataFrame en una tabla mediante COPY."""
+    buffer = io.StringIO()
+    df[columns].to_csv(buffer, index=False, header=False, na_rep='\\N')
+    buffer.seek(0)
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+        buffer
+    )
+
+def stage_and_upsert_stats(cur, table, df):
+    """
+    Carga un DataFrame en una tabla de estadísticas a través de una tabla temporal:
+    COPY a la tabla de staging, borrado de las filas existentes con la misma clave
+    natural e INSERT ... SELECT. Así una recarga del mismo CSV no duplica filas.
+    """
+    column_types = table_column_types(cur, table)
+    columns = [c for c in df.columns if c in column_types and c != 'id']
+
+    df = df.copy()
+    for col in columns:
+        if column_types[col] in ('integer', 'bigint', 'smallint'):
+            df[col] = pd.to_numeric(df[col], errors='coerce').round().astype('Int64')
+
+    staging = f"staging_{table}"
+    cur.execute(
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS SELECT {', '.join(columns)} FROM {table} WITH NO DATA;"
+    )
+    copy_dataframe(cur, staging, df, columns)
+
+    key_match = ' AND '.join(f"t.{k} IS NOT DISTINCT FROM s.{k}" for k in STATS_KEYS[table])
+    cur.execute(f"DELETE FROM {table} t USING {staging} s WHERE {key_match};")
+    deleted = cur.rowcount
+    cur.execute(
+        f"INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(columns)} FROM {staging};"
+    )
+    return cur.rowcount, deleted
+
+def bulk_load_file(conn, key, df, season_year):
+    """Carga un CSV ya limpio en una única transacción."""
+    with conn:
+        with conn.cursor() as cur:
+            if 'teams' in key:
+                teams = df[['tm_name']].drop_duplicates().assign(season_id=season_year)
+                psycopg2.extras.execute_values(
+                    cur,
+                    "INSERT INTO teams (tm_name, season_id) VALUES %s ON CONFLICT (tm_name) DO NOTHING;",
+                    list(teams.itertuples(index=False, name=None))
+                )
+                inserted, replaced = stage_and_upsert_stats(cur, 'team_stats', df.assign(season_id=season_year))
+
+            elif 'players' in key:
+                players = df.drop_duplicates('name')[['name', 'role', 'nat', 'height', 'age', 'tm_name']].assign(season_id=season_year)
+                players = players.astype(object).where(players.notna(), None)
+                psycopg2.extras.execute_values(
+                    cur,
+                    """
+                    INSERT INTO players (name, role, nat, height, age, tm_name, season_id)
+                    VALUES %s
+                    ON CONFLICT (name) DO NOTHING;
+                    """,
+                    list(players.itertuples(index=False, name=None))
+                )
+                inserted, replaced = stage_and_upsert_stats(cur, 'player_stats', df.assign(season_id=season_year))
+
+            else:
+                return
+
+    print(f"{key}: {inserted} filas cargadas ({replaced} reemplazadas).")
+
+# Medias de liga materializadas por temporada: entidad -> (tabla, filtro de filas)
+SEASON_AVERAGE_SOURCES = {
+    'player': ('player_stats', 'min > 5'),  # min > 5 para eliminar outliers
+    'team': ('team_stats', None),
+}
+SEASON_AVERAGE_EXCLUDED = ['id', 'name', 'tm_name', 'role', 'nat', 'season_id']
+NUMERIC_TYPES = ('integer', 'double precision', 'real', 'numeric')
+PERCENTILE_LEVELS = [10, 25, 50, 75, 90]
+
+def _nullable(values):
+    """Convierte un vector de pandas en una lista de floats con None en lugar de NaN."""
+    return [None if pd.isna(v) else float(v) for v in values]
+
+def load_season_stats(cur, table, row_filter, keys):
+    """
+    Lee las columnas numéricas de una tabla de estadísticas (en el orden de la tabla) junto
+    con las columnas clave pedidas. Devuelve (columnas numéricas, DataFrame).
+    """
+    column_types = table_column_types(cur, table)
+    cur.execute(
+        "SELECT column_name FROM information_schema.columns WHERE table_name = %s ORDER BY ordinal_position;",
+        (table,)
+    )
+    columns = [
+        row[0] for row in cur.fetchall()
+        if column_types[row[0]] in NUMERIC_TYPES and row[0] not in SEASON_AVERAGE_EXCLUDED
+    ]
+
+    where = f"WHERE {row_filter}" if row_filter else ""
+    cur.execute(f"SELECT {', '.join(keys + columns)} FROM {table} {where};")
+    return columns, pd.DataFrame(cur.fetchall(), columns=keys + columns)
+
+def refresh_season_averages(conn):
+    """
+    Recalcula la tabla season_averages: por entidad y temporada guarda, en el orden de
+    las columnas de la tabla de origen, la media, la desviación típica y los percentiles
+    de cada estadística numérica. El backend la consulta por clave primaria.
+    """
+    with conn:
+        with conn.cursor() as cur:
+            for entity, (table, row_filter) in SEASON_AVERAGE_SOURCES.items():
+                columns, df = load_season_stats(cur, table, row_filter, ['season_id'])
+
+                rows = []
+                for season_id, group in df.groupby('season_id'):
+                    values = group[columns].astype(float)
+                    quantiles = values.quantile([level / 100 for level in PERCENTILE_LEVELS])
+                    rows.append((
+                        entity, season_id, columns, len(group),
+                        _nullable(values.mean()),
+                        _nullable(values.std()),
+                        PERCENTILE_LEVELS,
+                        [_nullable(quantiles.loc[level / 100]) for level in PERCENTILE_LEVELS],
+                    ))
+
+                cur.execute("DELETE FROM season_averages WHERE entity = %s;", (entity,))
+                if rows:
+                    psycopg2.extras.execute_values(
+                        cur,
+                        """
+                        INSERT INTO season_averages (
+                            entity, season_id, columns, sample_size, averages, stddevs,
+                            percentile_levels, percentiles
+                        ) VALUES %s;
+                        """,
+                        rows
+                    )
+                print(f"Medias de temporada ({entity}): {len(rows)} temporadas.")
+
+# Rankings por temporada: entidad -> (columna de nombre, columna de rol o None)
+SEASON_RANK_KEYS = {
+    'player': ('name', 'role'),
+    'team': ('tm_name', None),
+}
+SEASON_RANK_ALL = 'all'  # ámbito con toda la liga; el resto de ámbitos son roles
+
+def _rank_matrix(values):
+    """Matriz [columna][fila] con None en lugar de NaN, redondeada a 4 decimales."""
+    matrix = values.round(4).astype(object).where(values.notna(), None)
+    return matrix.T.values.tolist()
+
+def season_rank_row(entity, season_id, scope, columns, group, name_column):
+    """
+    Percentil (0-100, proporción de la liga con un valor menor o igual) y z-score de cada
+    estadística de un grupo, guardados por columnas: una matriz [columna][fila] alineada con
+    los vectores names/teams.
+    """
+    values = group[columns].astype(float)
+    percentile_ranks = values.rank(method='max', pct=True) * 100
+    # Columnas constantes: std = 0 y el z-score no está definido
+    std = values.std().replace(0, float('nan'))
+    z_scores = (values - values.mean()) / std
+    return (
+        entity, season_id, scope, columns,
+        group[name_column].tolist(), group['tm_name'].tolist(),
+        _rank_matrix(percentile_ranks), _rank_matrix(z_scores),
+    )
+
+def refresh_season_ranks(conn):
+    """
+    Recalcula la tabla season_ranks: por entidad, temporada y ámbito (toda la liga o, en
+    jugadores, cada rol) guarda el percentil y el z-score de cada estadística numérica de
+    cada jugador/equipo. Usa la misma población que season_averages (jugadores con min > 5),
+    así que los z-scores son coherentes con las medias y desviaciones de liga.
+    """
+    with conn:
+        with conn.cursor() as cur:
+            for entity, (table, row_filter) in SEASON_AVERAGE_SOURCES.items():
+                name_column, role_column = SEASON_RANK_KEYS[entity]
+                keys = list(dict.fromkeys(key for key in ['season_id', name_column, 'tm_name', role_column] if key))
+                columns, df = load_season_stats(cur, table, row_filter, keys)
+
+                rows = []
+                for season_id, group in df.groupby('season_id'):
+                    rows.append(season_rank_row(entity, season_id, SEASON_RANK_ALL, columns, group, name_column))
+                    if role_column:
+                        for role, role_group in group.groupby(role_column):
+                            rows.append(season_rank_row(entity, season_id, role, columns, role_group, name_column))
+
+                cur.execute("DELETE FROM season_ranks WHERE entity = %s;", (entity,))
+                if rows:
+                    psycopg2.extras.execute_values(
+                        cur,
+                        """
+                        INSERT INTO season_ranks (
+                            entity, season_id, scope, columns, names, teams, percentile_ranks, z_scores
+                        ) VALUES %s;
+                        """,
+                        rows,
+                        template="(%s, %s, %s, %s, %s, %s, %s::real[], %s::real[])"
+                    )
+                print(f"Rankings de temporada ({entity}): {len(rows)} grupos.")
+
+# Endpoints del backend que guardan datos en memoria y deben invalidarse tras una carga
+BACKEND_INVALIDATION_ENDPOINTS = [
+    "/database/cache/invalidate",
+    "/search-similar/refresh-index",
+    "/chat/cache/invalidate",
+]
+
+def notify_backend():
+    """Avisa al backend (si está levantado) de que hay datos nuevos."""
+    if not BACKEND_ADMIN_TOKEN:
+        print("Aviso: BACKEND_ADMIN_TOKEN no está configurado; no se notifica al backend.")
+        return
+    headers = {"X-Admin-Token": BACKEND_ADMIN_TOKEN}
+    for endpoint in BACKEND_INVALIDATION_ENDPOINTS:
+        try:
+            requests.post(f"{BACKEND_URL}{endpoint}", headers=headers, timeout=5).raise_for_status()
+        except requests.exceptions.RequestException:
+            print(f"Aviso: no se pudo notificar al backend ({endpoint}).")
+
+def clean_and_load_data(bulk=True):
+    """
+    Carga los CSV en la base de datos avanzada.
+
+    Args:
+        bulk: Si es True (por defecto) cada fichero se carga con COPY en una sola transacción
+            y las recargas son idempotentes. Si es False se usa la inserción fila a fila.
+    """
     conn = psycopg2.connect(**ADVANCED_DB_CONFIG)
-    conn.autocommit = True
+    conn.autocommit = not bulk
     cur = conn.cursor()
 
-    seasons_to_insert = ["2023-24", "2024-25"]
-    for season in seasons_to_insert:
-        cur.execute(
-            """
-            INSERT INTO seasons (season_id, season_name)
-            VALUES (%s, %s)
-            ON CONFLICT (season_id) DO NOTHING;
-            """,
-            (season, season)
-        )
+    if bulk:
+        with conn:
+            psycopg2.extras.execute_values(
+                cur,
+                "INSERT INTO seasons (season_id, season_name) VALUES %s ON CONFLICT (season_id) DO NOTHING;",
+                [(season, season) for season in SEASONS_TO_INSERT]
+            )
+    else:
+        for season in SEASONS_TO_INSERT:
+            cur.execute(
+                """
+                INSERT INTO seasons (season_id, season_name)
+                VALUES (%s, %s)
+                ON CONFLICT (season_id) DO NOTHING;
+                """,
+                (season, season)
+            )
 
     for key, file_path in CSV_FILES.items():
         if os.path.exists(file_path):
             df = pd.read_csv(file_path, delimiter=';')
-            season_year = '20' + key.split('_')[0] + '-' + key.split('_')[1]
+            season_year = season_from_key(key)
+            df = clean_dataframe(df, key)
 
-            # Limpiar datos numéricos y reemplazar "-" por NaN
-            for col in df.select_dtypes(include='object').columns.difference(['tm_name', 'name', 'role', 'nat']):
-                df[col] = df[col].replace("-", None)
-                df[col] = df[col].astype(str).str.replace(',', '.', regex=False)
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # Diferenciar: stats -> NaN=0, atributos -> mantener NaN
-            stats_cols = [c for c in df.columns if c not in ['tm_name', 'name', 'role', 'nat', 'height', 'age']]
-            df[stats_cols] = df[stats_cols].fillna(0)
+            if bulk:
+                bulk_load_file(conn, key, df, season_year)
+                continue
 
             if 'teams' in key:
                 # Insertar equipos
@@ -347,10 +648,6 @@ def clean_and_load_data():
                     )
             
             elif 'players' in key:
-                # Filtrar jugadores sin impacto
-                if 'gp' in df.columns and 'min' in df.columns:
-                    df = df[(df['gp'] > 3) & (df['min'] > 10)]
-
                 # Insertar jugadores
                 for _, row in df.iterrows():
                     cur.execute(
@@ -380,9 +677,13 @@ def clean_and_load_data():
             print(f"Advertencia: El archivo {file_path} no fue encontrado.")
 
     cur.close()
+    conn.autocommit = False
+    refresh_season_averages(conn)
+    refresh_season_ranks(conn)
     conn.close()
     print("Datos cargados exitosamente.")
+    notify_backend()
 
 if __name__ == '__main__':
     create_advanced_database_and_tables()
-    clean_and_load_data()
\ No newline at end of file
+    clean_and_load_data(bulk='--row-by-row' not in sys.argv)
\ No newline at end of file
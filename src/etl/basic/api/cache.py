@@ -0,0 +1,79 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+class ResponseCache:
+    """
+    Caché en disco de respuestas de la API, direccionada por contenido.
+
+    - objects/<hash del contenido>.json.gz guarda cada respuesta distinta una sola vez.
+    - refs/<hash de la petición>.json apunta al último contenido recibido para esa
+      petición e indica si es definitivo (p. ej. un partido cerrado), en cuyo caso
+      se puede servir sin volver a llamar a la API.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.refs_dir = os.path.join(cache_dir, "refs")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.refs_dir, exist_ok=True)
+
+    @staticmethod
+    def request_key(endpoint, params=None):
+        """Hash de la petición (endpoint + parámetros, sin la api_key)."""
+        clean = {k: v for k, v in (params or {}).items() if k != "api_key"}
+        raw = json.dumps({"endpoint": endpoint, "params": clean}, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _sharded(self, base_dir, digest, suffix):
+        return os.path.join(base_dir, digest[:2], f"{digest}{suffix}")
+
+    @staticmethod
+    def _atomic_write(path, data, mode="wb"):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, mode) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, endpoint, params=None, final_only=True):
+        """
+        Devuelve la respuesta guardada para la petición, o None.
+        Con final_only=True solo se devuelven respuestas marcadas como definitivas.
+        """
+        ref_path = self._sharded(self.refs_dir, self.request_key(endpoint, params), ".json")
+        try:
+            with open(ref_path, "r", encoding="utf-8") as f:
+                ref = json.load(f)
+            if final_only and not ref.get("final"):
+                return None
+            with gzip.open(self._sharded(self.objects_dir, ref["content"], ".json.gz"), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return None
+
+    def is_final(self, endpoint, params=None):
+        """Indica si la respuesta guardada para la petición es definitiva, sin leer su contenido."""
+        ref_path = self._sharded(self.refs_dir, self.request_key(endpoint, params), ".json")
+        try:
+            with open(ref_path, "r", encoding="utf-8") as f:
+                return bool(json.load(f).get("final"))
+        except (FileNotFoundError, ValueError, OSError):
+            return False
+
+    def put(self, endpoint, params, data, final=False):
+        """Guarda una respuesta y actualiza la referencia de la petición."""
+        payload = json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        content_hash = hashlib.sha256(payload).hexdigest()
+
+        object_path = self._sharded(self.objects_dir, content_hash, ".json.gz")
+        if not os.path.exists(object_path):
+            self._atomic_write(object_path, gzip.compress(payload))
+
+        ref = {"endpoint": endpoint, "content": content_hash, "final": bool(final), "fetched_at": time.time()}
+        ref_path = self._sharded(self.refs_dir, self.request_key(endpoint, params), ".json")
+        self._atomic_write(ref_path, json.dumps(ref).encode("utf-8"))
@@ -1,42 +1,153 @@
-import requests
+import random
+import threading
 import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Estados de partido que ya no van a cambiar
+FINAL_EVENT_STATUSES = {"closed", "cancelled", "abandoned"}
+
+
+class TokenBucket:
+    """Limitador de tasa compartido entre hilos (token bucket)."""
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bloquea hasta que haya un token disponible y lo consume."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
 
 class SportRadarClient:
-    def __init__(self, api_key, base_url, locale):
+    def __init__(self, api_key, base_url, locale, requests_per_second=1.0, burst=1,
+                 endpoint_concurrency=None, max_retries=5, backoff_base=2.0, backoff_cap=60.0, timeout=30,
+                 cache=None, offline=False):
         self.api_key = api_key
         self.base_url = base_url
         self.locale = locale
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.cache = cache
+        self.offline = offline
+
+        self.rate_limiter = TokenBucket(requests_per_second, burst)
+        self.endpoint_slots = {
+            name: threading.BoundedSemaphore(limit)
+            for name, limit in (endpoint_concurrency or {}).items()
+        }
+
+        pool_size = max([1] + list((endpoint_concurrency or {}).values()))
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @contextmanager
+    def _endpoint_slot(self, endpoint):
+        """Limita las peticiones simultáneas por tipo de endpoint (primer segmento de la ruta)."""
+        slot = self.endpoint_slots.get(endpoint.split("/", 1)[0])
+        if slot is None:
+            yield
+            return
+        with slot:
+            yield
 
-    def _get_request(self, endpoint, params=None):
-        """Método privado para manejar las solicitudes GET, errores y reintentos."""
+    def _backoff(self, attempt):
+        """Backoff exponencial con jitter completo."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(response):
+        """Segundos indicados por la cabecera Retry-After (número o fecha HTTP), si existe."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _get_request(self, endpoint, params=None, is_final=None):
+        """
+        Método privado para manejar las solicitudes GET, la caché, errores y reintentos.
+
+        Args:
+            is_final: Función que indica si una respuesta es definitiva. Las respuestas
+                definitivas se sirven desde la caché sin llamar a la API.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, params, final_only=not self.offline)
+            if cached is not None or self.offline:
+                return cached
+
+        data = self._fetch(endpoint, params)
+        if data is not None and self.cache is not None:
+            self.cache.put(endpoint, params, data, final=bool(is_final and is_final(data)))
+        return data
+
+    def _fetch(self, endpoint, params=None):
+        """Realiza la petición a la API con limitación de tasa y reintentos."""
         url = f"{self.base_url}/{self.locale}/{endpoint}"
-        
+
         full_params = {"api_key": self.api_key}
         if params:
             full_params.update(params)
 
-        retries = 5
-        delay = 30
-
-        for i in range(retries):
-            try:
-                response = self.session.get(url, params=full_params, headers={"accept": "application/json"})
-                
-                if response.status_code == 429:
-                    print(f"Error 429: Too Many Requests. Reintentando en {delay} segundos...")
-                    time.sleep(delay)
-                    delay *= 2
-                    continue
-                
-                response.raise_for_status()
-                return response.json()
-
-            except requests.exceptions.RequestException as e:
-                print(f"Error al llamar a la API para el endpoint {endpoint}")
-                return None
-        
-        print(f"Fallo en la solicitud después de {retries} reintentos.")
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            with self._endpoint_slot(endpoint):
+                try:
+                    response = self.session.get(url, params=full_params, headers={"accept": "application/json"}, timeout=self.timeout)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    response = None
+                except requests.exceptions.RequestException:
+                    # Errores no transitorios (URL inválida, redirecciones...): no se reintentan
+                    print(f"Error al llamar a la API para el endpoint {endpoint}")
+                    return None
+
+            if response is not None and response.status_code not in RETRY_STATUS_CODES:
+                try:
+                    response.raise_for_status()
+                    return response.json()
+                except (requests.exceptions.RequestException, ValueError):
+                    print(f"Error al llamar a la API para el endpoint {endpoint}")
+                    return None
+
+            if attempt == self.max_retries:
+                break
+
+            delay = self._retry_after(response) if response is not None else None
+            if delay is None:
+                delay = self._backoff(attempt)
+            status = response.status_code if response is not None else "sin respuesta"
+            print(f"Error {status} en {endpoint}. Reintentando en {delay:.1f} segundos...")
+            time.sleep(delay)
+
+        print(f"Fallo en la solicitud después de {self.max_retries} reintentos.")
         return None
 
 
@@ -54,7 +165,10 @@ class SportRadarClient:
     def get_sport_event_summary(self, urn_sport_event):
         """Obtiene el resumen detallado de un evento deportivo."""
         endpoint = f"sport_events/{urn_sport_event}/summary"
-        return self._get_request(endpoint)
+        return self._get_request(
+            endpoint,
+            is_final=lambda data: data.get("sport_event_status", {}).get("status") in FINAL_EVENT_STATUSES
+        )
 
     def get_season_competitor_statistics(self, urn_season, urn_competitor):
         """Obtiene las estadísticas de un equipo y sus jugadores para una temporada."""
@@ -65,4 +179,4 @@ class SportRadarClient:
         """Obtiene la clasificación de una temporada."""
         endpoint = f"seasons/{urn_season}/standings"
         params = {"live": live}
-        return self._get_request(endpoint, params)
\ No newline at end of file
+        return self._get_request(endpoint, params)
@@ -1,4 +1,7 @@
+import time
+
 import psycopg2
+from psycopg2.extras import execute_values
 from config import DB_CONFIG
 
 def connect():
@@ -159,6 +162,19 @@ def create_tables():
             games_played INTEGER,
             UNIQUE (player_id, season_id)
         )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_sport_events_season ON sport_events (season_id)
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS sync_state (
+            season_id VARCHAR(255) PRIMARY KEY REFERENCES seasons(id),
+            last_offset INTEGER NOT NULL DEFAULT 0,
+            last_start_time TIMESTAMP,
+            open_events INTEGER NOT NULL DEFAULT 0,
+            completed BOOLEAN NOT NULL DEFAULT FALSE,
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
         """
     )
     conn = connect()
@@ -188,35 +204,69 @@ def insert_season(conn, season_data, competition_id):
     cur.execute(sql, (season_data['id'], season_data['name'], season_data['year'], season_data['start_date'], season_data['end_date'], competition_id))
     conn.commit()
 
-def insert_team(conn, team_data):
-    """Inserta un equipo en la tabla `teams`."""
-    sql = "INSERT INTO teams (id, name, country, country_code, abbreviation) VALUES (%s, %s, %s, %s, %s) ON CONFLICT (id) DO NOTHING"
-    cur = conn.cursor()
-    cur.execute(sql, (
+TEAM_SQL = """
+    INSERT INTO teams (id, name, country, country_code, abbreviation) VALUES %s
+    ON CONFLICT (id) DO NOTHING
+"""
+
+SPORT_EVENT_SQL = """
+    INSERT INTO sport_events (id, start_time, status, competition_id, season_id, home_team_id, away_team_id, home_score, away_score)
+    VALUES %s
+    ON CONFLICT (id) DO UPDATE SET
+        start_time = EXCLUDED.start_time,
+        status = EXCLUDED.status,
+        home_score = EXCLUDED.home_score,
+        away_score = EXCLUDED.away_score
+"""
+
+TEAM_STATISTICS_SQL = """
+    INSERT INTO team_statistics (
+        sport_event_id, team_id, assists, ball_possession, biggest_lead,
+        defensive_rebounds, fouls, free_throw_attempts_successful,
+        free_throw_attempts_total, offensive_rebounds, rebounds,
+        shots_blocked, steals, team_leads, team_rebounds, team_turnovers,
+        three_point_attempts_successful, three_point_attempts_total,
+        time_spent_in_lead, timeouts, turnovers, two_point_attempts_successful,
+        two_point_attempts_total, possessions, oreb_pct, dreb_pct, ast_to, to_pct
+    ) VALUES %s
+    ON CONFLICT (sport_event_id, team_id) DO NOTHING
+"""
+
+PLAYER_SQL = """
+    INSERT INTO players (id, name, team_id, season_id) VALUES %s
+    ON CONFLICT (id) DO NOTHING
+"""
+
+PLAYER_STATISTICS_SQL = """
+    INSERT INTO player_statistics (
+        player_id, sport_event_id, minutes, points, assists, rebounds, total_rebounds,
+        defensive_rebounds, offensive_rebounds, blocks, steals, turnovers, personal_fouls,
+        technical_fouls, field_goals_attempted, field_goals_made, three_pointers_attempted,
+        three_pointers_made, free_throws_attempted, free_throws_made
+    ) VALUES %s
+    ON CONFLICT (player_id, sport_event_id) DO NOTHING
+"""
+
+def team_row(team_data):
+    """Fila de la tabla `teams` a partir de un competidor de la API."""
+    return (
         team_data.get('id'),
         team_data.get('name'),
         team_data.get('country'),
         team_data.get('country_code'),
         team_data.get('abbreviation')
-    ))
-    conn.commit()
+    )
 
-def insert_sport_event_summary(conn, summary):
-    """Inserta un resumen de evento deportivo en la tabla `sport_events`."""
+def sport_event_row(summary):
+    """Fila de la tabla `sport_events` a partir de un resumen de partido."""
     sport_event = summary.get('sport_event', {})
     status = summary.get('sport_event_status', {})
-    
+
     competitors = sport_event.get('competitors', [])
     home_team_id = next((c['id'] for c in competitors if c.get('qualifier') == 'home'), None)
     away_team_id = next((c['id'] for c in competitors if c.get('qualifier') == 'away'), None)
 
-    sql = """
-        INSERT INTO sport_events (id, start_time, status, competition_id, season_id, home_team_id, away_team_id, home_score, away_score)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (id) DO NOTHING
-    """
-    cur = conn.cursor()
-    cur.execute(sql, (
+    return (
         sport_event.get('id'),
         sport_event.get('start_time'),
         status.get('status'),
@@ -226,9 +276,45 @@ def insert_sport_event_summary(conn, summary):
         away_team_id,
         status.get('home_score'),
         status.get('away_score')
-    ))
+    )
+
+def get_sync_state(conn, season_id):
+    """Devuelve el estado de sincronización de una temporada o None si nunca se ha sincronizado."""
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT last_offset, last_start_time, open_events, completed FROM sync_state WHERE season_id = %s",
+        (season_id,)
+    )
+    row = cur.fetchone()
+    if not row:
+        return None
+    return {"last_offset": row[0], "last_start_time": row[1], "open_events": row[2], "completed": row[3]}
+
+def save_sync_state(conn, season_id, last_offset, last_start_time, open_events, completed):
+    """Guarda la marca de agua de una temporada tras sincronizarla."""
+    sql = """
+        INSERT INTO sync_state (season_id, last_offset, last_start_time, open_events, completed, updated_at)
+        VALUES (%s, %s, %s, %s, %s, NOW())
+        ON CONFLICT (season_id) DO UPDATE SET
+            last_offset = EXCLUDED.last_offset,
+            last_start_time = GREATEST(sync_state.last_start_time, EXCLUDED.last_start_time),
+            open_events = EXCLUDED.open_events,
+            completed = EXCLUDED.completed,
+            updated_at = NOW()
+    """
+    cur = conn.cursor()
+    cur.execute(sql, (season_id, last_offset, last_start_time, open_events, completed))
     conn.commit()
 
+def get_synced_event_ids(conn, season_id, final_statuses):
+    """Devuelve los ids de los partidos de la temporada ya guardados con un estado definitivo."""
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT id FROM sport_events WHERE season_id = %s AND status = ANY(%s)",
+        (season_id, list(final_statuses))
+    )
+    return {row[0] for row in cur.fetchall()}
+
 def compute_advanced_team_metrics(stats, opp_stats):
     """Calcula métricas avanzadas a partir de las estadísticas del equipo y su rival."""
     fga = (stats.get('two_point_attempts_total', 0) or 0) + (stats.get('three_point_attempts_total', 0) or 0)
@@ -258,25 +344,12 @@ def compute_advanced_team_metrics(stats, opp_stats):
     }
 
 
-def insert_team_statistics(conn, sport_event_id, competitor_data, opp_data=None):
-    """Inserta las estadísticas de un equipo para un evento deportivo con métricas avanzadas."""
+def team_statistics_row(sport_event_id, competitor_data, opp_data=None):
+    """Fila de la tabla `team_statistics` con las métricas avanzadas ya calculadas."""
     stats = competitor_data.get('statistics', {})
     adv_stats = compute_advanced_team_metrics(stats, opp_data.get('statistics', {}) if opp_data else {})
 
-    sql = """
-        INSERT INTO team_statistics (
-            sport_event_id, team_id, assists, ball_possession, biggest_lead,
-            defensive_rebounds, fouls, free_throw_attempts_successful,
-            free_throw_attempts_total, offensive_rebounds, rebounds,
-            shots_blocked, steals, team_leads, team_rebounds, team_turnovers,
-            three_point_attempts_successful, three_point_attempts_total,
-            time_spent_in_lead, timeouts, turnovers, two_point_attempts_successful,
-            two_point_attempts_total, possessions, oreb_pct, dreb_pct, ast_to, to_pct
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (sport_event_id, team_id) DO NOTHING
-    """
-    cur = conn.cursor()
-    cur.execute(sql, (
+    return (
         sport_event_id,
         competitor_data.get('id'),
         stats.get('assists'),
@@ -305,27 +378,14 @@ def insert_team_statistics(conn, sport_event_id, competitor_data, opp_data=None)
         adv_stats["dreb_pct"],
         adv_stats["ast_to"],
         adv_stats["to_pct"]
-    ))
-    conn.commit()
-
+    )
 
-def insert_player_statistics(conn, sport_event_id, player_data):
-    """Inserta las estadísticas de un jugador para un evento deportivo."""
-    player_id = player_data.get('id')
+def player_statistics_row(sport_event_id, player_data):
+    """Fila de la tabla `player_statistics` para un jugador en un partido."""
     stats = player_data.get('statistics', {})
-    
-    sql_stats = """
-        INSERT INTO player_statistics (
-            player_id, sport_event_id, minutes, points, assists, rebounds, total_rebounds,
-            defensive_rebounds, offensive_rebounds, blocks, steals, turnovers, personal_fouls,
-            technical_fouls, field_goals_attempted, field_goals_made, three_pointers_attempted,
-            three_pointers_made, free_throws_attempted, free_throws_made
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (player_id, sport_event_id) DO NOTHING
-    """
-    cur = conn.cursor()
-    cur.execute(sql_stats, (
-        player_id,
+
+    return (
+        player_data.get('id'),
         sport_event_id,
         stats.get('minutes'),
         stats.get('points'),
@@ -345,30 +405,153 @@ def insert_player_statistics(conn, sport_event_id, player_data):
         stats.get('three_pointers_made'),
         stats.get('free_throws_attempted'),
         stats.get('free_throws_made')
-    ))
-    conn.commit()
+    )
 
-def insert_player(conn, player_data, team_id, season_id):
-    """Inserta un jugador en la tabla `players` con su equipo y temporada."""
-    sql = "INSERT INTO players (id, name, team_id, season_id) VALUES (%s, %s, %s, %s) ON CONFLICT (id) DO NOTHING"
-    cur = conn.cursor()
-    cur.execute(sql, (player_data.get('id'), player_data.get('name'), team_id, season_id))
-    conn.commit()
+def player_row(player_data, team_id, season_id):
+    """Fila de la tabla `players`."""
+    return (player_data.get('id'), player_data.get('name'), team_id, season_id)
 
-def update_season_player_statistics(conn, player_id, season_id):
-    """Calcula y actualiza las estadísticas de temporada de un jugador."""
-    sql = """
+
+class BatchWriter:
+    """
+    Acumula las filas de una tanda de partidos (equipos, eventos, estadísticas de equipo,
+    jugadores y estadísticas de jugador) y las escribe con execute_values en una única
+    transacción, en lugar de una sentencia y un commit por fila.
+    """
+    # Orden de escritura, respetando las claves foráneas
+    TABLES = (
+        ("teams", TEAM_SQL),
+        ("sport_events", SPORT_EVENT_SQL),
+        ("team_statistics", TEAM_STATISTICS_SQL),
+        ("players", PLAYER_SQL),
+        ("player_statistics", PLAYER_STATISTICS_SQL),
+    )
+
+    def __init__(self, conn, batch_size=1000):
+        self.conn = conn
+        self.batch_size = batch_size
+        self._reset()
+        self.rows_written = {table: 0 for table, _ in self.TABLES}
+        self.rows_failed = 0
+        self.flushes = 0
+        self.flush_seconds = 0.0
+
+    def _reset(self):
+        # Los diccionarios eliminan duplicados dentro de la tanda: el primero gana en las
+        # tablas con DO NOTHING y el último en sport_events, que se actualiza.
+        self.buffers = {
+            "teams": {},
+            "sport_events": {},
+            "team_statistics": {},
+            "players": {},
+            "player_statistics": {},
+        }
+
+    def pending(self):
+        """Número de filas pendientes de escribir."""
+        return sum(len(rows) for rows in self.buffers.values())
+
+    def add_sport_event(self, season_id, summary, detailed_summary):
+        """Añade un partido (equipos, evento y estadísticas) a la tanda actual."""
+        sport_event_urn = summary['sport_event']['id']
+
+        for competitor in summary.get('sport_event', {}).get('competitors', []):
+            self.buffers["teams"].setdefault(competitor.get('id'), team_row(competitor))
+
+        self.buffers["sport_events"][sport_event_urn] = sport_event_row(summary)
+
+        if detailed_summary and 'statistics' in detailed_summary:
+            competitors_stats = detailed_summary['statistics']['totals']['competitors']
+            if len(competitors_stats) == 2:
+                home, away = competitors_stats
+                for team, opp in ((home, away), (away, home)):
+                    self.buffers["team_statistics"].setdefault(
+                        (sport_event_urn, team.get('id')), team_statistics_row(sport_event_urn, team, opp)
+                    )
+
+                for player_stats in home.get('players', []):
+                    player_id = player_stats.get('id')
+                    self.buffers["players"].setdefault(player_id, player_row(player_stats, home['id'], season_id))
+                    self.buffers["player_statistics"].setdefault(
+                        (player_id, sport_event_urn), player_statistics_row(sport_event_urn, player_stats)
+                    )
+
+        if self.pending() >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Escribe todas las filas acumuladas en una única transacción. Si falla se deshace la
+        transacción, se descarta la tanda y se relanza el error para que el llamante no
+        avance la marca de agua.
+        """
+        if not self.pending():
+            return
+
+        start = time.perf_counter()
+        autocommit = self.conn.autocommit
+        self.conn.autocommit = False
+        try:
+            with self.conn.cursor() as cur:
+                for table, sql in self.TABLES:
+                    rows = list(self.buffers[table].values())
+                    if rows:
+                        execute_values(cur, sql, rows, page_size=self.batch_size)
+            self.conn.commit()
+            for table, _ in self.TABLES:
+                self.rows_written[table] += len(self.buffers[table])
+            self.flushes += 1
+        except (Exception, psycopg2.DatabaseError) as error:
+            self.conn.rollback()
+            self.rows_failed += self.pending()
+            print(f"Error al escribir la tanda de {self.pending()} filas: {error}")
+            raise
+        finally:
+            self.conn.autocommit = autocommit
+            self.flush_seconds += time.perf_counter() - start
+            self._reset()
+
+    def stats(self):
+        """Métricas acumuladas: filas escritas por tabla, tandas y filas por segundo."""
+        total = sum(self.rows_written.values())
+        return {
+            "rows": dict(self.rows_written),
+            "total_rows": total,
+            "failed_rows": self.rows_failed,
+            "flushes": self.flushes,
+            "seconds": round(self.flush_seconds, 3),
+            "rows_per_second": round(total / self.flush_seconds, 1) if self.flush_seconds else None,
+        }
+
+def rebuild_season_player_statistics(conn, season_id, player_ids=None):
+    """
+    Recalcula season_player_statistics de una temporada con un único GROUP BY.
+
+    Args:
+        player_ids: Si se indica, solo se recalculan esos jugadores (los afectados por
+            la última tanda de partidos); si no, toda la temporada.
+    """
+    player_filter = ""
+    params = [season_id]
+    if player_ids is not None:
+        player_ids = list(player_ids)
+        if not player_ids:
+            return
+        player_filter = "AND ps.player_id = ANY(%s)"
+        params.append(player_ids)
+
+    sql = f"""
         INSERT INTO season_player_statistics (
             player_id, season_id, points_total, rebounds_total, assists_total,
             blocks_total, steals_total, games_played
-        ) VALUES (%s, %s,
-            (SELECT SUM(points) FROM player_statistics WHERE player_id = %s AND sport_event_id IN (SELECT id FROM sport_events WHERE season_id = %s)),
-            (SELECT SUM(total_rebounds) FROM player_statistics WHERE player_id = %s AND sport_event_id IN (SELECT id FROM sport_events WHERE season_id = %s)),
-            (SELECT SUM(assists) FROM player_statistics WHERE player_id = %s AND sport_event_id IN (SELECT id FROM sport_events WHERE season_id = %s)),
-            (SELECT SUM(blocks) FROM player_statistics WHERE player_id = %s AND sport_event_id IN (SELECT id FROM sport_events WHERE season_id = %s)),
-            (SELECT SUM(steals) FROM player_statistics WHERE player_id = %s AND sport_event_id IN (SELECT id FROM sport_events WHERE season_id = %s)),
-            (SELECT COUNT(*) FROM player_statistics WHERE player_id = %s AND sport_event_id IN (SELECT id FROM sport_events WHERE season_id = %s))
         )
+        SELECT
+            ps.player_id, se.season_id, SUM(ps.points), SUM(ps.total_rebounds), SUM(ps.assists),
+            SUM(ps.blocks), SUM(ps.steals), COUNT(*)
+        FROM player_statistics ps
+        JOIN sport_events se ON se.id = ps.sport_event_id
+        WHERE se.season_id = %s {player_filter}
+        GROUP BY ps.player_id, se.season_id
         ON CONFLICT (player_id, season_id) DO UPDATE SET
             points_total = EXCLUDED.points_total,
             rebounds_total = EXCLUDED.rebounds_total,
@@ -378,9 +561,5 @@ def update_season_player_statistics(conn, player_id, season_id):
             games_played = EXCLUDED.games_played;
     """
     cur = conn.cursor()
-    cur.execute(sql, (
-        player_id, season_id, player_id, season_id, player_id, season_id,
-        player_id, season_id, player_id, season_id, player_id, season_id,
-        player_id, season_id
-    ))
+    cur.execute(sql, params)
     conn.commit()
\ No newline at end of file
@@ -1,79 +1,237 @@
-import time
-from etl.basic.api.sportradar_client import SportRadarClient
+import datetime
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from etl.basic.api.cache import ResponseCache
+from etl.basic.api.sportradar_client import SportRadarClient, FINAL_EVENT_STATUSES
 from etl.basic.database.database import (
-    connect, create_tables, insert_competition, insert_season,
-    insert_team, insert_sport_event_summary, insert_team_statistics,
-    insert_player_statistics, insert_player, update_season_player_statistics
+    BatchWriter, connect, create_tables, insert_competition, insert_season,
+    rebuild_season_player_statistics, get_sync_state, save_sync_state, get_synced_event_ids
 )
-from config import API_KEY, BASE_URL, LOCALE, LEAGUE_URNS
+from config import API_KEY, BASE_URL, LOCALE, LEAGUE_URNS, SPORTRADAR_CONFIG, SPORTRADAR_CACHE_DIR, ETL_BATCH_SIZE
+
+# Tamaño máximo de la cola de escrituras: si la base de datos va más lenta que la API,
+# los hilos de descarga esperan en lugar de acumular resúmenes en memoria.
+WRITE_QUEUE_SIZE = 500
+
+_STOP = object()
+
+def store_sport_event(batch, season_id, summary, detailed_summary):
+    """Añade un partido (equipos, evento, estadísticas de equipo y de jugadores) a la tanda de escritura."""
+    batch.add_sport_event(season_id, summary, detailed_summary)
+
+def affected_player_ids(detailed_summary):
+    """IDs de los jugadores cuyas estadísticas guarda store_sport_event para un partido."""
+    if not detailed_summary or 'statistics' not in detailed_summary:
+        return set()
+    competitors_stats = detailed_summary['statistics']['totals']['competitors']
+    if len(competitors_stats) != 2:
+        return set()
+    return {p.get('id') for p in competitors_stats[0].get('players', [])}
+
+def db_writer(batch, write_queue):
+    """
+    Hilo escritor: ejecuta en orden las escrituras encoladas con la única conexión
+    a la base de datos, desacoplado de las descargas.
+
+    Los partidos se acumulan en la tanda; cualquier otra escritura (temporadas, acumulados,
+    marcas de agua) vacía antes la tanda pendiente para conservar el orden.
+
+    Tras un error de escritura ya no se guardan marcas de agua: la siguiente ejecución
+    vuelve a pedir los partidos que no llegaron a escribirse.
+    """
+    failed = False
+    while True:
+        item = write_queue.get()
+        try:
+            if item is _STOP:
+                batch.flush()
+                return
+            func, args = item
+            if failed and func is save_sync_state:
+                print(f"  > Marca de agua de {args[0]} no guardada por un error de escritura anterior.")
+                continue
+            if func is store_sport_event:
+                func(batch, *args)
+            else:
+                batch.flush()
+                func(batch.conn, *args)
+        except Exception as e:
+            failed = True
+            name = "flush" if item is _STOP else item[0].__name__
+            print(f"Error al escribir en la base de datos ({name}): {e}")
+            if item is _STOP:
+                return
+        finally:
+            write_queue.task_done()
+
+def season_finished(season):
+    """Indica si la fecha de fin de la temporada ya ha pasado."""
+    try:
+        return datetime.date.fromisoformat(str(season.get('end_date'))) < datetime.date.today()
+    except ValueError:
+        return False
+
+def sync_season(client, executor, read_conn, write_queue, season, full_refresh=False):
+    """
+    Sincroniza una temporada de forma incremental.
+
+    Retoma la paginación desde la última marca de agua guardada en sync_state, no vuelve
+    a descargar partidos ya guardados con estado definitivo y solo pide el resumen
+    detallado de los partidos cerrados. Los acumulados de temporada de los jugadores se
+    recalculan una vez por página, no por cada jugador de cada partido. Al terminar encola
+    la nueva marca de agua, salvo si la API ha fallado a mitad de la paginación.
+
+    Las lecturas (marca de agua y partidos ya guardados) usan read_conn, no la conexión
+    del hilo escritor.
+    """
+    season_id = season.get('id')
+    state = None if full_refresh else get_sync_state(read_conn, season_id)
+    if state and state['completed']:
+        print(f"  > Temporada {season.get('name')} ya sincronizada por completo.")
+        return
 
-def fetch_and_store_data():
-    """Función principal para orquestar la obtención y almacenamiento de datos."""
-    if not API_KEY:
+    synced_ids = set() if full_refresh else get_synced_event_ids(read_conn, season_id, FINAL_EVENT_STATUSES)
+    offset = state['last_offset'] if state else 0
+    limit = 200
+    first_pending_offset = None
+    last_start_time = None
+    open_events = 0
+    failed_events = 0
+    fetched = 0
+
+    while True:
+        summaries_data = client.get_season_summaries(season_id, limit=limit, offset=offset)
+        if summaries_data is None:
+            # Error de la API, no fin de los datos: no se mueve la marca de agua
+            print(f"  > Error al obtener los partidos (offset {offset}); la temporada se retomará en la próxima ejecución.")
+            return
+        if not summaries_data.get('summaries'):
+            break
+
+        to_fetch = []
+        for summary in summaries_data['summaries']:
+            sport_event = summary.get('sport_event', {})
+            status = summary.get('sport_event_status', {}).get('status')
+            if sport_event.get('id') in synced_ids:
+                continue
+            if status in FINAL_EVENT_STATUSES:
+                to_fetch.append(summary)
+                last_start_time = max(filter(None, [last_start_time, sport_event.get('start_time')]), default=None)
+            else:
+                # Partido sin terminar: se guarda su estado y se volverá a mirar en la próxima ejecución
+                open_events += 1
+                if first_pending_offset is None:
+                    first_pending_offset = offset
+                write_queue.put((store_sport_event, (season_id, summary, None)))
+
+        futures = {
+            executor.submit(client.get_sport_event_summary, summary['sport_event']['id']): summary
+            for summary in to_fetch
+        }
+        page_players = set()
+        for future in as_completed(futures):
+            summary = futures[future]
+            try:
+                detailed_summary = future.result()
+            except Exception as e:
+                print(f"    - Error al obtener el resumen detallado del partido {summary['sport_event']['id']}: {e}")
+                detailed_summary = None
+            if detailed_summary is None:
+                # Sin resumen no se guarda el partido (con estado definitivo se daría por
+                # sincronizado): queda pendiente para la próxima ejecución
+                print(f"    - No se pudo obtener el resumen detallado del partido {summary['sport_event']['id']}")
+                failed_events += 1
+                if first_pending_offset is None:
+                    first_pending_offset = offset
+                continue
+            print(f"    - Resumen detallado obtenido para el partido: {summary['sport_event']['id']}")
+            write_queue.put((store_sport_event, (season_id, summary, detailed_summary)))
+            page_players |= affected_player_ids(detailed_summary)
+        if page_players:
+            write_queue.put((rebuild_season_player_statistics, (season_id, page_players)))
+        fetched += len(to_fetch)
+
+        offset += limit
+
+    # La próxima ejecución empieza en la página del primer partido abierto o fallido, o en la última página
+    new_offset = first_pending_offset if first_pending_offset is not None else max(offset - limit, 0)
+    completed = open_events == 0 and failed_events == 0 and season_finished(season)
+    write_queue.put((save_sync_state, (season_id, new_offset, last_start_time, open_events, completed)))
+    print(f"  > {fetched - failed_events} partidos nuevos, {open_events} pendientes, {failed_events} con error.")
+
+def fetch_and_store_data(full_refresh=False, offline=False):
+    """
+    Función principal para orquestar la obtención y almacenamiento de datos.
+
+    Args:
+        full_refresh: Ignora las marcas de agua y recorre de nuevo todas las temporadas.
+        offline: Usa solo las respuestas guardadas en la caché en disco, sin llamar a la API.
+    """
+    if not API_KEY and not offline:
         print("Error: La clave de API no está definida en el archivo .env")
         return
-    
-    client = SportRadarClient(API_KEY, BASE_URL, LOCALE)
+
+    client = SportRadarClient(
+        API_KEY, BASE_URL, LOCALE,
+        requests_per_second=SPORTRADAR_CONFIG["requests_per_second"],
+        burst=SPORTRADAR_CONFIG["burst"],
+        endpoint_concurrency=SPORTRADAR_CONFIG["endpoint_concurrency"],
+        max_retries=SPORTRADAR_CONFIG["max_retries"],
+        backoff_base=SPORTRADAR_CONFIG["backoff_base"],
+        backoff_cap=SPORTRADAR_CONFIG["backoff_cap"],
+        timeout=SPORTRADAR_CONFIG["timeout"],
+        cache=ResponseCache(SPORTRADAR_CACHE_DIR),
+        offline=offline
+    )
     db_conn = connect()
+    # Conexión aparte para las lecturas: la de escritura es exclusiva del hilo escritor
+    read_conn = connect()
 
-    if not db_conn:
+    if not db_conn or not read_conn:
+        for conn in (db_conn, read_conn):
+            if conn:
+                conn.close()
         print("No se pudo conectar a la base de datos. Saliendo.")
         return
 
     create_tables()
 
-    for league_name, competition_urn in LEAGUE_URNS.items():
-        print(f"🔄 Procesando la liga: {league_name} ({competition_urn})...")
-
-        insert_competition(db_conn, {'id': competition_urn, 'name': league_name})
-
-        seasons_data = client.get_competition_seasons(competition_urn)
-        if not seasons_data:
-            continue
-
-        for season in seasons_data.get('seasons', []):
-            print(f"  > Procesando temporada: {season.get('name')}")
-            insert_season(db_conn, season, competition_urn)
-
-            offset = 0
-            limit = 200
-            while True:
-                summaries_data = client.get_season_summaries(season.get('id'), limit=limit, offset=offset)
-                if not summaries_data or not summaries_data.get('summaries'):
-                    break
-
-                for summary in summaries_data['summaries']:
-                    sport_event_urn = summary['sport_event']['id']
-                    print(f"    - Obteniendo resumen detallado para el partido: {sport_event_urn}")
-
-                    competitors = summary.get('sport_event', {}).get('competitors', [])
-                    for competitor in competitors:
-                        insert_team(db_conn, competitor)
-                    
-                    insert_sport_event_summary(db_conn, summary)
-
-                    detailed_summary = client.get_sport_event_summary(sport_event_urn)
-                    if detailed_summary and 'statistics' in detailed_summary:
-                        competitors_stats = detailed_summary['statistics']['totals']['competitors']
-                        if len(competitors_stats) == 2:
-                            home, away = competitors_stats
-                            insert_team_statistics(db_conn, sport_event_urn, home, away)
-                            insert_team_statistics(db_conn, sport_event_urn, away, home)
-
-                            if 'players' in home:
-                                for player_stats in home['players']:
-                                    player_id = player_stats.get('id')
-                                    insert_player(db_conn, player_stats, home['id'], season.get('id'))
-                                    insert_player_statistics(db_conn, sport_event_urn, player_stats)
-
-                                    update_season_player_statistics(db_conn, player_id, season.get('id'))
-
-                    time.sleep(1)
-
-                offset += limit
-
+    write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+    batch = BatchWriter(db_conn, batch_size=ETL_BATCH_SIZE)
+    writer = threading.Thread(target=db_writer, args=(batch, write_queue))
+    writer.start()
+
+    try:
+        with ThreadPoolExecutor(max_workers=SPORTRADAR_CONFIG["max_workers"]) as executor:
+            for league_name, competition_urn in LEAGUE_URNS.items():
+                print(f"🔄 Procesando la liga: {league_name} ({competition_urn})...")
+
+                write_queue.put((insert_competition, ({'id': competition_urn, 'name': league_name},)))
+
+                seasons_data = client.get_competition_seasons(competition_urn)
+                if not seasons_data:
+                    continue
+
+                for season in seasons_data.get('seasons', []):
+                    print(f"  > Procesando temporada: {season.get('name')}")
+                    write_queue.put((insert_season, (season, competition_urn)))
+                    sync_season(client, executor, read_conn, write_queue, season, full_refresh=full_refresh)
+    finally:
+        # Aunque falle la descarga, se escriben las tandas ya encoladas antes de salir
+        write_queue.put(_STOP)
+        writer.join()
+
+    metrics = batch.stats()
+    print(f"📊 {metrics['total_rows']} filas escritas en {metrics['flushes']} tandas "
+          f"({metrics['seconds']} s, {metrics['rows_per_second']} filas/s).")
+    if metrics['failed_rows']:
+        print(f"⚠️ {metrics['failed_rows']} filas no se pudieron escribir; se reintentarán en la próxima ejecución.")
+
+    read_conn.close()
     db_conn.close()
     print("✅ Proceso de recolección de datos completado.")
 
 if __name__ == '__main__':
-    fetch_and_store_data()
\ No newline at end of file
+    fetch_and_store_data(full_refresh='--full' in sys.argv, offline='--offline' in sys.argv)
@@ -1,10 +1,10 @@
 import streamlit as st
+import json
 import requests
 import re
 import time
 from frontend.utils.sidebar import show_sidebar
-
-from config import BACKEND_URL
+from frontend.utils.api import get_api_client
 
 # Lógica de la página del chat
 st.set_page_config(page_title="AssistAI - Chat", page_icon="💬", initial_sidebar_state='expanded', layout='wide')
@@ -16,7 +16,19 @@ st.set_page_config(page_title="AssistAI - Chat", page_icon="💬", initial_sideb
 show_sidebar()
 
 # Lógica del chat (migrada desde tu código original)
-urlAPI = BACKEND_URL
+api = get_api_client()
+
+def read_sse(response):
+    """Recorre los eventos Server-Sent Events de una respuesta en streaming: (evento, datos)."""
+    event, data = None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+        elif not line and event:
+            yield event, json.loads("\n".join(data))
+            event, data = None, []
 
 st.title("AssistAI Chat 💬")
 
@@ -32,11 +44,11 @@ if "welcome_shown" not in st.session_state:
 
 if "chat_id" not in st.session_state:
     try:
-        r = requests.get(f"{urlAPI}/chat/get_id")
-    except requests.exceptions.ConnectionError:
+        chat_id = api.get("/chat/get_id")
+    except requests.exceptions.RequestException:
         st.error("La API de AssistAI no está disponible. Por favor, inténtelo de nuevo más tarde.")
         st.stop()
-    st.session_state['chat_id'] = r.json()
+    st.session_state['chat_id'] = chat_id
     st.session_state['status'] = 'active'
     
 if not st.session_state.welcome_shown:
@@ -82,27 +94,43 @@ if prompt := st.chat_input("Pregunta lo que quieras"):
         message_placeholder = st.empty()
         FULL_RESPONSE = ""
 
+        assistant_response = None
         with st.spinner("Pensando..."):
             try:
-                r = requests.get(f"{urlAPI}/chat/response?user_question={prompt}&id={st.session_state['chat_id']}")
-                assistant_response = r.json()
-                if isinstance(assistant_response, str) or assistant_response['success'] == False:
-                    assistant_response = "Lo siento, he sufrido algún error al responder a tu pregunta. Inténtalo de nuevo más tarde."
-                else:
-                    assistant_response = assistant_response['response']['raw']
+                # La respuesta llega en streaming (Server-Sent Events) según la genera el LLM
+                r = api.stream(
+                    "/chat/response-stream",
+                    params={"user_question": prompt, "id": st.session_state['chat_id']}
+                )
+                r.encoding = "utf-8"
+                for event, data in read_sse(r):
+                    if event == "token":
+                        FULL_RESPONSE += data["text"]
+                        message_placeholder.markdown(FULL_RESPONSE + "▌", unsafe_allow_html=True)
+                    elif event == "done":
+                        assistant_response = data["response"]
+                    elif event == "error":
+                        break
             except requests.exceptions.RequestException:
-                assistant_response = "Lo siento, he sufrido algún error al responder a tu pregunta. Inténtalo de nuevo más tarde."
+                pass
+
+        if assistant_response is None:
+            assistant_response = "Lo siento, he sufrido algún error al responder a tu pregunta. Inténtalo de nuevo más tarde."
+            FULL_RESPONSE = ""
 
         latex_pattern = re.compile(r'\s*\\\[\s*(.*?)\s*\\\]\s*', re.DOTALL)
         parts = latex_pattern.split(assistant_response)
 
-        if len(parts) == 1:
+        if len(parts) == 1 and FULL_RESPONSE:
+            message_placeholder.markdown(assistant_response, unsafe_allow_html=True)
+        elif len(parts) == 1:
             for char in assistant_response:
                 FULL_RESPONSE += char
                 time.sleep(0.005)
                 message_placeholder.markdown(FULL_RESPONSE + "▌", unsafe_allow_html=True)
             message_placeholder.markdown(FULL_RESPONSE, unsafe_allow_html=True)
         else:
+            message_placeholder.empty()
             for i, part in enumerate(parts):
                 if i % 2 == 0:  # Parte de texto normal
                     if part.strip():
@@ -2,8 +2,7 @@ import streamlit as st
 import requests
 from frontend.utils.sidebar import show_sidebar
 from src.frontend.utils.dashboard_player import render_player_dashboard
-
-from config import BACKEND_URL
+from frontend.utils.api import get_api_client
 
 # Lógica de la página de informes
 st.set_page_config(page_title="AssistAI - Player Report", page_icon="📈", initial_sidebar_state='expanded', layout='wide')
@@ -16,18 +15,14 @@ show_sidebar()
 
 st.title("Player Report 📈")
 
-urlAPI = BACKEND_URL
+api = get_api_client()
 
 @st.cache_data
 def fetch_data():
     try:
-        players_response = requests.get(f"{urlAPI}/database/players")
-        players_response.raise_for_status()
-        players_list = players_response.json()["players"]
+        players_list = api.get("/database/players", cache=True)["players"]
 
-        seasons_response = requests.get(f"{urlAPI}/database/seasons")
-        seasons_response.raise_for_status()
-        seasons_list = seasons_response.json()["seasons"]
+        seasons_list = api.get("/database/seasons", cache=True)["seasons"]
         
         return players_list, seasons_list
     except requests.exceptions.RequestException as e:
@@ -36,6 +31,10 @@ def fetch_data():
 
 players_list, seasons_list = fetch_data()
 
+def fetch_report(params):
+    """Informe completo (estadísticas, perfil, rankings y medias de liga) en una sola llamada, cacheado por el cliente."""
+    return api.get("/player-report/report", params=params, cache=True)
+
 st.header("Player Analysis")
 
 # Selección para el Jugador 1 (siempre visible)
@@ -59,47 +58,34 @@ else:
     player2_name = None
     season2_id = None
 
+# Posición de cada jugador frente a toda la liga o solo frente a los de su rol
+rank_by_role = st.checkbox("Comparar solo con jugadores de su rol")
+
+REPORT_KEY = "player_report_params"
+
 if st.button("Crear Informe"):
     if not player1_name or not season1_id:
+        st.session_state.pop(REPORT_KEY, None)
         st.warning("Por favor, seleccione un jugador y una temporada para el Jugador 1.")
     elif compare_mode and (not player2_name or not season2_id):
+        st.session_state.pop(REPORT_KEY, None)
         st.warning("Por favor, seleccione un jugador y una temporada para el Jugador 2.")
     else:
-        with st.spinner("Generando informe..."):
-            try:
-                if compare_mode:
-                    response = requests.get(
-                        f"{urlAPI}/player-report/report_stats",
-                        params={
-                            "player1": player1_name,
-                            "season1": season1_id,
-                            "player2": player2_name,
-                            "season2": season2_id
-                        }
-                    )
-                else:
-                    response = requests.get(
-                        f"{urlAPI}/player-report/report_stats",
-                        params={
-                            "player1": player1_name,
-                            "season1": season1_id
-                        }
-                    )
-                response.raise_for_status()
-                stats = response.json()
-                avg_stats = None
-
-                if not compare_mode or season1_id == season2_id:
-                    response2 = requests.get(
-                        f"{urlAPI}/player-report/season_avg_stats",
-                        params={
-                            "season": season1_id
-                        }
-                    )
-                    response2.raise_for_status()
-                    avg_stats = response2.json()
-
-                render_player_dashboard(stats, avg_stats)
-
-            except requests.exceptions.RequestException as e:
-                    st.error(f"Error al obtener los datos para un solo jugador.")
\ No newline at end of file
+        params = {"player1": player1_name, "season1": season1_id}
+        if compare_mode:
+            params.update({"player2": player2_name, "season2": season2_id})
+        if rank_by_role:
+            params["rank_by_role"] = True
+        # Se guarda la selección: el informe sigue visible en los reruns (p. ej. al cambiar de sección)
+        st.session_state[REPORT_KEY] = params
+
+if REPORT_KEY in st.session_state:
+    with st.spinner("Generando informe..."):
+        try:
+            report = fetch_report(st.session_state[REPORT_KEY])
+
+            # Las medias de liga solo vienen si los jugadores son de la misma temporada
+            render_player_dashboard(report, report if report.get("average_stats") else None)
+
+        except requests.exceptions.RequestException as e:
+            st.error(f"Error al obtener los datos para un solo jugador.")
\ No newline at end of file
@@ -2,8 +2,7 @@ import streamlit as st
 import requests
 from frontend.utils.sidebar import show_sidebar
 from src.frontend.utils.dashboard_team import render_team_dashboard
-
-from config import BACKEND_URL
+from frontend.utils.api import get_api_client
 
 # Lógica de la página de informes
 st.set_page_config(page_title="AssistAI - Team Report", page_icon="📊", initial_sidebar_state='expanded', layout='wide')
@@ -16,18 +15,14 @@ show_sidebar()
 
 st.title("Team Report 📊")
 
-urlAPI = BACKEND_URL
+api = get_api_client()
 
 @st.cache_data
 def fetch_data():
     try:
-        teams_response = requests.get(f"{urlAPI}/database/teams")
-        teams_response.raise_for_status()
-        teams_list = teams_response.json()["teams"]
+        teams_list = api.get("/database/teams", cache=True)["teams"]
 
-        seasons_response = requests.get(f"{urlAPI}/database/seasons")
-        seasons_response.raise_for_status()
-        seasons_list = seasons_response.json()["seasons"]
+        seasons_list = api.get("/database/seasons", cache=True)["seasons"]
         
         return teams_list, seasons_list
     except requests.exceptions.RequestException as e:
@@ -36,6 +31,10 @@ def fetch_data():
 
 teams_list, seasons_list = fetch_data()
 
+def fetch_report(params):
+    """Informe completo (estadísticas, perfil, rankings y medias de liga) en una sola llamada, cacheado por el cliente."""
+    return api.get("/team-report/report", params=params, cache=True)
+
 st.header("Team Analysis")
 
 # Selección para el Equipo 1 (siempre visible)
@@ -59,48 +58,29 @@ else:
     team2_name = None
     season2_id = None
 
+REPORT_KEY = "team_report_params"
+
 if st.button("Crear Informe"):
     if not team1_name or not season1_id:
+        st.session_state.pop(REPORT_KEY, None)
         st.warning("Por favor, seleccione un equipo y una temporada para el Equipo 1.")
     elif compare_mode and (not team2_name or not season2_id):
+        st.session_state.pop(REPORT_KEY, None)
         st.warning("Por favor, seleccione un equipo y una temporada para el Equipo 2.")
     else:
-        with st.spinner("Generando informe..."):
-            try:
-                if compare_mode:
-                    response = requests.get(
-                        f"{urlAPI}/team-report/report_stats",
-                        params={
-                            "team1": team1_name,
-                            "season1": season1_id,
-                            "team2": team2_name,
-                            "season2": season2_id
-                        }
-                    )
-                else:
-                    response = requests.get(
-                        f"{urlAPI}/team-report/report_stats",
-                        params={
-                            "team1": team1_name,
-                            "season1": season1_id
-                        }
-                    )
-                response.raise_for_status()
-                stats = response.json()
-
-                avg_stats = None
-
-                if not compare_mode or season1_id == season2_id:
-                    response2 = requests.get(
-                        f"{urlAPI}/team-report/season_avg_stats",
-                        params={
-                            "season": season1_id
-                        }
-                    )
-                    response2.raise_for_status()
-                    avg_stats = response2.json()
-
-                render_team_dashboard(stats, avg_stats)
-
-            except requests.exceptions.RequestException as e:
-                    st.error(f"Error al obtener los datos")
\ No newline at end of file
+        params = {"team1": team1_name, "season1": season1_id}
+        if compare_mode:
+            params.update({"team2": team2_name, "season2": season2_id})
+        # Se guarda la selección: el informe sigue visible en los reruns (p. ej. al cambiar de sección)
+        st.session_state[REPORT_KEY] = params
+
+if REPORT_KEY in st.session_state:
+    with st.spinner("Generando informe..."):
+        try:
+            report = fetch_report(st.session_state[REPORT_KEY])
+
+            # Las medias de liga solo vienen si los equipos son de la misma temporada
+            render_team_dashboard(report, report if report.get("average_stats") else None)
+
+        except requests.exceptions.RequestException as e:
+            st.error(f"Error al obtener los datos")
\ No newline at end of file
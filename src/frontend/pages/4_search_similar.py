@@ -2,8 +2,9 @@ import streamlit as st
 import requests
 import pandas as pd
 from frontend.utils.sidebar import show_sidebar
+from frontend.utils.api import get_api_client
 
-from config import BACKEND_URL, PLAYER_MAP
+from config import PLAYER_MAP
 
 # Lógica de la página de informes
 st.set_page_config(page_title="AssistAI - Buscar Jugadores Similares", page_icon="🔍", initial_sidebar_state='expanded', layout='wide')
@@ -16,22 +17,16 @@ show_sidebar()
 
 st.title("Buscar Jugadores Similares 🔍")
 
-urlAPI = BACKEND_URL
+api = get_api_client()
 
 @st.cache_data
 def fetch_data():
     try:
-        players_response = requests.get(f"{urlAPI}/database/players")
-        players_response.raise_for_status()
-        players_list = players_response.json()["players"]
+        players_list = api.get("/database/players", cache=True)["players"]
 
-        seasons_response = requests.get(f"{urlAPI}/database/seasons")
-        seasons_response.raise_for_status()
-        seasons_list = seasons_response.json()["seasons"]
+        seasons_list = api.get("/database/seasons", cache=True)["seasons"]
 
-        player_stats_names_response = requests.get(f"{urlAPI}/database/player-stats-names")
-        player_stats_names_response.raise_for_status()
-        player_stats_names = player_stats_names_response.json()["player_stats_names"]
+        player_stats_names = api.get("/database/player-stats-names", cache=True)["player_stats_names"]
         cols_to_exclude = ['id', 'name', 'tm_name', 'season_id', 'nat', 'gp', 'w', 'l', 'w_pct']
         player_stats_names = [s for s in player_stats_names if s not in cols_to_exclude]
         player_stats_names = [PLAYER_MAP.get(s, s) for s in player_stats_names]
@@ -70,16 +65,15 @@ if st.button("Buscar"):
     else:
         with st.spinner("Buscando..."):
             try:
-                response = requests.get(
-                    f"{urlAPI}/search-similar/compare-player",
+                stats = api.get(
+                    "/search-similar/compare-player",
                     params={
                         "player_name": player1_name,
                         "season_id": season1_id,
                         "same_role": same_role
-                    }
+                    },
+                    cache=True
                 )
-                response.raise_for_status()
-                stats = response.json()
 
                 # Mostrar jugador base como cabecera
                 col1, col2, col3 = st.columns(3)
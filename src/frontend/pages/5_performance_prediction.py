@@ -2,8 +2,7 @@ import streamlit as st
 import requests
 import os
 from frontend.utils.sidebar import show_sidebar
-
-from config import BACKEND_URL
+from frontend.utils.api import get_api_client
 
 # Lógica de la página de predicción
 st.set_page_config(page_title="AssistAI - Performance Prediction", page_icon="🔮", initial_sidebar_state='expanded', layout='wide')
@@ -17,18 +16,14 @@ show_sidebar()
 st.title("Performance Prediction 🔮")
 st.write("Selecciona una alineación de cinco jugadores para predecir su rendimiento.")
 
-urlAPI = BACKEND_URL
+api = get_api_client()
 
 @st.cache_data
 def fetch_data():
     try:
-        players_response = requests.get(f"{urlAPI}/database/players")
-        players_response.raise_for_status()
-        players_list = players_response.json()["players"]
+        players_list = api.get("/database/players", cache=True)["players"]
 
-        seasons_response = requests.get(f"{urlAPI}/database/seasons")
-        seasons_response.raise_for_status()
-        seasons_list = seasons_response.json()["seasons"]
+        seasons_list = api.get("/database/seasons", cache=True)["seasons"]
         
         return players_list, seasons_list
     except requests.exceptions.RequestException as e:
@@ -57,12 +52,11 @@ if st.button("Predict Performance"):
             params[f"season{i+1}_id"] = player_data[f"season{i+1}_id"]
 
         try:
-            response = requests.get(
-                f"{urlAPI}/performance-prediction/predict",
-                params=params
+            prediction_result = api.get(
+                "/performance-prediction/predict",
+                params=params,
+                cache=True
             )
-            response.raise_for_status()
-            prediction_result = response.json()
 
             st.markdown("---")
             st.subheader("Predicted Lineup Performance")
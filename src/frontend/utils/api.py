@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import BACKEND_URL, FRONTEND_API_CONFIG
+
+
+class _CachedResponse:
+    def __init__(self, payload, etag: Optional[str], expires_at: float):
+        self.payload = payload
+        self.etag = etag
+        self.expires_at = expires_at
+
+
+class ApiClient:
+    """
+    Cliente HTTP del backend compartido por todas las páginas.
+
+    - Una sesión de requests con pool de conexiones keep-alive, en lugar de abrir una
+      conexión TCP nueva en cada llamada y en cada rerun de Streamlit.
+    - Timeouts en todas las llamadas y reintentos con backoff para los GET que fallan
+      por conexión o con 502/503/504.
+    - Caché opcional de respuestas por endpoint + parámetros. Al caducar se revalida con
+      If-None-Match: si el backend responde 304 se reutiliza la respuesta guardada.
+    """
+    def __init__(self, base_url: str, timeout: float, retries: int, backoff: float,
+                 pool_size: int, cache_ttl: int, cache_entries: int):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_entries = cache_entries
+        self._cache: Dict[tuple, _CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, path: str, params: Optional[Dict] = None, cache: bool = False, timeout=None):
+        """
+        GET al backend que devuelve el JSON de la respuesta. Lanza
+        requests.exceptions.RequestException si la llamada falla.
+        Con cache=True la respuesta se guarda por (endpoint, parámetros).
+        """
+        if not cache:
+            response = self.session.get(self._url(path), params=params, timeout=timeout or self.timeout)
+            response.raise_for_status()
+            return response.json()
+
+        key = (path, tuple(sorted((params or {}).items())))
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+        if entry is not None and entry.expires_at > time.time():
+            return entry.payload
+
+        headers = {"If-None-Match": entry.etag} if entry is not None and entry.etag else {}
+        response = self.session.get(self._url(path), params=params, headers=headers, timeout=timeout or self.timeout)
+        if response.status_code == 304 and entry is not None:
+            payload, etag = entry.payload, entry.etag
+        else:
+            response.raise_for_status()
+            payload, etag = response.json(), response.headers.get("ETag")
+
+        with self._lock:
+            self._cache[key] = _CachedResponse(payload, etag, time.time() + self.cache_ttl)
+            self._cache.move_to_end(key)
+            # Se descartan las entradas usadas hace más tiempo (LRU)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return payload
+
+    def post(self, path: str, json=None, timeout=None):
+        """POST al backend (sin reintentos) que devuelve el JSON de la respuesta."""
+        response = self.session.post(self._url(path), json=json, timeout=timeout or self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def stream(self, path: str, params: Optional[Dict] = None, read_timeout: float = 600):
+        """GET en streaming (p. ej. Server-Sent Events); devuelve la respuesta sin leer."""
+        response = self.session.get(
+            self._url(path), params=params, stream=True, timeout=(self.timeout, read_timeout)
+        )
+        response.raise_for_status()
+        return response
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+
+@st.cache_resource
+def get_api_client() -> ApiClient:
+    """Cliente único del backend para todas las sesiones y páginas de Streamlit."""
+    return ApiClient(BACKEND_URL, **FRONTEND_API_CONFIG)
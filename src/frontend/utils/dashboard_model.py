@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Dict, List, Optional
+
+from config import PLAYER_MAP, PLAYER_AVG_MAP, TEAM_MAP, TEAM_AVG_MAP, DASHBOARD_MODEL_ENTRIES
+
+LEAGUE_LABEL = "Media Liga"
+
+PLAYER_PERCENTAGE_COLS = [
+    "W%", "2PT%", "3PT%", "FG%", "FT%", "eFG%", "TS%",
+    "RIM FREQ", "PAINT FREQ", "MID FREQ", "C3 FREQ", "L3 FREQ", "FT Rate",
+    "TO%", "LTO%", "DTO%", "AST%", "AST% (2P)", "AST% (3P)", "AST% (FT)",
+    "USG%", "AST Ratio", "OR%", "OR% (after 2P)", "OR% (after 3P)",
+    "OR% (after FT)", "DR%", "DR% (after 2P)", "DR% (after 3P)", "DR% (after FT)", "TR%",
+    "ST%", "BLK%", "BLK% (2P)", "BLK% (3P)",
+    "TM TS% (ON)", "TM OR% (ON)", "TM TO% (ON)",
+    "OPP TS% (ON)", "OPP OR% (ON)", "OPP TO% (ON)",
+    "TM TS% (OFF)", "TM OR% (OFF)", "TM TO% (OFF)",
+    "OPP TS% (OFF)", "OPP OR% (OFF)", "OPP TO% (OFF)",
+    "TM TS% (NET)", "TM OR% (NET)", "TM TO% (NET)",
+    "OPP TS% (NET)", "OPP OR% (NET)", "OPP TO% (NET)",
+]
+
+TEAM_PERCENTAGE_COLS = [
+    "2PT%", "3PT%", "FG%", "FT%", "eFG%", "TS%",
+    "RIM FREQ", "PAINT FREQ", "MID FREQ", "C3 FREQ", "L3 FREQ", "FT Rate",
+    "TO%", "LTO%", "DTO%", "AST%", "AST% (2P)", "AST% (3P)", "AST% (FT)", "AST Ratio",
+    "OR%", "OR% (after 2P)", "OR% (after 3P)", "OR% (after FT)",
+    "DR%", "DR% (after 2P)", "DR% (after 3P)", "DR% (after FT)", "TR%",
+    "ST%", "BLK%",
+]
+
+# (frecuencia, puntos por tiro, zona)
+SHOT_ZONES = [
+    ("RIM FREQ", "RIM PPT", "RIM"),
+    ("PAINT FREQ", "PAINT PPT", "PAINT"),
+    ("MID FREQ", "MID PPT", "MID"),
+    ("C3 FREQ", "C3 PPT", "C3"),
+    ("L3 FREQ", "L3 PPT", "L3"),
+]
+THREE_POINT_ZONES = {"C3", "L3"}
+
+# (métrica, columna ON, columna OFF)
+PLAYER_ON_OFF = [
+    ("TM OFF RTG", "TM OFF RTG (ON)", "TM OFF RTG (OFF)"),
+    ("TM DEF RTG", "TM DEF RTG (ON)", "TM DEF RTG (OFF)"),
+    ("TM NET RTG", "TM NET RTG (ON)", "TM NET RTG (OFF)"),
+]
+
+ENTITIES = {
+    "player": {
+        "name_column": "Nombre",
+        "name_field": "name",
+        "column_map": PLAYER_MAP,
+        "avg_map": PLAYER_AVG_MAP,
+        "percentage_cols": PLAYER_PERCENTAGE_COLS,
+        "attempts_decimals": 2,
+        "on_off": PLAYER_ON_OFF,
+    },
+    "team": {
+        "name_column": "Equipo",
+        "name_field": "tm_name",
+        "column_map": TEAM_MAP,
+        "avg_map": TEAM_AVG_MAP,
+        "percentage_cols": TEAM_PERCENTAGE_COLS,
+        "attempts_decimals": None,
+        "on_off": [],
+    },
+}
+
+
+def format_stats(df: pd.DataFrame, percentage_cols: List[str]) -> pd.DataFrame:
+    """
+    Porcentajes redondeados a 4 decimales y pasados a escala 0-100; el resto de columnas
+    numéricas redondeadas a 2 decimales.
+    """
+    pct_cols = [col for col in percentage_cols if col in df.columns]
+    df[pct_cols] = df[pct_cols].round(4).astype(float) * 100
+
+    numeric_cols = df.select_dtypes(include=np.number).columns
+    non_percentage_cols = [col for col in numeric_cols if col not in percentage_cols]
+    df[non_percentage_cols] = df[non_percentage_cols].round(2).astype(float)
+    # Copia compacta: las asignaciones por columnas dejan el DataFrame fragmentado
+    return df.copy()
+
+
+class DashboardModel:
+    """
+    Tablas de los gráficos de un dashboard (jugadores o equipos), calculadas una sola vez
+    por selección:
+
+    - records: datos originales de los jugadores/equipos (para el perfil).
+    - entities: jugadores/equipos con los nombres de columna de la app y ya redondeados.
+    - league_row: medias de liga con el mismo formato, o None si no se muestran.
+    - rows: entidades + fila "Media Liga" en una única tabla ancha.
+    - Formato largo de todas las estadísticas (un único melt), zonas de tiro y ON/OFF.
+    - ranks: por entidad, tabla con el valor, el percentil y el z-score de cada estadística
+      en la liga (rank_stats del informe), o None si no hay ranking.
+    """
+    def __init__(self, entity: str, records: List[Dict], league: Optional[Dict] = None,
+                 ranks: Optional[List[Optional[Dict]]] = None):
+        config = ENTITIES[entity]
+        name = self.name_column = config["name_column"]
+        self.records = records
+        # Clave de la selección (la asigna get_dashboard_model)
+        self.key = None
+
+        self.entities = format_stats(
+            pd.DataFrame(records).rename(columns=config["column_map"]), config["percentage_cols"]
+        )
+        # Misma entidad en dos temporadas: se distingue por la temporada
+        if len(records) == 2 and records[0][config["name_field"]] == records[1][config["name_field"]]:
+            self.entities[name] = self.entities[name] + " - " + self.entities["SEASON"].astype(str)
+
+        self.show_league = league is not None
+        self.league_row = None
+        rows = self.entities
+        if self.show_league:
+            df_league = format_stats(
+                pd.DataFrame([league]).rename(columns=config["avg_map"]), config["percentage_cols"]
+            )
+            self.league_row = df_league.iloc[0]
+            rows = pd.concat([rows, df_league.assign(**{name: LEAGUE_LABEL})], ignore_index=True)
+        self.rows = rows
+
+        # Formato largo de todas las columnas: cada gráfico de barras solo selecciona sus filas
+        values = rows.drop(columns=[name]).apply(pd.to_numeric, errors="coerce")
+        values.insert(0, name, rows[name])
+        long = values.melt(id_vars=name, var_name="Stat", value_name="Value")
+        long["Value_formatted"] = long["Value"].round(2).astype(str)
+        self._long = long.set_index("Stat")
+
+        self.shot_zones = self._shot_zones(config["attempts_decimals"])
+        self.on_off = {title: self._on_off(title, on_col, off_col) for title, on_col, off_col in config["on_off"]}
+
+        ranks = ranks or [None] * len(records)
+        self.ranks = [
+            self._rank_table(position, entity_ranks, config["column_map"]) if entity_ranks else None
+            for position, entity_ranks in enumerate(ranks)
+        ]
+        self.rank_scopes = [entity_ranks and entity_ranks.get("scope") for entity_ranks in ranks]
+        self.rank_sizes = [entity_ranks and entity_ranks.get("sample_size") for entity_ranks in ranks]
+
+    def table(self, columns: List[str]) -> pd.DataFrame:
+        """Nombre + columnas pedidas de las entidades y de la media de liga (formato ancho)."""
+        return self.rows[[self.name_column] + list(columns)].copy()
+
+    def long_table(self, stats: List[str], var_name: str = "Stat", value_name: str = "Value",
+                   decimals: int = 2) -> pd.DataFrame:
+        """
+        Formato largo (una fila por estadística y entidad, en el orden de stats) con la
+        columna <value_name>_formatted para las etiquetas.
+        """
+        table = self._long.loc[list(stats)].reset_index().rename(columns={
+            "Stat": var_name, "Value": value_name, "Value_formatted": f"{value_name}_formatted"
+        })
+        if decimals != 2:
+            table[f"{value_name}_formatted"] = table[value_name].round(decimals).astype(str)
+        return table
+
+    def _rank_table(self, position: int, ranks: Dict, column_map: Dict[str, str]) -> pd.DataFrame:
+        """Valor (ya formateado), percentil y z-score de cada estadística de una entidad."""
+        labels = [column_map.get(col, col) for col in ranks["percentile_ranks"]]
+        row = self.entities.iloc[position]
+        return pd.DataFrame({
+            "Estadística": labels,
+            "Valor": pd.to_numeric(pd.Series([row.get(label) for label in labels]), errors="coerce"),
+            "Percentil": pd.to_numeric(pd.Series(list(ranks["percentile_ranks"].values())), errors="coerce").round(1),
+            "Z-score": pd.to_numeric(pd.Series(list(ranks["z_scores"].values())), errors="coerce").round(2),
+        })
+
+    def _shot_zones(self, attempts_decimals: Optional[int]) -> pd.DataFrame:
+        """Frecuencia, PPT e intentos estimados por zona de tiro (una fila por entidad y zona)."""
+        zones = [zone for _, _, zone in SHOT_ZONES]
+        freq = self.rows[[freq_col for freq_col, _, _ in SHOT_ZONES]].to_numpy(dtype=float)
+        ppt = self.rows[[ppt_col for _, ppt_col, _ in SHOT_ZONES]].to_numpy(dtype=float)
+        # Intentos estimados: triples en las zonas de 3, tiros de campo en el resto
+        is_three = np.array([zone in THREE_POINT_ZONES for zone in zones])
+        base = np.where(
+            is_three, self.rows[["3PTA"]].to_numpy(dtype=float), self.rows[["FGA"]].to_numpy(dtype=float)
+        )
+        attempts = base * freq
+        if attempts_decimals is not None:
+            attempts = attempts.round(attempts_decimals)
+        return pd.DataFrame({
+            self.name_column: np.repeat(self.rows[self.name_column].to_numpy(), len(zones)),
+            "Zone": np.tile(zones, len(self.rows)),
+            "Frequency": freq.ravel(),
+            "PPT": ppt.ravel(),
+            "Attempts": attempts.ravel(),
+        })
+
+    def _on_off(self, title: str, on_col: str, off_col: str) -> pd.DataFrame:
+        """Valor con la entidad en pista (ON) y fuera (OFF), una fila por entidad y estado."""
+        return pd.DataFrame({
+            self.name_column: np.repeat(self.rows[self.name_column].to_numpy(), 2),
+            "Estado": np.tile(["ON", "OFF"], len(self.rows)),
+            "Valor": self.rows[[on_col, off_col]].to_numpy(dtype=float).ravel(),
+            "Métrica": title,
+        })
+
+
+@st.cache_resource(show_spinner=False, max_entries=DASHBOARD_MODEL_ENTRIES)
+def _cached_model(key, _entity, _records, _league, _ranks) -> DashboardModel:
+    model = DashboardModel(_entity, _records, _league, _ranks)
+    model.key = key
+    return model
+
+
+def get_dashboard_model(entity: str, records: List[Dict], league: Optional[Dict],
+                        data_version=None, ranks: Optional[List[Optional[Dict]]] = None) -> DashboardModel:
+    """
+    Modelo del dashboard memoizado por (entidad, nombres y temporadas, versión de datos,
+    con o sin media de liga, ámbito de los rankings): los reruns de Streamlit no vuelven a
+    preparar las tablas. El modelo es compartido, así que no debe modificarse.
+    """
+    name_field = ENTITIES[entity]["name_field"]
+    key = (
+        entity,
+        tuple((record.get(name_field), record.get("season_id")) for record in records),
+        data_version,
+        league is not None,
+        tuple(entity_ranks and entity_ranks.get("scope") for entity_ranks in ranks or []),
+    )
+    return _cached_model(key, entity, records, league, ranks)
@@ -0,0 +1,115 @@
+import json
+from abc import ABC, abstractmethod
+import streamlit as st
+from typing import Callable, Dict, Iterable, List, Optional
+
+from config import DASHBOARD_SECTION_ENTRIES
+from frontend.utils.dashboard_model import DashboardModel
+
+
+class _Blocks(ABC):
+    """Subconjunto de la API de Streamlit que usan las secciones de los dashboards."""
+    @abstractmethod
+    def _current(self) -> List:
+        """Lista de bloques a la que se añaden las llamadas."""
+
+    def subheader(self, body: str):
+        self._current().append(("subheader", body))
+
+    def write(self, body: str):
+        self._current().append(("write", body))
+
+    def plotly_chart(self, figure, use_container_width: Optional[bool] = None):
+        # Se guarda la figura como dict JSON (sin arrays de numpy ni objetos de plotly), que
+        # se convierte una sola vez y se pasa tal cual a st.plotly_chart en cada rerun
+        self._current().append(("chart", json.loads(figure.to_json()), use_container_width))
+
+    def columns(self, spec: int) -> List["_Column"]:
+        columns = [_Column(self._layout) for _ in range(spec)]
+        self._current().append(("columns", [column.blocks for column in columns]))
+        return columns
+
+
+class _Column(_Blocks):
+    """Columna de una SectionLayout; admite `with col:` y col.plotly_chart(...)."""
+    def __init__(self, layout: "SectionLayout"):
+        self._layout = layout
+        self.blocks = []
+
+    def _current(self) -> List:
+        return self.blocks
+
+    def __enter__(self):
+        self._layout._targets.append(self.blocks)
+        return self
+
+    def __exit__(self, *exc):
+        self._layout._targets.pop()
+        return False
+
+
+class SectionLayout(_Blocks):
+    """
+    Registra la maquetación de una sección (títulos, columnas y figuras como dicts JSON) en
+    lugar de pintarla, para poder cachearla y reproducirla en reruns posteriores.
+    """
+    def __init__(self):
+        self._layout = self
+        self.blocks = []
+        self._targets = [self.blocks]
+
+    def _current(self) -> List:
+        return self._targets[-1]
+
+
+def replay(blocks: List, container=st):
+    """Pinta en Streamlit los bloques registrados por una SectionLayout."""
+    for kind, *args in blocks:
+        if kind == "columns":
+            for column, column_blocks in zip(container.columns(len(args[0])), args[0]):
+                replay(column_blocks, column)
+        elif kind == "chart":
+            options = {} if args[1] is None else {"use_container_width": args[1]}
+            container.plotly_chart(args[0], **options)
+        else:
+            getattr(container, kind)(args[0])
+
+
+# cache_resource: los bloques se comparten sin copiarlos en cada rerun, así que no deben modificarse
+@st.cache_resource(show_spinner=False, max_entries=DASHBOARD_SECTION_ENTRIES)
+def _section_blocks(key, section, _build, _model) -> List:
+    layout = SectionLayout()
+    _build(_model, layout)
+    return layout.blocks
+
+
+def render_sections(model: DashboardModel, sections: Dict[str, Callable], direct: Iterable[str] = (),
+                    lazy: bool = True, key: str = None):
+    """
+    Renderiza las secciones de un dashboard. Cada sección es una función (model, ui) que
+    pinta con ui.subheader / ui.columns / ui.plotly_chart.
+
+    - lazy=True: selector de sección; solo se construyen las figuras de la sección visible.
+    - lazy=False: todas las secciones en st.tabs, como antes.
+
+    Las figuras de cada sección se cachean ya convertidas por (selección, sección). Las
+    secciones de `direct` (sin figuras) se pintan directamente con Streamlit.
+    """
+    labels = list(sections)
+
+    def render(label):
+        if label in direct:
+            sections[label](model, st)
+        else:
+            replay(_section_blocks(model.key, label, sections[label], model))
+
+    if lazy:
+        selected = st.segmented_control(
+            "Sección", labels, default=labels[0], key=key, label_visibility="collapsed"
+        )
+        # Al deseleccionar la sección actual se vuelve a la primera
+        render(selected or labels[0])
+    else:
+        for tab, label in zip(st.tabs(labels), labels):
+            with tab:
+                render(label)
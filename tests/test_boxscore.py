@@ -0,0 +1,192 @@
+import math
+import random
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("euroleague_api")
+pytest.importorskip("crewai")
+
+from backend.chat.tools.boxscore import COL_MAP, aggregate_boxscores, build_boxscore, compute_advanced_stats
+
+ADVANCED_COLUMNS = [
+    "2PT%", "3PT%", "FGM", "FGA", "FG%", "FT%", "POSS", "PPP", "ORTG", "DRTG", "NetRTG", "eFG%", "TS%",
+    "FT Ratio", "TO%", "AST%", "AST/TO", "OR%", "DR%", "TR%", "ST%", "BLK%", "PF per 100 Poss",
+]
+
+
+# Implementación fila a fila anterior a la vectorización, como referencia
+def _baseline_row_stats(row, opp_totals):
+    def get(r, name, alt):
+        return float(r.get(name, r.get(alt, 0)))
+    try:
+        pts = get(row, "Points", "PTS")
+        fgm2, fga2 = get(row, "FieldGoalsMade2", "2PTM"), get(row, "FieldGoalsAttempted2", "2PTA")
+        fgm3, fga3 = get(row, "FieldGoalsMade3", "3PTM"), get(row, "FieldGoalsAttempted3", "3PTA")
+        ftm, fta = get(row, "FreeThrowsMade", "FTM"), get(row, "FreeThrowsAttempted", "FTA")
+        orb, drb, trb = get(row, "OffensiveRebounds", "OR"), get(row, "DefensiveRebounds", "DR"), get(row, "TotalRebounds", "TR")
+        ast, tov, stl = get(row, "Assistances", "AST"), get(row, "Turnovers", "TO"), get(row, "Steals", "ST")
+        blk, pf = get(row, "BlocksFavour", "BLK"), get(row, "FoulsCommited", "PF")
+
+        opp_pts = get(opp_totals, "Points", "PTS")
+        opp_fga2 = get(opp_totals, "FieldGoalsAttempted2", "2PTA")
+        opp_fga3 = get(opp_totals, "FieldGoalsAttempted3", "3PTA")
+        opp_fta = get(opp_totals, "FreeThrowsAttempted", "FTA")
+        opp_to = get(opp_totals, "Turnovers", "TO")
+        opp_or, opp_dr, opp_tr = get(opp_totals, "OffensiveRebounds", "OR"), get(opp_totals, "DefensiveRebounds", "DR"), get(opp_totals, "TotalRebounds", "TR")
+
+        fgm, fga = fgm2 + fgm3, fga2 + fga3
+        poss = max(fga + 0.44*fta - orb + tov, 1)
+        opp_poss = max(opp_fga2 + opp_fga3 + 0.44*opp_fta - opp_or + opp_to, 1)
+        is_team = row["Player"] in ["TOTALS", "TEAM ADVANCED"]
+        return pd.Series({
+            "2PT%": fgm2/fga2 if fga2 else 0,
+            "3PT%": fgm3/fga3 if fga3 else 0,
+            "FGM": fgm,
+            "FGA": fga,
+            "FG%": fgm/fga if fga else 0,
+            "FT%": ftm/fta if fta else 0,
+            "POSS": poss,
+            "PPP": pts/poss,
+            "ORTG": 100*pts/poss,
+            "DRTG": 100*opp_pts/opp_poss if is_team else float('NaN'),
+            "NetRTG": (100*pts/poss) - (100*opp_pts/opp_poss) if is_team else float('NaN'),
+            "eFG%": (fgm + 0.5*fgm3)/fga if fga else 0,
+            "TS%": pts / (2*(fga + 0.44*fta)) if (fga+0.44*fta) else 0,
+            "FT Ratio": fta/fga if fga else 0,
+            "TO%": tov/poss,
+            "AST%": ast/fgm if fgm else 0,
+            "AST/TO": ast/tov if tov else ast,
+            "OR%": orb / (orb + opp_dr) if (orb+opp_dr) else 0,
+            "DR%": drb / (drb + opp_or) if (drb+opp_or) else 0,
+            "TR%": trb / (trb + opp_tr) if (trb+opp_tr) else 0,
+            "ST%": stl/poss,
+            "BLK%": blk / opp_fga2 if opp_fga2 else 0,
+            "PF per 100 Poss": 100*pf/poss
+        })
+    except (TypeError, ValueError):
+        return pd.Series({col: float('NaN') for col in ADVANCED_COLUMNS})
+
+
+def _baseline_boxscore(raw):
+    dfs = {}
+    for item in raw:
+        players = pd.DataFrame(item.get("PlayersStats", []))
+        totals = pd.DataFrame([item.get("totr", {})])
+        dfs[item["Team"].strip().upper()] = pd.concat([players, totals.assign(Player="TOTALS")], ignore_index=True)
+    teams = list(dfs)
+    opp_totals = {teams[i]: dfs[teams[1-i]][dfs[teams[1-i]]["Player"] == "TOTALS"].iloc[0] for i in range(2)}
+    result = []
+    for team_name, df_team in dfs.items():
+        advanced = df_team.apply(lambda row: _baseline_row_stats(row, opp_totals[team_name]), axis=1)
+        df_team = pd.concat([df_team, advanced], axis=1)
+        df_team = df_team[df_team["Minutes"] != "DNP"].reset_index(drop=True)
+        df_team.insert(0, "TEAM TOTAL", team_name)
+        result.append(df_team)
+    final_df = pd.concat(result, ignore_index=True).rename(columns=COL_MAP)
+    return final_df.rename(columns={"TEAM TOTAL": "Team", "Team": "TeamCode", "Player_ID": "PlayerID"})
+
+
+STATS = [
+    "Points", "FieldGoalsMade2", "FieldGoalsAttempted2", "FieldGoalsMade3", "FieldGoalsAttempted3",
+    "FreeThrowsMade", "FreeThrowsAttempted", "OffensiveRebounds", "DefensiveRebounds", "TotalRebounds",
+    "Assistances", "Steals", "Turnovers", "BlocksFavour", "BlocksAgainst", "FoulsCommited", "FoulsReceived",
+    "Valuation", "Plusminus",
+]
+
+
+def _player(rng, code, number, minutes=None, **overrides):
+    stats = {name: rng.randint(0, 8) for name in STATS}
+    stats.update({
+        "Player_ID": f"P{code}{number}", "IsStarter": int(number < 5), "IsPlaying": 0, "Team": code,
+        "Dorsal": str(number), "Player": f"PLAYER {code} {number}",
+        "Minutes": minutes or f"{rng.randint(1, 35)}:{rng.randint(0, 59):02d}",
+    })
+    stats.update(overrides)
+    return stats
+
+
+def _raw_boxscore(seed=0, dnp=True):
+    rng = random.Random(seed)
+    raw = []
+    for code, name in (("MAD", "Real Madrid "), ("PAN", "Panathinaikos")):
+        players = [_player(rng, code, number) for number in range(9)]
+        # Jugador sin tiros, sin pérdidas y sin rebotes: divisiones por cero
+        players.append(_player(rng, code, 9, **{stat: 0 for stat in STATS}))
+        if dnp:
+            players.append(_player(rng, code, 10, minutes="DNP", **{stat: "DNP" for stat in STATS}))
+            players.append(_player(rng, code, 11, minutes="DNP"))
+        totals = {stat: sum(p[stat] for p in players if p["Minutes"] != "DNP") for stat in STATS}
+        totals.update({"Minutes": "200:00", "Team": code})
+        raw.append({"Team": name, "PlayersStats": players, "totr": totals})
+    return raw
+
+
+def _assert_same(actual, expected):
+    assert len(actual) == len(expected)
+    for column in ADVANCED_COLUMNS:
+        for a, e in zip(actual[column], expected[column]):
+            assert (math.isnan(a) and math.isnan(e)) or a == pytest.approx(e), column
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_build_boxscore_matches_row_by_row_baseline(seed):
+    raw = _raw_boxscore(seed)
+    expected = _baseline_boxscore(raw)
+    actual = build_boxscore(raw)
+
+    assert list(actual["Player"]) == list(expected["Player"])
+    assert "DNP" not in set(actual["MIN"])
+    _assert_same(actual, expected)
+
+
+def test_compute_advanced_stats_marks_non_numeric_rows_as_nan():
+    raw = _raw_boxscore(0)
+    df = pd.concat([
+        pd.concat([pd.DataFrame(item["PlayersStats"]), pd.DataFrame([item["totr"]]).assign(Player="TOTALS")], ignore_index=True)
+        .assign(**{"TEAM TOTAL": item["Team"].strip().upper()})
+        for item in raw
+    ], ignore_index=True)
+    stats = compute_advanced_stats(df)
+
+    dnp_stats = df["Points"] == "DNP"
+    assert dnp_stats.sum() == 2
+    assert stats[dnp_stats].isna().all().all()
+    # Los jugadores DNP con estadísticas a 0 sí tienen valores (se descartan después por los minutos)
+    assert stats[(df["Minutes"] == "DNP") & ~dnp_stats]["POSS"].notna().all()
+    # DRTG y NetRTG solo en las filas de totales
+    assert stats.loc[df["Player"] == "TOTALS", "DRTG"].notna().all()
+    assert stats.loc[df["Player"] != "TOTALS", "DRTG"].isna().all()
+
+
+def test_aggregate_boxscores_single_game_matches_boxscore():
+    game = build_boxscore(_raw_boxscore(1))
+    teams, players = aggregate_boxscores([game])
+
+    assert list(teams["GP"]) == [1, 1]
+    totals = game[game["Player"] == "TOTALS"].reset_index(drop=True)
+    _assert_same(teams, totals)
+    single = game[game["Player"] != "TOTALS"].reset_index(drop=True)
+    _assert_same(players, single)
+
+
+def test_aggregate_boxscores_sums_games_before_ratios():
+    first, second = build_boxscore(_raw_boxscore(1)), build_boxscore(_raw_boxscore(2))
+    teams, players = aggregate_boxscores([first, second])
+
+    assert list(teams["GP"]) == [2, 2]
+    for column in ("PTS", "2PTA", "AST"):
+        expected = first.loc[first["Player"] == "TOTALS", column].astype(float).to_numpy() + \
+            second.loc[second["Player"] == "TOTALS", column].astype(float).to_numpy()
+        assert list(teams[column]) == pytest.approx(list(expected))
+    # Porcentajes sobre las sumas, no media de porcentajes
+    fgm = teams["2PTM"] + teams["3PTM"]
+    fga = teams["2PTA"] + teams["3PTA"]
+    assert list(teams["FG%"]) == pytest.approx(list(fgm / fga))
+    # Minutos totales en formato decimal
+    assert list(teams["MIN"]) == pytest.approx([400.0, 400.0])
+
+
+def test_aggregate_boxscores_empty():
+    teams, players = aggregate_boxscores([])
+    assert teams.empty and players.empty
@@ -0,0 +1,58 @@
+import pytest
+
+pytest.importorskip("crewai_tools")
+pytest.importorskip("sqlalchemy")
+
+from backend.chat.tools.guarded_sql import ReadOnlyViolation, check_read_only, normalize_sql
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT name, pts FROM player_stats WHERE season_id = '2024-25' ORDER BY pts DESC LIMIT 10",
+    "select * from team_stats;",
+    "WITH t AS (SELECT tm_name, AVG(pts) AS pts FROM team_stats GROUP BY tm_name) SELECT * FROM t",
+    "VALUES (1), (2)",
+    # Palabras prohibidas dentro de literales, identificadores entre comillas o comentarios
+    "SELECT name FROM players WHERE name = 'Drop; Delete Into'",
+    'SELECT "update" FROM player_stats',
+    "SELECT 1 -- DELETE FROM players\n",
+    "SELECT /* ; DROP TABLE players; */ 1",
+])
+def test_check_read_only_accepts_single_reads(sql):
+    check_read_only(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "DELETE FROM players",
+    "UPDATE player_stats SET pts = 0",
+    "INSERT INTO players (name) VALUES ('x')",
+    "DROP TABLE players",
+    "TRUNCATE player_stats",
+    "CREATE TABLE t AS SELECT 1",
+    "SET statement_timeout = 0",
+    "COPY players TO '/tmp/players.csv'",
+    # Escrituras camufladas en una lectura
+    "SELECT * INTO backup FROM players",
+    "WITH d AS (DELETE FROM players RETURNING *) SELECT * FROM d",
+    "SELECT pg_sleep(10)",
+    "SELECT set_config('statement_timeout', '0', false)",
+    "select PG_TERMINATE_BACKEND(1)",
+])
+def test_check_read_only_rejects_writes(sql):
+    with pytest.raises(ReadOnlyViolation):
+        check_read_only(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT 1; SELECT 2",
+    "SELECT 1; DROP TABLE players",
+    "SELECT 1;DELETE FROM players;",
+    "",
+    ";",
+])
+def test_check_read_only_rejects_multiple_or_empty_statements(sql):
+    with pytest.raises(ReadOnlyViolation):
+        check_read_only(sql)
+
+
+def test_normalize_sql_ignores_comments_spacing_and_semicolon():
+    assert normalize_sql("SELECT  *\n FROM players -- todos\n;") == normalize_sql("SELECT * FROM players")
@@ -0,0 +1,83 @@
+from itertools import combinations
+
+import numpy as np
+
+from config import FEATURE_TO_DB
+from backend.performance_prediction.lineup_search import enumerate_lineups, role_mask, search_best_lineups
+
+ROLES = ["PG", "PG", "SG", "F", "F", "PF", "C", "C"]
+
+
+def _role_counts(lineup, role):
+    return sum(ROLES[i] == role for i in lineup)
+
+
+def test_enumerate_lineups_matches_combinations():
+    lineups = enumerate_lineups(8, [])
+    assert lineups.shape == (56, 5)
+    assert [tuple(row) for row in lineups] == list(combinations(range(8), 5))
+
+
+def test_enumerate_lineups_keeps_must_include():
+    lineups = enumerate_lineups(8, [6, 2, 2])
+    assert lineups.shape == (20, 5)
+    assert all({2, 6} <= set(row) for row in lineups)
+    assert len({tuple(sorted(row)) for row in lineups}) == 20
+
+
+def test_enumerate_lineups_impossible_constraints():
+    assert enumerate_lineups(8, [0, 1, 2, 3, 4, 5]).shape == (0, 5)
+    assert enumerate_lineups(4, []).shape == (0, 5)
+
+
+def test_role_mask_without_constraints_keeps_everything():
+    lineups = enumerate_lineups(8, [])
+    assert role_mask(lineups, ROLES, None).all()
+    assert role_mask(lineups, ROLES, {}).all()
+
+
+def test_role_mask_matches_per_lineup_count():
+    lineups = enumerate_lineups(8, [])
+    max_per_role = {"C": 1, "PG": 1}
+    mask = role_mask(lineups, ROLES, max_per_role)
+    expected = [
+        all(_role_counts(lineup, role) <= limit for role, limit in max_per_role.items())
+        for lineup in lineups
+    ]
+    assert mask.tolist() == expected
+    assert 0 < mask.sum() < len(lineups)
+
+
+def test_role_mask_zero_limit_and_missing_roles():
+    roles = ROLES[:-1] + [None]
+    lineups = enumerate_lineups(8, [])
+    mask = role_mask(lineups, roles, {"C": 0, "G": 0})
+    # Ningún quinteto con el pívot 6; el jugador sin rol y el rol inexistente no limitan
+    assert mask.tolist() == [6 not in lineup for lineup in lineups]
+
+
+def test_role_mask_empty_lineups():
+    empty = np.empty((0, 5), dtype=np.intp)
+    assert role_mask(empty, ROLES, {"C": 1}).shape == (0,)
+
+
+class _SumModel:
+    """Modelo de prueba: la predicción es la suma de las features."""
+    def predict(self, X):
+        return X.to_numpy(dtype=float).sum(axis=1)
+
+
+def test_search_best_lineups_applies_role_mask_and_ranks():
+    db_cols = [col for col in FEATURE_TO_DB.values() if col is not None]
+    # Solo cuentan los puntos: el mejor quinteto es el de mayor suma
+    player_matrix = np.zeros((8, len(db_cols)))
+    player_matrix[:, db_cols.index("pts")] = np.arange(8)
+    result = search_best_lineups(
+        player_matrix, db_cols, ROLES, ["PTS_sum"], _SumModel(), top_n=3, max_per_role={"C": 1}
+    )
+    assert result["total"] == 56
+    assert result["evaluated"] == int(role_mask(enumerate_lineups(8, []), ROLES, {"C": 1}).sum())
+    assert all(_role_counts(lineup, "C") <= 1 for lineup in result["lineups"])
+    # 7 + 5 + 4 + 3 + 2: el segundo pívot (6) queda fuera por la restricción
+    assert result["scores"][0] == 21
+    assert list(result["scores"]) == sorted(result["scores"], reverse=True)
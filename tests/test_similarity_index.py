@@ -0,0 +1,54 @@
+import contextlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from backend.search_similar import index as index_module
+from backend.search_similar.index import SimilarityIndex
+
+
+def _player_stats():
+    rng = np.random.default_rng(0)
+    rows = []
+    for i in range(12):
+        rows.append({"name": f"PLAYER {i}", "season_id": "2024-25", "tm_name": "TEAM A",
+                     "role": "Base" if i % 2 else "Pívot"})
+    # Jugador traspasado a mitad de temporada: dos filas casi idénticas
+    rows.append({"name": "PLAYER 0", "season_id": "2024-25", "tm_name": "TEAM B", "role": "Pívot"})
+    rows.append({"name": "NO ROLE", "season_id": "2024-25", "tm_name": "TEAM C", "role": None})
+    df = pd.DataFrame(rows)
+    df.insert(0, "id", range(1, len(df) + 1))
+    for stat in ("pts", "ast", "reb", "stl"):
+        df[stat] = rng.normal(10, 3, len(df))
+    df.loc[12, ["pts", "ast", "reb", "stl"]] = df.loc[0, ["pts", "ast", "reb", "stl"]] + 0.01
+    return df
+
+
+@pytest.fixture
+def similarity_index(monkeypatch):
+    df = _player_stats()
+    monkeypatch.setattr(index_module, "get_connection", lambda: contextlib.nullcontext())
+    monkeypatch.setattr(index_module.pd, "read_sql", lambda *args, **kwargs: df.copy())
+    monkeypatch.setattr(SimilarityIndex, "_current_signature", lambda self: (len(df), len(df)))
+    return SimilarityIndex()
+
+
+@pytest.mark.parametrize("same_role", [False, True])
+def test_query_excludes_every_row_of_the_base_player(similarity_index, same_role):
+    result = similarity_index.query("PLAYER 0", "2024-25", same_role=same_role, k=20)
+
+    names = [r["name"] for r in result["results"]]
+    assert "PLAYER 0" not in names
+    assert names
+
+
+def test_query_same_role_without_role_returns_no_results(similarity_index):
+    assert similarity_index.query("NO ROLE", "2024-25", same_role=True)["results"] == []
+    assert similarity_index.query("NO ROLE", "2024-25", same_role=False)["results"]
+
+
+def test_query_unknown_player(similarity_index):
+    assert similarity_index.query("NOBODY", "2024-25") is None